@@ -1,21 +1,75 @@
 from django.contrib import admin
 
-from .models import Attendance
+from .models import Attendance, ExpectedShift, Holiday, KioskScan, Roster, Shift
 
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
-    list_display = ["employee", "check_in", "check_out", "status", "created_at"]
+    list_display = [
+        "employee",
+        "work_date",
+        "check_in",
+        "check_out",
+        "status",
+        "created_at",
+    ]
     list_filter = ["status", "check_in"]
     search_fields = ["employee__user__first_name", "employee__user__last_name"]
-    date_hierarchy = "check_in"
-    readonly_fields = ["created_at"]
+    date_hierarchy = "work_date"
+    readonly_fields = ["work_date", "created_at"]
 
     fieldsets = (
         ("Empleado", {"fields": ("employee",)}),
-        ("Horario", {"fields": ("check_in", "check_out", "status")}),
+        ("Horario", {"fields": ("work_date", "check_in", "check_out", "status")}),
         (
             "Información Adicional",
             {"fields": ("created_at",), "classes": ("collapse",)},
         ),
     )
+
+
+@admin.register(KioskScan)
+class KioskScanAdmin(admin.ModelAdmin):
+    list_display = ["employee_number", "action", "scanned_at", "result", "employee"]
+    list_filter = ["action", "result", "scanned_at"]
+    search_fields = ["employee_number", "idempotency_key"]
+    date_hierarchy = "scanned_at"
+    raw_id_fields = ["employee", "attendance"]
+
+
+@admin.register(Shift)
+class ShiftAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "code",
+        "start_time",
+        "end_time",
+        "late_tolerance",
+        "early_leave_tolerance",
+        "is_active",
+    ]
+    list_filter = ["is_active"]
+    search_fields = ["name", "code"]
+
+
+@admin.register(Roster)
+class RosterAdmin(admin.ModelAdmin):
+    list_display = ["employee", "weekday", "shift", "valid_from", "valid_until"]
+    list_filter = ["weekday", "shift"]
+    search_fields = ["employee__user__first_name", "employee__user__last_name"]
+    raw_id_fields = ["employee"]
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ["date", "name"]
+    date_hierarchy = "date"
+
+
+@admin.register(ExpectedShift)
+class ExpectedShiftAdmin(admin.ModelAdmin):
+    list_display = ["employee", "date", "shift", "starts_at", "ends_at"]
+    list_filter = ["shift"]
+    search_fields = ["employee__user__first_name", "employee__user__last_name"]
+    date_hierarchy = "date"
+    raw_id_fields = ["employee"]
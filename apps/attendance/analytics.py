@@ -0,0 +1,207 @@
+# apps/attendance/analytics.py
+from datetime import datetime, timedelta
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from apps.employees.models import Employee
+
+from .models import Attendance, ExpectedShift
+
+STANDARD_SHIFT = timedelta(hours=8)
+
+PERIODS = ("day", "week", "month")
+
+
+def bucket_start(day, period):
+    """First day of the bucket that contains a date"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_end(start, period):
+    """Last day of a bucket"""
+    if period == "week":
+        return start + timedelta(days=6)
+    if period == "month":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return start
+
+
+def iter_buckets(start_date, end_date, period):
+    """Yields the start of every bucket overlapping the range"""
+    current = bucket_start(start_date, period)
+    while current <= end_date:
+        yield current
+        current = bucket_end(current, period) + timedelta(days=1)
+
+
+def _employee_filter(employees):
+    """Builds the filter for an employee, an Employee queryset or an id list"""
+    if employees is None:
+        return Q()
+    if isinstance(employees, Employee):
+        return Q(employee=employees)
+    if hasattr(employees, "values"):
+        return Q(employee__in=employees.values("pk"))
+    return Q(employee_id__in=list(employees))
+
+
+def _aggregates(standard):
+    """Aggregate expressions shared by every grouping"""
+    closed = Q(check_out__isnull=False)
+    worked = ExpressionWrapper(
+        F("check_out") - F("check_in"), output_field=DurationField()
+    )
+    overtime = ExpressionWrapper(
+        F("check_out") - F("check_in") - standard, output_field=DurationField()
+    )
+    return {
+        "present": Count(
+            "pk",
+            filter=Q(
+                status__in=[
+                    Attendance.StatusChoices.PRESENT,
+                    Attendance.StatusChoices.LATE,
+                ]
+            ),
+        ),
+        "late": Count("pk", filter=Q(status=Attendance.StatusChoices.LATE)),
+        "closed": Count("pk", filter=closed),
+        "hours": Sum(worked, filter=closed),
+        "overtime": Sum(
+            overtime, filter=closed & Q(check_out__gt=F("check_in") + standard)
+        ),
+    }
+
+
+def attendance_buckets(
+    start_date, end_date, employees=None, period="day", standard=STANDARD_SHIFT
+):
+    """
+    Attendance statistics grouped by day, week or month.
+
+    `employees` may be None (whole staff), an Employee, an Employee queryset
+    or a list of ids. Durations and overtime are summed by the database.
+    Returns one dict per bucket, empty buckets included, with:
+
+    - present: attendances with status present or late
+    - late: late arrivals
+    - closed: attendances already checked out
+    - absent: rostered shifts already due with no attendance and no approved
+      leave (see ExpectedShift), counted by a second grouped query
+    - hours / overtime: timedelta sums of closed attendances
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+
+    employee_filter = _employee_filter(employees)
+
+    rows = (
+        Attendance.objects.filter(
+            employee_filter, work_date__gte=start_date, work_date__lte=end_date
+        )
+        .annotate(bucket=_bucket("work_date", period))
+        .values("bucket")
+        .annotate(**_aggregates(standard))
+        .order_by("bucket")
+    )
+    by_bucket = {_as_date(row["bucket"]): row for row in rows}
+
+    absences = (
+        ExpectedShift.objects.filter(
+            employee_filter, date__gte=start_date, date__lte=end_date
+        )
+        .absent()
+        .annotate(bucket=_bucket("date", period))
+        .values("bucket")
+        .annotate(absent=Count("pk"))
+        .order_by("bucket")
+    )
+    absent_by_bucket = {_as_date(row["bucket"]): row["absent"] for row in absences}
+
+    buckets = []
+    for start in iter_buckets(start_date, end_date, period):
+        end = bucket_end(start, period)
+        row = by_bucket.get(start, {})
+        present = row.get("present", 0)
+        buckets.append(
+            {
+                "start": start,
+                "end": end,
+                "present": present,
+                "late": row.get("late", 0),
+                "closed": row.get("closed", 0),
+                "absent": absent_by_bucket.get(start, 0),
+                "hours": row.get("hours") or timedelta(),
+                "overtime": row.get("overtime") or timedelta(),
+            }
+        )
+    return buckets
+
+
+def attendance_by_employee(
+    start_date, end_date, employees=None, standard=STANDARD_SHIFT
+):
+    """
+    Same figures as attendance_buckets but grouped by employee over the
+    whole range: {employee_id: {"present", "late", "closed", "hours", "overtime"}}
+    """
+    employee_filter = _employee_filter(employees)
+    rows = (
+        Attendance.objects.filter(
+            employee_filter, work_date__gte=start_date, work_date__lte=end_date
+        )
+        .values("employee_id")
+        .annotate(**_aggregates(standard))
+        .order_by()
+    )
+    return {
+        row.pop("employee_id"): {
+            **row,
+            "hours": row["hours"] or timedelta(),
+            "overtime": row["overtime"] or timedelta(),
+        }
+        for row in rows
+    }
+
+
+def attendance_totals(start_date, end_date, employees=None, standard=STANDARD_SHIFT):
+    """Totals for the whole range, plus average hours per closed shift"""
+    totals = {
+        "present": 0,
+        "late": 0,
+        "closed": 0,
+        "absent": 0,
+        "hours": timedelta(),
+        "overtime": timedelta(),
+    }
+    for bucket in attendance_buckets(
+        start_date, end_date, employees, period="month", standard=standard
+    ):
+        for key in totals:
+            totals[key] += bucket[key]
+
+    totals["average"] = (
+        totals["hours"] / totals["closed"] if totals["closed"] else timedelta()
+    )
+    return totals
+
+
+def _bucket(field, period):
+    if period == "week":
+        return TruncWeek(field)
+    if period == "month":
+        return TruncMonth(field)
+    return F(field)
+
+
+def _as_date(value):
+    # TruncWeek/TruncMonth may return datetimes depending on the backend
+    if isinstance(value, datetime):
+        return value.date()
+    return value
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AttendanceConfig(AppConfig):
     name = 'apps.attendance'
+
+    def ready(self):
+        # Import signals when Django starts
+        import apps.attendance.signals
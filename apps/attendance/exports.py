@@ -0,0 +1,45 @@
+# apps/attendance/exports.py
+from django.utils import timezone
+
+# Rows fetched per round trip while streaming; memory stays constant
+CHUNK_SIZE = 2000
+
+
+def attendance_header():
+    return [
+        "Nº empleado",
+        "Empleado",
+        "Fecha",
+        "Entrada",
+        "Salida",
+        "Horas",
+        "Estado",
+    ]
+
+
+def attendance_csv_rows(attendances):
+    """
+    CSV rows for an attendance queryset, read in chunks with a server-side
+    cursor. The queryset should select_related("employee__user").
+    """
+    tz = timezone.get_default_timezone()
+    for attendance in attendances.iterator(chunk_size=CHUNK_SIZE):
+        employee = attendance.employee
+        check_out = attendance.check_out
+        yield [
+            employee.employee_number or "",
+            employee.get_full_name(),
+            attendance.work_date.isoformat(),
+            timezone.localtime(attendance.check_in, tz).strftime("%Y-%m-%d %H:%M"),
+            (
+                timezone.localtime(check_out, tz).strftime("%Y-%m-%d %H:%M")
+                if check_out
+                else ""
+            ),
+            (
+                f"{(check_out - attendance.check_in).total_seconds() / 3600:.2f}"
+                if check_out
+                else ""
+            ),
+            attendance.get_status_display(),
+        ]
@@ -0,0 +1,307 @@
+# apps/attendance/kiosk.py
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.employees.models import Employee
+
+from . import presence
+from .models import Attendance, KioskScan
+from .schedules import expected_shifts_for
+
+MAX_BATCH_SIZE = 500
+
+# Kiosk clocks may drift a little, but scans from the future are rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+Action = KioskScan.ActionChoices
+Result = KioskScan.ResultChoices
+
+
+class ScanError(ValueError):
+    """Invalid scan payload"""
+
+
+@dataclass
+class Scan:
+    employee_number: str
+    scanned_at: object
+    action: str = Action.CHECK_IN
+    idempotency_key: str = None
+    employee_id: int = None
+    result: str = None
+    attendance_id: int = None
+    status: str = None
+    replayed: bool = False
+    # Later scans of the batch that reuse this scan's idempotency key
+    duplicates: list = field(default_factory=list, repr=False)
+
+    def as_dict(self):
+        return {
+            "employee_number": self.employee_number,
+            "action": self.action,
+            "scanned_at": self.scanned_at.isoformat(),
+            "idempotency_key": self.idempotency_key,
+            "result": self.result,
+            "attendance_id": self.attendance_id,
+            "status": self.status,
+            "replayed": self.replayed,
+        }
+
+
+def parse_scans(payload):
+    """
+    Accepts a single scan object, a list of scans or {"scans": [...]}.
+    Each scan: {"employee_number", "timestamp"?, "action"?, "idempotency_key"?}
+    """
+    if isinstance(payload, dict) and "scans" in payload:
+        payload = payload["scans"]
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not payload:
+        raise ScanError("Se esperaba uno o varios fichajes")
+    if len(payload) > MAX_BATCH_SIZE:
+        raise ScanError(f"Máximo {MAX_BATCH_SIZE} fichajes por petición")
+
+    now = timezone.now()
+    scans = []
+    for index, item in enumerate(payload):
+        if not isinstance(item, dict) or not item.get("employee_number"):
+            raise ScanError(f"Fichaje {index}: falta employee_number")
+
+        scanned_at = now
+        if item.get("timestamp"):
+            scanned_at = parse_datetime(str(item["timestamp"]))
+            if scanned_at is None:
+                raise ScanError(f"Fichaje {index}: timestamp no válido")
+            if timezone.is_naive(scanned_at):
+                scanned_at = timezone.make_aware(
+                    scanned_at, timezone.get_default_timezone()
+                )
+            if scanned_at > now + MAX_CLOCK_SKEW:
+                raise ScanError(f"Fichaje {index}: timestamp en el futuro")
+
+        action = item.get("action", Action.CHECK_IN)
+        if action not in Action.values:
+            raise ScanError(f"Fichaje {index}: acción no válida")
+
+        key = item.get("idempotency_key") or None
+        if key is not None and len(str(key)) > 64:
+            raise ScanError(f"Fichaje {index}: idempotency_key demasiado larga")
+
+        scans.append(
+            Scan(
+                employee_number=str(item["employee_number"]),
+                scanned_at=scanned_at,
+                action=action,
+                idempotency_key=str(key) if key is not None else None,
+            )
+        )
+    return scans
+
+
+def process_scans(scans):
+    """
+    Applies a batch of kiosk scans with a constant number of queries:
+
+    1. previously processed idempotency keys are replayed, not re-applied
+    2. employee numbers are resolved in one query
+    3. check-ins are inserted with one bulk INSERT, status already computed
+       against the rostered shifts;
+       the unique_open_attendance_per_employee constraint discards the ones
+       of employees that are already clocked in
+    4. check-outs close the open attendances with one UPDATE
+    5. the scans are logged with one bulk INSERT
+
+    Steps 3 and 4 run once per round (see _rounds): a check-in made after a
+    check-out of the same employee is only inserted once that check-out is
+    applied. The number of rounds grows with the check-outs of a single
+    employee in the batch, not with the size of the batch.
+
+    The presence cache is dropped once the batch commits, if anyone clocked
+    in or out.
+    """
+    with transaction.atomic():
+        pending = _replay_known_keys(scans)
+        _resolve_employees(pending)
+
+        known = [scan for scan in pending if scan.employee_id]
+        for scan in pending:
+            if not scan.employee_id:
+                scan.result = Result.UNKNOWN_EMPLOYEE
+
+        for check_ins, check_outs in _rounds(known):
+            _insert_check_ins(check_ins)
+            open_attendances = _open_attendances(
+                {scan.employee_id for scan in check_ins + check_outs}
+            )
+            _resolve_check_ins(check_ins, open_attendances)
+            _apply_check_outs(check_outs, open_attendances)
+
+        # bulk_create and update() skip the post_save signal
+        if any(
+            scan.result in (Result.CHECKED_IN, Result.CHECKED_OUT) for scan in known
+        ):
+            presence.changed()
+
+        for scan in pending:
+            for duplicate in scan.duplicates:
+                duplicate.result = scan.result
+                duplicate.attendance_id = scan.attendance_id
+                duplicate.status = scan.status
+
+        KioskScan.objects.bulk_create(
+            [
+                KioskScan(
+                    idempotency_key=scan.idempotency_key,
+                    employee_number=scan.employee_number,
+                    employee_id=scan.employee_id,
+                    action=scan.action,
+                    scanned_at=scan.scanned_at,
+                    result=scan.result,
+                    attendance_id=scan.attendance_id,
+                )
+                for scan in pending
+            ],
+            ignore_conflicts=True,
+        )
+    return scans
+
+
+def _replay_known_keys(scans):
+    """Fills replayed scans and returns the ones that still need processing"""
+    keys = {scan.idempotency_key for scan in scans if scan.idempotency_key}
+    previous = {
+        logged.idempotency_key: logged
+        for logged in KioskScan.objects.filter(idempotency_key__in=keys).select_related(
+            "attendance"
+        )
+    }
+
+    pending = []
+    first_by_key = {}
+    for scan in scans:
+        key = scan.idempotency_key
+        logged = previous.get(key) if key else None
+        if logged:
+            scan.result = logged.result
+            scan.attendance_id = logged.attendance_id
+            scan.status = logged.attendance.status if logged.attendance else None
+            scan.replayed = True
+        elif key and key in first_by_key:
+            # Same key repeated inside the batch: answer like the first one
+            scan.replayed = True
+            first_by_key[key].duplicates.append(scan)
+        else:
+            if key:
+                first_by_key[key] = scan
+            pending.append(scan)
+    return pending
+
+
+def _resolve_employees(scans):
+    numbers = {scan.employee_number for scan in scans}
+    ids = dict(
+        Employee.objects.filter(employee_number__in=numbers).values_list(
+            "employee_number", "pk"
+        )
+    )
+    for scan in scans:
+        scan.employee_id = ids.get(scan.employee_number)
+
+
+def _rounds(scans):
+    """
+    Splits the scans, in scanned_at order, into rounds of (check-ins,
+    check-outs) that can each be applied in bulk: round n holds the scans
+    an employee made after their n-th check-out of the batch, up to and
+    including the next one.
+    """
+    rounds = defaultdict(lambda: ([], []))
+    check_outs_seen = defaultdict(int)
+    for scan in sorted(scans, key=lambda scan: scan.scanned_at):
+        check_ins, check_outs = rounds[check_outs_seen[scan.employee_id]]
+        if scan.action == Action.CHECK_OUT:
+            check_outs.append(scan)
+            check_outs_seen[scan.employee_id] += 1
+        else:
+            check_ins.append(scan)
+    return [rounds[number] for number in sorted(rounds)]
+
+
+def _insert_check_ins(scans):
+    # Only the earliest check-in per employee in the batch can open a shift
+    first_by_employee = {}
+    for scan in sorted(scans, key=lambda scan: scan.scanned_at):
+        first_by_employee.setdefault(scan.employee_id, scan)
+
+    # bulk_create skips save(), so work_date and status are computed here,
+    # against the rostered shifts of the whole batch fetched at once
+    work_dates = {
+        scan.employee_id: Attendance.business_date(scan.scanned_at)
+        for scan in first_by_employee.values()
+    }
+    expected = expected_shifts_for(work_dates.items())
+    Attendance.objects.bulk_create(
+        [
+            Attendance(
+                employee_id=scan.employee_id,
+                check_in=scan.scanned_at,
+                work_date=work_dates[scan.employee_id],
+                status=Attendance.status_for_check_in(
+                    scan.scanned_at,
+                    expected.get((scan.employee_id, work_dates[scan.employee_id])),
+                ),
+            )
+            for scan in first_by_employee.values()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _open_attendances(employee_ids):
+    return {
+        attendance.employee_id: attendance
+        for attendance in Attendance.objects.filter(
+            employee_id__in=employee_ids, check_out__isnull=True
+        ).only("pk", "employee_id", "check_in", "status")
+    }
+
+
+def _resolve_check_ins(scans, open_attendances):
+    for scan in scans:
+        attendance = open_attendances.get(scan.employee_id)
+        if attendance and attendance.check_in == scan.scanned_at:
+            scan.result = Result.CHECKED_IN
+        else:
+            scan.result = Result.ALREADY_CHECKED_IN
+        if attendance:
+            scan.attendance_id = attendance.pk
+            scan.status = attendance.status
+
+
+def _apply_check_outs(scans, open_attendances):
+    closing = {}
+    for scan in sorted(scans, key=lambda scan: scan.scanned_at):
+        attendance = open_attendances.get(scan.employee_id)
+        if (
+            attendance is None
+            or attendance.pk in closing
+            or scan.scanned_at < attendance.check_in
+        ):
+            scan.result = Result.NOT_CHECKED_IN
+        else:
+            closing[attendance.pk] = scan.scanned_at
+            scan.result = Result.CHECKED_OUT
+            scan.attendance_id = attendance.pk
+            scan.status = attendance.status
+
+    if closing:
+        Attendance.objects.filter(pk__in=closing, check_out__isnull=True).update(
+            check_out=Case(*[When(pk=pk, then=ts) for pk, ts in closing.items()])
+        )
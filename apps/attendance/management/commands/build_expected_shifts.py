@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.attendance.schedules import HORIZON_DAYS, build_expected_shifts
+
+
+class Command(BaseCommand):
+    help = "Precompute expected shifts from rosters and holidays (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", help="Fecha inicial (YYYY-MM-DD), hoy por defecto"
+        )
+        parser.add_argument(
+            "--end",
+            help=f"Fecha final (YYYY-MM-DD), hoy + {HORIZON_DAYS} días por defecto",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        start = parse_date(options["start"]) if options["start"] else today
+        end = (
+            parse_date(options["end"])
+            if options["end"]
+            else today + timedelta(days=HORIZON_DAYS)
+        )
+        if start is None or end is None or end < start:
+            raise CommandError("Rango de fechas no válido")
+
+        created = build_expected_shifts(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{created} turnos previstos generados ({start} - {end})"
+            )
+        )
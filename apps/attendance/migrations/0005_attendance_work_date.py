@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-19 10:12
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_work_date(apps, schema_editor):
+    """Fills work_date with the hotel-time date of each existing check-in"""
+    Attendance = apps.get_model("attendance", "Attendance")
+    hotel_tz = timezone.get_default_timezone()
+
+    batch = []
+    for attendance in Attendance.objects.only("id", "check_in").iterator(
+        chunk_size=2000
+    ):
+        attendance.work_date = timezone.localtime(attendance.check_in, hotel_tz).date()
+        batch.append(attendance)
+        if len(batch) >= 2000:
+            Attendance.objects.bulk_update(batch, ["work_date"])
+            batch = []
+    if batch:
+        Attendance.objects.bulk_update(batch, ["work_date"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("attendance", "0004_remove_attendance_notes_alter_attendance_created_at"),
+        (
+            "employees",
+            "0006_employee_address_employee_birth_date_employee_dni_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attendance",
+            name="work_date",
+            field=models.DateField(editable=False, null=True, verbose_name="Work date"),
+        ),
+        migrations.RunPython(backfill_work_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="attendance",
+            name="work_date",
+            field=models.DateField(editable=False, verbose_name="Work date"),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["work_date", "status"], name="attendance__work_da_75e84e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["employee", "status", "work_date"],
+                name="attendance__employe_da3d08_idx",
+            ),
+        ),
+    ]
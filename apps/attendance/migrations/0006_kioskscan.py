@@ -0,0 +1,99 @@
+# Generated by Django 6.0 on 2026-10-19 00:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("attendance", "0005_attendance_work_date"),
+        (
+            "employees",
+            "0006_employee_address_employee_birth_date_employee_dni_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KioskScan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        blank=True,
+                        max_length=64,
+                        null=True,
+                        unique=True,
+                        verbose_name="Idempotency key",
+                    ),
+                ),
+                (
+                    "employee_number",
+                    models.CharField(max_length=20, verbose_name="Employee number"),
+                ),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[("check_in", "Check-in"), ("check_out", "Check-out")],
+                        max_length=20,
+                        verbose_name="Action",
+                    ),
+                ),
+                ("scanned_at", models.DateTimeField(verbose_name="Scanned at")),
+                (
+                    "result",
+                    models.CharField(
+                        choices=[
+                            ("checked_in", "Checked in"),
+                            ("checked_out", "Checked out"),
+                            ("already_checked_in", "Already checked in"),
+                            ("not_checked_in", "Not checked in"),
+                            ("unknown_employee", "Unknown employee"),
+                        ],
+                        max_length=20,
+                        verbose_name="Result",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "attendance",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="kiosk_scans",
+                        to="attendance.attendance",
+                        verbose_name="Attendance",
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="kiosk_scans",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Kiosk scan",
+                "verbose_name_plural": "Kiosk scans",
+                "ordering": ["-scanned_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,203 @@
+# Generated by Django 6.0 on 2026-10-19 00:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("attendance", "0006_kioskscan"),
+        (
+            "employees",
+            "0006_employee_address_employee_birth_date_employee_dni_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Holiday",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="Date")),
+                ("name", models.CharField(max_length=100, verbose_name="Name")),
+            ],
+            options={
+                "verbose_name": "Holiday",
+                "verbose_name_plural": "Holidays",
+                "ordering": ["date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Shift",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="Name")),
+                (
+                    "code",
+                    models.CharField(max_length=20, unique=True, verbose_name="Code"),
+                ),
+                ("start_time", models.TimeField(verbose_name="Start time")),
+                ("end_time", models.TimeField(verbose_name="End time")),
+                (
+                    "late_tolerance",
+                    models.PositiveSmallIntegerField(
+                        default=5, verbose_name="Late tolerance (minutes)"
+                    ),
+                ),
+                (
+                    "early_leave_tolerance",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Early leave tolerance (minutes)"
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="Active")),
+            ],
+            options={
+                "verbose_name": "Shift",
+                "verbose_name_plural": "Shifts",
+                "ordering": ["start_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Roster",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Monday"),
+                            (1, "Tuesday"),
+                            (2, "Wednesday"),
+                            (3, "Thursday"),
+                            (4, "Friday"),
+                            (5, "Saturday"),
+                            (6, "Sunday"),
+                        ],
+                        verbose_name="Weekday",
+                    ),
+                ),
+                ("valid_from", models.DateField(verbose_name="Valid from")),
+                (
+                    "valid_until",
+                    models.DateField(blank=True, null=True, verbose_name="Valid until"),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rosters",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="rosters",
+                        to="attendance.shift",
+                        verbose_name="Shift",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Roster",
+                "verbose_name_plural": "Rosters",
+                "ordering": ["employee", "weekday", "valid_from"],
+                "indexes": [
+                    models.Index(
+                        fields=["employee", "weekday"],
+                        name="attendance__employe_0cf1a4_idx",
+                    )
+                ],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            ("valid_until__isnull", True),
+                            ("valid_until__gte", models.F("valid_from")),
+                            _connector="OR",
+                        ),
+                        name="valid_roster_date_range",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ExpectedShift",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                ("starts_at", models.DateTimeField(verbose_name="Starts at")),
+                ("ends_at", models.DateTimeField(verbose_name="Ends at")),
+                ("late_after", models.DateTimeField(verbose_name="Late after")),
+                ("leave_before", models.DateTimeField(verbose_name="Leave before")),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="expected_shifts",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+                (
+                    "shift",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="expected_shifts",
+                        to="attendance.shift",
+                        verbose_name="Shift",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Expected shift",
+                "verbose_name_plural": "Expected shifts",
+                "ordering": ["date", "starts_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["date", "employee"], name="attendance__date_cf5819_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("employee", "date"),
+                        name="unique_expected_shift_per_day",
+                    )
+                ],
+            },
+        ),
+    ]
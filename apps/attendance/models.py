@@ -1,6 +1,9 @@
+from datetime import datetime, time, timedelta
+
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import F, Q
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.lookups import GreaterThan, IsNull, LessThan
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -8,6 +11,9 @@ from django.utils.translation import gettext_lazy as _
 class Attendance(models.Model):
     """Employee clock-in and clock-out records"""
 
+    # Check-ins at or after this hotel-local time are marked as late
+    LATE_AFTER = time(9, 0)
+
     class StatusChoices(models.TextChoices):
         PRESENT = "present", _("Present")
         LATE = "late", _("Late")
@@ -22,6 +28,9 @@ class Attendance(models.Model):
     )
     check_in = models.DateTimeField(_("Check-in time"), default=timezone.now)
     check_out = models.DateTimeField(_("Check-out time"), null=True, blank=True)
+    # Business date of the shift in the hotel time zone, stored so date
+    # filters hit an index instead of casting check_in on every row
+    work_date = models.DateField(_("Work date"), editable=False)
     status = models.CharField(
         _("Status"),
         max_length=20,
@@ -37,6 +46,8 @@ class Attendance(models.Model):
         indexes = [
             models.Index(fields=["employee", "-check_in"]),
             models.Index(fields=["check_in"]),
+            models.Index(fields=["work_date", "status"]),
+            models.Index(fields=["employee", "status", "work_date"]),
         ]
         constraints = [
             # Only one open attendance per employee
@@ -56,6 +67,19 @@ class Attendance(models.Model):
     def __str__(self):
         return f"{self.employee.get_full_name()} - {self.check_in.strftime('%d/%m/%Y %H:%M')}"
 
+    def save(self, *args, **kwargs):
+        self.work_date = self.business_date(self.check_in)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "check_in" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "work_date"}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def business_date(moment=None):
+        """Returns the hotel (Europe/Madrid) date for a timestamp"""
+        moment = moment or timezone.now()
+        return timezone.localtime(moment, timezone.get_default_timezone()).date()
+
     @property
     def duration(self):
         """Calculates shift duration"""
@@ -79,21 +103,39 @@ class Attendance(models.Model):
         return False
 
     @classmethod
-    def create_check_in(cls, employee):
+    def status_for_check_in(cls, check_in, expected=None):
+        """
+        Status a new attendance gets, computed before it is inserted. Late
+        means after the rostered shift's tolerance; employees without a
+        rostered shift that day fall back to LATE_AFTER.
+        """
+        if expected is not None:
+            late = check_in > expected.late_after
+        else:
+            local_time = timezone.localtime(check_in, timezone.get_default_timezone())
+            late = local_time.time() >= cls.LATE_AFTER
+        return cls.StatusChoices.LATE if late else cls.StatusChoices.PRESENT
+
+    @classmethod
+    def create_check_in(cls, employee, check_in=None):
         """Creates check-in attendance"""
-        # Verify there isn't any attendance already open
-        open_attendance = cls.objects.filter(
-            employee=employee, check_out__isnull=True
+        check_in = check_in or timezone.now()
+        expected = ExpectedShift.objects.filter(
+            employee=employee, date=cls.business_date(check_in)
         ).first()
 
-        if open_attendance:
+        # The unique_open_attendance_per_employee constraint rejects a second
+        # open attendance, so there is no need to look for one beforehand
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    employee=employee,
+                    check_in=check_in,
+                    status=cls.status_for_check_in(check_in, expected),
+                )
+        except IntegrityError:
             raise ValidationError(_("Employee already has an open attendance"))
 
-        return cls.objects.create(
-            employee=employee,
-            check_in=timezone.now(),
-        )
-
     def process_check_out(self):
         """Processes check-out"""
         if self.check_out:
@@ -101,3 +143,297 @@ class Attendance(models.Model):
 
         self.check_out = timezone.now()
         self.save()
+
+
+class KioskScan(models.Model):
+    """Badge scans received from clock-in kiosks, kept for idempotency and audit"""
+
+    class ActionChoices(models.TextChoices):
+        CHECK_IN = "check_in", _("Check-in")
+        CHECK_OUT = "check_out", _("Check-out")
+
+    class ResultChoices(models.TextChoices):
+        CHECKED_IN = "checked_in", _("Checked in")
+        CHECKED_OUT = "checked_out", _("Checked out")
+        ALREADY_CHECKED_IN = "already_checked_in", _("Already checked in")
+        NOT_CHECKED_IN = "not_checked_in", _("Not checked in")
+        UNKNOWN_EMPLOYEE = "unknown_employee", _("Unknown employee")
+
+    idempotency_key = models.CharField(
+        _("Idempotency key"), max_length=64, unique=True, null=True, blank=True
+    )
+    employee_number = models.CharField(_("Employee number"), max_length=20)
+    employee = models.ForeignKey(
+        "employees.Employee",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="kiosk_scans",
+        verbose_name=_("Employee"),
+    )
+    action = models.CharField(_("Action"), max_length=20, choices=ActionChoices.choices)
+    scanned_at = models.DateTimeField(_("Scanned at"))
+    result = models.CharField(_("Result"), max_length=20, choices=ResultChoices.choices)
+    attendance = models.ForeignKey(
+        Attendance,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="kiosk_scans",
+        verbose_name=_("Attendance"),
+    )
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Kiosk scan")
+        verbose_name_plural = _("Kiosk scans")
+        ordering = ["-scanned_at"]
+
+    def __str__(self):
+        return f"{self.employee_number} - {self.get_action_display()} ({self.get_result_display()})"
+
+
+class Shift(models.Model):
+    """Working shift template, e.g. morning 07:00-15:00"""
+
+    name = models.CharField(_("Name"), max_length=100)
+    code = models.CharField(_("Code"), max_length=20, unique=True)
+    start_time = models.TimeField(_("Start time"))
+    # An end time earlier than the start time means the shift ends next day
+    end_time = models.TimeField(_("End time"))
+    late_tolerance = models.PositiveSmallIntegerField(
+        _("Late tolerance (minutes)"), default=5
+    )
+    early_leave_tolerance = models.PositiveSmallIntegerField(
+        _("Early leave tolerance (minutes)"), default=0
+    )
+    is_active = models.BooleanField(_("Active"), default=True)
+
+    class Meta:
+        verbose_name = _("Shift")
+        verbose_name_plural = _("Shifts")
+        ordering = ["start_time"]
+
+    def __str__(self):
+        return f"{self.name} ({self.start_time:%H:%M}-{self.end_time:%H:%M})"
+
+    @property
+    def crosses_midnight(self):
+        return self.end_time <= self.start_time
+
+    def bounds(self, day):
+        """Aware start and end datetimes of this shift on a given date"""
+        tz = timezone.get_default_timezone()
+        starts_at = timezone.make_aware(datetime.combine(day, self.start_time), tz)
+        end_day = day + timedelta(days=1) if self.crosses_midnight else day
+        ends_at = timezone.make_aware(datetime.combine(end_day, self.end_time), tz)
+        return starts_at, ends_at
+
+
+class Roster(models.Model):
+    """Weekly shift pattern of an employee"""
+
+    class WeekdayChoices(models.IntegerChoices):
+        MONDAY = 0, _("Monday")
+        TUESDAY = 1, _("Tuesday")
+        WEDNESDAY = 2, _("Wednesday")
+        THURSDAY = 3, _("Thursday")
+        FRIDAY = 4, _("Friday")
+        SATURDAY = 5, _("Saturday")
+        SUNDAY = 6, _("Sunday")
+
+    employee = models.ForeignKey(
+        "employees.Employee",
+        on_delete=models.CASCADE,
+        related_name="rosters",
+        verbose_name=_("Employee"),
+    )
+    shift = models.ForeignKey(
+        Shift,
+        on_delete=models.PROTECT,
+        related_name="rosters",
+        verbose_name=_("Shift"),
+    )
+    weekday = models.PositiveSmallIntegerField(
+        _("Weekday"), choices=WeekdayChoices.choices
+    )
+    valid_from = models.DateField(_("Valid from"))
+    valid_until = models.DateField(_("Valid until"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Roster")
+        verbose_name_plural = _("Rosters")
+        ordering = ["employee", "weekday", "valid_from"]
+        indexes = [
+            models.Index(fields=["employee", "weekday"]),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(valid_until__isnull=True)
+                | Q(valid_until__gte=F("valid_from")),
+                name="valid_roster_date_range",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.get_weekday_display()}: {self.shift}"
+
+
+class Holiday(models.Model):
+    """Public holidays; nobody is expected to work on them"""
+
+    date = models.DateField(_("Date"), unique=True)
+    name = models.CharField(_("Name"), max_length=100)
+
+    class Meta:
+        verbose_name = _("Holiday")
+        verbose_name_plural = _("Holidays")
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Moving a holiday must rebuild the shifts of the date it leaves
+        instance.loaded_date = instance.__dict__.get("date")
+        return instance
+
+
+class ExpectedShiftQuerySet(models.QuerySet):
+    @staticmethod
+    def _outcome_expressions():
+        """Attendance clocked in during the shift and approved leave covering it"""
+        from apps.leave.models import Leave
+
+        # By check-in time, not work_date: a night shift may be clocked in
+        # after midnight
+        worked = Attendance.objects.filter(
+            employee=OuterRef("employee"),
+            check_in__gte=OuterRef("starts_at") - ExpectedShift.EARLY_CHECK_IN,
+            check_in__lt=OuterRef("ends_at"),
+        )
+        return {
+            "first_check_in": Subquery(
+                worked.order_by("check_in").values("check_in")[:1]
+            ),
+            "last_check_out": Subquery(
+                worked.filter(check_out__isnull=False)
+                .order_by("-check_out")
+                .values("check_out")[:1]
+            ),
+            "on_leave": Exists(
+                Leave.objects.filter(
+                    employee=OuterRef("employee"),
+                    status=Leave.StatusChoices.APPROVED,
+                    start_date__lte=OuterRef("date"),
+                    end_date__gte=OuterRef("date"),
+                )
+            ),
+        }
+
+    @classmethod
+    def _outcome_conditions(cls, now):
+        worked = cls._outcome_expressions()
+        return {
+            "late": GreaterThan(worked["first_check_in"], F("late_after")),
+            "absent": Q(
+                IsNull(worked["first_check_in"], True),
+                ~worked["on_leave"],
+                late_after__lte=now,
+            ),
+            "left_early": LessThan(worked["last_check_out"], F("leave_before")),
+            "on_leave": worked["on_leave"],
+        }
+
+    def with_outcomes(self):
+        """
+        Annotates every expected shift with the attendance clocked in for it
+        and whether it was covered by an approved leave
+        """
+        return self.annotate(**self._outcome_expressions())
+
+    def late(self):
+        return self.filter(self._outcome_conditions(None)["late"])
+
+    def absent(self, now=None):
+        """Shifts past their tolerance with no attendance and no leave"""
+        return self.filter(self._outcome_conditions(now or timezone.now())["absent"])
+
+    def left_early(self):
+        return self.filter(self._outcome_conditions(None)["left_early"])
+
+    def outcome_counts(self, now=None):
+        """Counts of every outcome in one aggregate query"""
+        conditions = self._outcome_conditions(now or timezone.now())
+        return self.aggregate(
+            expected=Count("pk"),
+            **{
+                outcome: Count("pk", filter=condition)
+                for outcome, condition in conditions.items()
+            },
+        )
+
+
+class ExpectedShift(models.Model):
+    """
+    Shift an employee is rostered for on a given date, precomputed from the
+    rosters and the holiday calendar so attendance can be checked against it
+    with set-based queries
+    """
+
+    # How early before the start a check-in still counts for the shift
+    EARLY_CHECK_IN = timedelta(hours=2)
+
+    employee = models.ForeignKey(
+        "employees.Employee",
+        on_delete=models.CASCADE,
+        related_name="expected_shifts",
+        verbose_name=_("Employee"),
+    )
+    shift = models.ForeignKey(
+        Shift,
+        on_delete=models.CASCADE,
+        related_name="expected_shifts",
+        verbose_name=_("Shift"),
+    )
+    date = models.DateField(_("Date"))
+    starts_at = models.DateTimeField(_("Starts at"))
+    ends_at = models.DateTimeField(_("Ends at"))
+    # Check-ins after this moment are late
+    late_after = models.DateTimeField(_("Late after"))
+    # Check-outs before this moment are early leaves
+    leave_before = models.DateTimeField(_("Leave before"))
+
+    objects = ExpectedShiftQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Expected shift")
+        verbose_name_plural = _("Expected shifts")
+        ordering = ["date", "starts_at"]
+        indexes = [
+            models.Index(fields=["date", "employee"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "date"], name="unique_expected_shift_per_day"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.date}: {self.shift}"
+
+    @classmethod
+    def from_roster(cls, roster, day):
+        starts_at, ends_at = roster.shift.bounds(day)
+        return cls(
+            employee_id=roster.employee_id,
+            shift=roster.shift,
+            date=day,
+            starts_at=starts_at,
+            ends_at=ends_at,
+            late_after=starts_at + timedelta(minutes=roster.shift.late_tolerance),
+            leave_before=ends_at
+            - timedelta(minutes=roster.shift.early_leave_tolerance),
+        )
@@ -0,0 +1,117 @@
+# apps/attendance/presence.py
+"""
+Who is clocked in right now, kept in the shared cache.
+
+The cache holds one map {employee_id: open attendance id}. It is rebuilt
+from the database with a single query on a miss, so presence lookups for
+a whole team cost no SQL. Clock-ins and clock-outs bump the version in
+the cache key once their transaction commits instead of patching the map:
+workers never overwrite each other's changes, a rolled back clock-in never
+shows up, and a reader that queried before the commit can only store its
+map under the old version, which nobody reads any more. Until the commit,
+the transaction that made the changes reads presence from the database.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_KEY = "attendance:presence"
+VERSION_KEY = "attendance:presence:version"
+CACHE_TIMEOUT = 60 * 5
+
+
+def _query():
+    from .models import Attendance
+
+    return dict(
+        Attendance.objects.filter(check_out__isnull=True).values_list(
+            "employee_id", "pk"
+        )
+    )
+
+
+def _new_version():
+    # Unique across restarts, so a version lost from the cache is not reused
+    cache.add(VERSION_KEY, time.time_ns(), None)
+
+
+def cache_key():
+    """Key of the map for the current version"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        _new_version()
+        version = cache.get(VERSION_KEY)
+    return f"{CACHE_KEY}:{version}"
+
+
+def _load(key):
+    present = _query()
+    cache.set(key, present, CACHE_TIMEOUT)
+    return present
+
+
+def _changed_here():
+    """Whether the open transaction has clocked someone in or out"""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        # Committed or rolled back since
+        connection.presence_changed = False
+    return getattr(connection, "presence_changed", False)
+
+
+def present_map():
+    """{employee_id: open attendance id} for everyone clocked in"""
+    if _changed_here():
+        # Sees its own uncommitted clock-ins without sharing them
+        return _query()
+    # The version is read before querying, so the map is never older than it
+    key = cache_key()
+    present = cache.get(key)
+    if present is None:
+        present = _load(key)
+    return present
+
+
+def present_ids():
+    return set(present_map())
+
+
+def is_present(employee_id):
+    return employee_id in present_map()
+
+
+def present_in(employee_ids):
+    """Subset of the given employees that is clocked in"""
+    if hasattr(employee_ids, "values_list"):
+        employee_ids = employee_ids.values_list("pk", flat=True)
+    present = present_map()
+    return {pk for pk in employee_ids if pk in present}
+
+
+def count_present(employee_ids=None):
+    """Employees clocked in, overall or among the given ones"""
+    if employee_ids is None:
+        return len(present_map())
+    return len(present_in(employee_ids))
+
+
+def invalidate():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        _new_version()
+
+
+def _committed():
+    transaction.get_connection().presence_changed = False
+    invalidate()
+
+
+def changed():
+    """Moves to a new map version once the current transaction commits"""
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        connection.presence_changed = True
+    transaction.on_commit(_committed)
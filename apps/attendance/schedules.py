@@ -0,0 +1,87 @@
+# apps/attendance/schedules.py
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ExpectedShift, Holiday, Roster
+
+# How far ahead expected shifts are kept precomputed
+HORIZON_DAYS = 60
+
+BATCH_SIZE = 1000
+
+
+def build_expected_shifts(start_date, end_date, employees=None):
+    """
+    (Re)generates the expected shifts of a date range from the rosters and
+    the holiday calendar. `employees` may be None (whole staff) or a list of
+    ids / queryset. Returns the number of expected shifts created.
+    """
+    rosters = Roster.objects.filter(valid_from__lte=end_date).filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gte=start_date),
+        shift__is_active=True,
+    )
+    expected = ExpectedShift.objects.filter(date__gte=start_date, date__lte=end_date)
+    if employees is not None:
+        rosters = rosters.filter(employee__in=employees)
+        expected = expected.filter(employee__in=employees)
+
+    holidays = set(
+        Holiday.objects.filter(date__gte=start_date, date__lte=end_date).values_list(
+            "date", flat=True
+        )
+    )
+
+    by_weekday = {}
+    # Ordered by valid_from so the most recent roster of a weekday wins
+    for roster in rosters.select_related("shift").order_by("valid_from"):
+        by_weekday.setdefault(roster.weekday, []).append(roster)
+
+    shifts = {}
+    day = start_date
+    while day <= end_date:
+        if day not in holidays:
+            for roster in by_weekday.get(day.weekday(), []):
+                if roster.valid_from <= day and (
+                    roster.valid_until is None or day <= roster.valid_until
+                ):
+                    shifts[roster.employee_id, day] = roster
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        expected.delete()
+        ExpectedShift.objects.bulk_create(
+            [
+                ExpectedShift.from_roster(roster, day)
+                for (_, day), roster in shifts.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return len(shifts)
+
+
+def rebuild_upcoming(employees=None, start_date=None):
+    """Regenerates the expected shifts from today (or start_date) to the horizon"""
+    today = timezone.localdate()
+    start_date = max(start_date or today, today)
+    return build_expected_shifts(
+        start_date, today + timedelta(days=HORIZON_DAYS), employees
+    )
+
+
+def expected_shifts_for(pairs):
+    """{(employee_id, date): ExpectedShift} for (employee_id, date) pairs, one query"""
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    employee_ids = {employee_id for employee_id, _ in pairs}
+    dates = {day for _, day in pairs}
+    return {
+        (shift.employee_id, shift.date): shift
+        for shift in ExpectedShift.objects.filter(
+            employee_id__in=employee_ids, date__in=dates
+        )
+        if (shift.employee_id, shift.date) in pairs
+    }
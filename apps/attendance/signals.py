@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import presence
+from .models import Attendance, Holiday, Roster, Shift
+from .schedules import build_expected_shifts, rebuild_upcoming
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def update_presence(sender, instance, **kwargs):
+    # Keeps the "who is in now" cache in step with every saved attendance
+    presence.changed()
+
+
+@receiver(post_save, sender=Roster)
+@receiver(post_delete, sender=Roster)
+def rebuild_roster_shifts(sender, instance, **kwargs):
+    # Past expected shifts are history, only upcoming ones follow the roster
+    rebuild_upcoming(employees=[instance.employee_id])
+
+
+@receiver(post_save, sender=Shift)
+def rebuild_shift_rosters(sender, instance, created, **kwargs):
+    if not created:
+        rebuild_upcoming(
+            employees=instance.rosters.values_list("employee_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def rebuild_holiday_shifts(sender, instance, **kwargs):
+    today = timezone.localdate()
+    # Both the new date and, when it was moved, the one it left
+    for day in {instance.date, getattr(instance, "loaded_date", None)} - {None}:
+        if day >= today:
+            build_expected_shifts(day, day)
+    instance.loaded_date = instance.date
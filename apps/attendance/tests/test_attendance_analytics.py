@@ -0,0 +1,106 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from apps.attendance.analytics import attendance_buckets, attendance_totals
+from apps.attendance.models import Attendance, Roster, Shift
+from apps.attendance.schedules import build_expected_shifts
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+MADRID = ZoneInfo("Europe/Madrid")
+
+
+class AttendanceAnalyticsTest(TestCase):
+    """Tests para las estadísticas agregadas de asistencia"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="jperez"),
+            department=self.department,
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+
+    def _shift(self, day, start_hour, hours, status="present"):
+        check_in = datetime(day.year, day.month, day.day, start_hour, tzinfo=MADRID)
+        return Attendance.objects.create(
+            employee=self.employee,
+            check_in=check_in,
+            check_out=check_in + timedelta(hours=hours),
+            status=status,
+        )
+
+    def test_daily_buckets(self):
+        """Agrupa por día sumando horas y horas extra en la base de datos"""
+        self._shift(date(2026, 3, 2), 8, 9)
+        self._shift(date(2026, 3, 3), 10, 6, status="late")
+
+        # Turno de mañana de lunes a viernes: el miércoles 4 no fichó
+        shift = Shift.objects.create(
+            name="Mañana", code="M", start_time=time(8), end_time=time(16)
+        )
+        for weekday in range(5):
+            Roster.objects.create(
+                employee=self.employee,
+                shift=shift,
+                weekday=weekday,
+                valid_from=date(2026, 1, 1),
+            )
+        build_expected_shifts(date(2026, 3, 2), date(2026, 3, 4))
+
+        days = attendance_buckets(
+            date(2026, 3, 2), date(2026, 3, 4), employees=self.employee
+        )
+
+        self.assertEqual([day["present"] for day in days], [1, 1, 0])
+        self.assertEqual([day["late"] for day in days], [0, 1, 0])
+        self.assertEqual([day["absent"] for day in days], [0, 0, 1])
+        self.assertEqual(days[0]["hours"], timedelta(hours=9))
+        self.assertEqual(days[0]["overtime"], timedelta(hours=1))
+        self.assertEqual(days[1]["overtime"], timedelta())
+
+    def test_weekly_buckets_single_query(self):
+        """Un rango de varias semanas se resuelve con dos consultas agrupadas"""
+        self._shift(date(2026, 3, 2), 8, 8)
+        self._shift(date(2026, 3, 10), 8, 8)
+
+        # Asistencias + ausencias sobre los turnos previstos
+        with self.assertNumQueries(2):
+            weeks = attendance_buckets(
+                date(2026, 3, 2), date(2026, 3, 15), [self.employee.pk], "week"
+            )
+
+        self.assertEqual(
+            [week["start"] for week in weeks], [date(2026, 3, 2), date(2026, 3, 9)]
+        )
+        self.assertEqual([week["hours"] for week in weeks], [timedelta(hours=8)] * 2)
+
+    def test_totals(self):
+        """Los totales incluyen la media de horas por turno"""
+        self._shift(date(2026, 3, 2), 8, 8)
+        self._shift(date(2026, 3, 3), 8, 6)
+
+        totals = attendance_totals(
+            date(2026, 3, 1), date(2026, 3, 31), employees=self.employee
+        )
+
+        self.assertEqual(totals["closed"], 2)
+        self.assertEqual(totals["hours"], timedelta(hours=14))
+        self.assertEqual(totals["average"], timedelta(hours=7))
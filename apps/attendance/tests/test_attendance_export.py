@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.attendance.models import Attendance
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+MADRID = ZoneInfo("Europe/Madrid")
+
+
+class AttendanceExportTest(TestCase):
+    """Tests para la descarga del historial de asistencia"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        department = Department.objects.create(name="Recepción", code="REC")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="recepcionista"),
+            department=department,
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+        for day in (2, 3):
+            check_in = datetime(2026, 3, day, 9, tzinfo=MADRID)
+            Attendance.objects.create(
+                employee=self.employee,
+                check_in=check_in,
+                check_out=check_in + timedelta(hours=8),
+            )
+        self.client.force_login(self.employee.user)
+        self.url = reverse("attendance:history-export")
+
+    def _rows(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        # Sin la cabecera
+        return lines[1:]
+
+    def test_export_filtered_by_dates(self):
+        """Las fechas válidas filtran las filas descargadas"""
+        self.assertEqual(len(self._rows({})), 2)
+        self.assertEqual(len(self._rows({"start_date": "2026-03-03"})), 1)
+
+    def test_invalid_dates_ignored(self):
+        """Fechas mal escritas o imposibles no rompen la descarga"""
+        for value in ("foo", "2026-02-30"):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    len(self._rows({"start_date": value, "end_date": value})), 2
+                )
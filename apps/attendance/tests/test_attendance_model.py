@@ -0,0 +1,56 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from apps.attendance.models import Attendance
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+
+class AttendanceModelTest(TestCase):
+    """Tests para el modelo Attendance"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="jperez"),
+            department=self.department,
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+
+    def test_work_date_uses_hotel_time_zone(self):
+        """Un fichaje a las 23:30 UTC pertenece al día siguiente en Madrid"""
+        attendance = Attendance.objects.create(
+            employee=self.employee,
+            check_in=datetime(2026, 3, 9, 23, 30, tzinfo=dt_timezone.utc),
+        )
+
+        self.assertEqual(attendance.work_date.isoformat(), "2026-03-10")
+
+    def test_work_date_follows_check_in_updates(self):
+        """Si se corrige la hora de entrada, la fecha laboral se recalcula"""
+        attendance = Attendance.objects.create(
+            employee=self.employee,
+            check_in=datetime(2026, 3, 9, 8, 0, tzinfo=dt_timezone.utc),
+        )
+        attendance.check_in = datetime(2026, 3, 8, 8, 0, tzinfo=dt_timezone.utc)
+        attendance.save(update_fields=["check_in"])
+
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.work_date.isoformat(), "2026-03-08")
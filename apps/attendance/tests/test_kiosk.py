@@ -0,0 +1,143 @@
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.attendance.kiosk import ScanError, parse_scans, process_scans
+from apps.attendance.models import Attendance, KioskScan
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+MADRID = ZoneInfo("Europe/Madrid")
+
+
+class KioskScanTest(TestCase):
+    """Tests para el fichaje por lotes desde el kiosco"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Limpieza", code="LIM")
+        self.employees = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=f"camarero{i}"),
+                department=self.department,
+                role=Employee.RoleChoices.HOUSEKEEPER,
+                employee_number=f"E{i:03d}",
+            )
+            for i in range(20)
+        ]
+
+    def _scan(self, number, hour, minute=0, **extra):
+        moment = datetime(2026, 3, 2, hour, minute, tzinfo=MADRID)
+        return {"employee_number": number, "timestamp": moment.isoformat(), **extra}
+
+    def test_batch_check_in_constant_queries(self):
+        """Un lote de fichajes se procesa con un número fijo de consultas"""
+        payload = [self._scan(emp.employee_number, 8, 55) for emp in self.employees]
+        scans = parse_scans(payload)
+
+        # savepoint + empleados + turnos previstos + insert + abiertas + log + release
+        with self.assertNumQueries(7):
+            process_scans(scans)
+
+        self.assertEqual(Attendance.objects.filter(check_out__isnull=True).count(), 20)
+        self.assertTrue(all(scan.result == "checked_in" for scan in scans))
+
+    def test_status_computed_before_insert(self):
+        """El retraso se calcula con la hora local del hotel"""
+        scans = process_scans(parse_scans([self._scan("E000", 9, 5)]))
+
+        attendance = Attendance.objects.get(pk=scans[0].attendance_id)
+        self.assertEqual(attendance.status, Attendance.StatusChoices.LATE)
+
+    def test_already_checked_in_uses_constraint(self):
+        """Un segundo fichaje de entrada no abre otra asistencia"""
+        process_scans(parse_scans([self._scan("E000", 8)]))
+        scans = process_scans(parse_scans([self._scan("E000", 8, 30)]))
+
+        self.assertEqual(scans[0].result, "already_checked_in")
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_idempotency_key_replay(self):
+        """Reenviar el mismo fichaje devuelve el resultado original"""
+        payload = [self._scan("E000", 8, idempotency_key="kiosk-1-0001")]
+        first = process_scans(parse_scans(payload))
+        second = process_scans(parse_scans(payload))
+
+        self.assertEqual(second[0].result, "checked_in")
+        self.assertTrue(second[0].replayed)
+        self.assertEqual(second[0].attendance_id, first[0].attendance_id)
+        self.assertEqual(KioskScan.objects.count(), 1)
+
+    def test_check_out(self):
+        """El fichaje de salida cierra la asistencia abierta"""
+        process_scans(parse_scans([self._scan("E000", 8)]))
+        scans = process_scans(parse_scans([self._scan("E000", 16, action="check_out")]))
+
+        self.assertEqual(scans[0].result, "checked_out")
+        attendance = Attendance.objects.get()
+        self.assertEqual(attendance.check_out.astimezone(MADRID).hour, 16)
+
+    def test_check_in_after_check_out_in_same_batch(self):
+        """Una entrada posterior a una salida del mismo lote abre otra asistencia"""
+        process_scans(parse_scans([self._scan("E000", 8)]))
+        scans = process_scans(
+            parse_scans(
+                [
+                    self._scan("E000", 18, action="check_out"),
+                    self._scan("E000", 14),
+                    self._scan("E000", 13, action="check_out"),
+                ]
+            )
+        )
+
+        self.assertEqual(
+            [scan.result for scan in scans],
+            ["checked_out", "checked_in", "checked_out"],
+        )
+        self.assertEqual(Attendance.objects.count(), 2)
+        self.assertFalse(Attendance.objects.filter(check_out__isnull=True).exists())
+        afternoon = Attendance.objects.get(pk=scans[1].attendance_id)
+        self.assertEqual(afternoon.check_out.astimezone(MADRID).hour, 18)
+
+    def test_unknown_employee(self):
+        scans = process_scans(parse_scans([self._scan("X999", 8)]))
+
+        self.assertEqual(scans[0].result, "unknown_employee")
+
+    def test_invalid_payload(self):
+        with self.assertRaises(ScanError):
+            parse_scans([{"timestamp": "2026-03-02T08:00:00"}])
+
+    @override_settings(KIOSK_API_TOKEN="secreto")
+    def test_endpoint_requires_token(self):
+        url = reverse("attendance:kiosk-scans")
+        body = json.dumps({"scans": [self._scan("E000", 8)]})
+
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.post(
+            url,
+            body,
+            content_type="application/json",
+            headers={"Authorization": "Bearer secreto"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["result"], "checked_in")
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.attendance import presence
+from apps.attendance.kiosk import parse_scans, process_scans
+from apps.attendance.models import Attendance
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+
+class PresenceTest(TestCase):
+    """Tests para la caché de empleados fichados"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        cache.clear()
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employees = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=f"recepcionista{i}"),
+                department=self.department,
+                role=Employee.RoleChoices.RECEPTIONIST,
+                employee_number=f"R{i:03d}",
+            )
+            for i in range(3)
+        ]
+
+    def test_rebuilt_on_miss_then_no_queries(self):
+        """La caché se reconstruye con una consulta y luego no hace falta SQL"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employee=self.employees[0])
+
+        with self.assertNumQueries(1):
+            self.assertTrue(presence.is_present(self.employees[0].pk))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.employees[1].is_checked_in())
+            ids = [employee.pk for employee in self.employees]
+            self.assertEqual(presence.present_in(ids), {self.employees[0].pk})
+            self.assertEqual(presence.count_present(), 1)
+
+    def test_updated_on_check_in_and_out(self):
+        """Fichar la entrada y la salida renueva la caché al confirmar"""
+        employee = self.employees[1]
+        presence.present_map()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance = Attendance.create_check_in(employee)
+        with self.assertNumQueries(1):
+            self.assertTrue(employee.is_checked_in())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance.process_check_out()
+        self.assertFalse(employee.is_checked_in())
+        with self.assertNumQueries(0):
+            self.assertFalse(employee.is_checked_in())
+
+    def test_rolled_back_check_in_is_not_present(self):
+        """Una entrada deshecha no llega a la caché"""
+        employee = self.employees[0]
+        presence.present_map()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    Attendance.create_check_in(employee)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(presence.is_present(employee.pk))
+
+    def test_own_transaction_sees_its_check_in(self):
+        """Quien ficha ve su entrada antes de confirmar, sin compartirla"""
+        employee = self.employees[0]
+        presence.present_map()
+
+        Attendance.create_check_in(employee)
+
+        self.assertTrue(employee.is_checked_in())
+        self.assertEqual(cache.get(presence.cache_key()), {})
+
+    def test_closing_old_attendance_keeps_presence(self):
+        """Editar una asistencia antigua no saca al empleado de la caché"""
+        employee = self.employees[0]
+        now = timezone.now()
+        old = Attendance.objects.create(
+            employee=employee,
+            check_in=now - timedelta(days=1, hours=8),
+            check_out=now - timedelta(days=1),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(employee=employee, check_in=now)
+        presence.present_map()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            old.save()
+
+        self.assertTrue(presence.is_present(employee.pk))
+
+    def test_kiosk_batches_update_cache(self):
+        """Los fichajes del kiosco también renuevan la caché"""
+        presence.present_map()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_scans(
+                parse_scans([{"employee_number": "R000"}, {"employee_number": "R002"}])
+            )
+
+        self.assertEqual(presence.count_present(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(presence.count_present(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_scans(
+                parse_scans([{"employee_number": "R000", "action": "check_out"}])
+            )
+
+        self.assertEqual(presence.present_ids(), {self.employees[2].pk})
+
+    def test_stale_map_not_cached_after_commit(self):
+        """Un mapa leído antes de confirmar no se guarda para los demás"""
+        employee = self.employees[0]
+        key = presence.cache_key()
+        stale = presence._query()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.create_check_in(employee)
+        # Un lector lento guarda el mapa que consultó antes del commit
+        cache.set(key, stale)
+
+        self.assertTrue(presence.is_present(employee.pk))
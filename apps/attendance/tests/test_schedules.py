@@ -0,0 +1,181 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.attendance.models import Attendance, ExpectedShift, Holiday, Roster, Shift
+from apps.attendance.schedules import build_expected_shifts
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.models import Leave
+
+MADRID = ZoneInfo("Europe/Madrid")
+
+# Semana del lunes 2 al domingo 8 de marzo de 2026
+MONDAY = date(2026, 3, 2)
+SUNDAY = date(2026, 3, 8)
+
+
+def local(day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=MADRID)
+
+
+class ExpectedShiftTest(TestCase):
+    """Tests para los turnos previstos y la detección de retrasos y ausencias"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="recepcion"),
+            department=self.department,
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+        self.morning = Shift.objects.create(
+            name="Mañana",
+            code="M",
+            start_time=time(7),
+            end_time=time(15),
+            late_tolerance=5,
+            early_leave_tolerance=10,
+        )
+        self.night = Shift.objects.create(
+            name="Noche", code="N", start_time=time(23), end_time=time(7)
+        )
+        for weekday in range(5):
+            self._roster(self.morning, weekday)
+
+    @property
+    def week(self):
+        # Crear turnos fijos genera también los de los próximos días
+        return ExpectedShift.objects.filter(date__gte=MONDAY, date__lte=SUNDAY)
+
+    def _roster(self, shift, weekday, valid_from=date(2026, 1, 1)):
+        return Roster.objects.create(
+            employee=self.employee,
+            shift=shift,
+            weekday=weekday,
+            valid_from=valid_from,
+        )
+
+    def _attendance(self, check_in, check_out=None):
+        return Attendance.objects.create(
+            employee=self.employee, check_in=check_in, check_out=check_out
+        )
+
+    def test_build_from_rosters_and_holidays(self):
+        """Se generan los turnos de lunes a viernes salvo los festivos"""
+        Holiday.objects.create(date=MONDAY + timedelta(days=3), name="Festivo local")
+
+        created = build_expected_shifts(MONDAY, MONDAY + timedelta(days=6))
+
+        self.assertEqual(created, 4)
+        self.assertEqual(
+            list(self.week.values_list("date", flat=True)),
+            [MONDAY + timedelta(days=offset) for offset in (0, 1, 2, 4)],
+        )
+        expected = self.week.get(date=MONDAY)
+        self.assertEqual(expected.late_after, local(MONDAY, 7, 5))
+        self.assertEqual(expected.leave_before, local(MONDAY, 14, 50))
+
+    def test_latest_roster_wins_and_night_shift_ends_next_day(self):
+        """El turno más reciente prevalece y el de noche acaba al día siguiente"""
+        self._roster(self.night, 0, valid_from=date(2026, 3, 1))
+
+        build_expected_shifts(MONDAY, MONDAY)
+
+        expected = self.week.get()
+        self.assertEqual(expected.shift, self.night)
+        self.assertEqual(expected.ends_at, local(MONDAY + timedelta(days=1), 7))
+
+    def test_outcomes_in_one_query(self):
+        """Retrasos, ausencias y salidas anticipadas en una sola consulta"""
+        build_expected_shifts(MONDAY, MONDAY + timedelta(days=4))
+        self._attendance(local(MONDAY, 6, 55), local(MONDAY, 15))
+        self._attendance(local(MONDAY + timedelta(days=1), 7, 20))
+        self._attendance(
+            local(MONDAY + timedelta(days=2), 7), local(MONDAY + timedelta(days=2), 13)
+        )
+        # Jueves sin fichar, viernes de vacaciones aprobadas
+        Leave.objects.create(
+            employee=self.employee,
+            leave_type=Leave.LeaveTypeChoices.VACATION,
+            start_date=MONDAY + timedelta(days=4),
+            end_date=MONDAY + timedelta(days=4),
+            reason="Viaje",
+            status=Leave.StatusChoices.APPROVED,
+        )
+
+        with self.assertNumQueries(1):
+            counts = self.week.filter(
+                employee__department=self.department
+            ).outcome_counts(now=local(MONDAY + timedelta(days=7), 0))
+
+        self.assertEqual(
+            counts,
+            {"expected": 5, "late": 1, "absent": 1, "left_early": 1, "on_leave": 1},
+        )
+        absent = self.week.absent(now=local(MONDAY + timedelta(days=7), 0))
+        self.assertEqual(absent.get().date, MONDAY + timedelta(days=3))
+
+    def test_absent_only_after_tolerance(self):
+        """Un turno que aún no ha empezado no cuenta como ausencia"""
+        build_expected_shifts(MONDAY, MONDAY)
+
+        self.assertFalse(self.week.absent(now=local(MONDAY, 7, 4)).exists())
+        self.assertTrue(self.week.absent(now=local(MONDAY, 7, 6)).exists())
+
+    def test_check_in_status_follows_roster(self):
+        """El retraso se calcula con el turno asignado, no con las 9:00"""
+        build_expected_shifts(MONDAY, MONDAY + timedelta(days=6))
+
+        late = Attendance.create_check_in(self.employee, check_in=local(MONDAY, 7, 30))
+        self.assertEqual(late.status, Attendance.StatusChoices.LATE)
+        late.check_out = local(MONDAY, 15)
+        late.save()
+
+        # Sábado sin turno: se aplica la hora límite por defecto
+        saturday = Attendance.create_check_in(
+            self.employee, check_in=local(MONDAY + timedelta(days=5), 8, 30)
+        )
+        self.assertEqual(saturday.status, Attendance.StatusChoices.PRESENT)
+
+    def test_moving_holiday_rebuilds_both_dates(self):
+        """Al mover un festivo vuelve el turno del día que deja libre"""
+        monday = timezone.localdate() + timedelta(
+            days=7 - timezone.localdate().weekday()
+        )
+        holiday = Holiday.objects.create(date=monday, name="Festivo local")
+        self.assertFalse(ExpectedShift.objects.filter(date=monday).exists())
+
+        holiday = Holiday.objects.get(pk=holiday.pk)
+        holiday.date = monday + timedelta(days=1)
+        holiday.save()
+
+        self.assertTrue(ExpectedShift.objects.filter(date=monday).exists())
+        self.assertFalse(ExpectedShift.objects.filter(date=holiday.date).exists())
+
+    def test_night_shift_checked_in_after_midnight(self):
+        """Entrar pasada la medianoche en el turno de noche es retraso, no ausencia"""
+        self._roster(self.night, 0, valid_from=date(2026, 3, 1))
+        build_expected_shifts(MONDAY, MONDAY)
+        self._attendance(local(MONDAY + timedelta(days=1), 0, 30))
+
+        counts = self.week.outcome_counts(now=local(MONDAY + timedelta(days=7), 0))
+
+        self.assertEqual((counts["late"], counts["absent"]), (1, 0))
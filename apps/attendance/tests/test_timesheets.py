@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.attendance.models import Attendance
+from apps.attendance.timesheets import timesheet
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.models import Leave
+
+MADRID = ZoneInfo("Europe/Madrid")
+
+
+class TimesheetTest(TestCase):
+    """Tests para el cálculo de nóminas por periodo"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employees = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=f"empleado{i}"),
+                department=self.department,
+                role=Employee.RoleChoices.RECEPTIONIST,
+            )
+            for i in range(3)
+        ]
+
+    def test_timesheet_lines(self):
+        """Cada empleado recibe sus horas, horas extra, retrasos y permisos"""
+        employee = self.employees[0]
+        check_in = datetime(2026, 3, 2, 9, 30, tzinfo=MADRID)
+        Attendance.objects.create(
+            employee=employee,
+            check_in=check_in,
+            check_out=check_in + timedelta(hours=10),
+            status=Attendance.StatusChoices.LATE,
+        )
+        # Permiso que empieza en febrero: solo cuentan los días de marzo
+        Leave.objects.create(
+            employee=employee,
+            leave_type=Leave.LeaveTypeChoices.VACATION,
+            start_date=date(2026, 2, 27),
+            end_date=date(2026, 3, 1),
+            reason="Vacaciones",
+            status=Leave.StatusChoices.APPROVED,
+        )
+
+        lines = {
+            line["employee"].pk: line
+            for line in timesheet(date(2026, 3, 1), date(2026, 3, 31))
+        }
+
+        line = lines[employee.pk]
+        self.assertEqual(line["days_worked"], 1)
+        self.assertEqual(line["hours"], timedelta(hours=10))
+        self.assertEqual(line["overtime"], timedelta(hours=2))
+        self.assertEqual(line["late"], 1)
+        self.assertEqual(line["leave_days"][Leave.LeaveTypeChoices.VACATION], 1)
+        self.assertEqual(lines[self.employees[1].pk]["total_leave_days"], 0)
+
+    def test_constant_number_of_queries(self):
+        """El número de consultas no depende del tamaño de la plantilla"""
+        with self.assertNumQueries(3):
+            lines = list(timesheet(date(2026, 3, 1), date(2026, 3, 31)))
+
+        self.assertEqual(len(lines), 3)
+
+    def test_export_rejects_invalid_filters(self):
+        """Fechas imposibles o departamentos no numéricos redirigen con un aviso"""
+        director = self.employees[0]
+        director.role = Employee.RoleChoices.DIRECTOR
+        director.save()
+        self.client.force_login(director.user)
+        url = reverse("attendance:timesheet-export")
+
+        for params in ({"start_date": "2026-02-30"}, {"department": "abc"}):
+            response = self.client.get(url, params)
+            self.assertRedirects(
+                response,
+                reverse("attendance:dashboard"),
+                fetch_redirect_response=False,
+            )
+
+        response = self.client.get(url, {"department": self.department.pk})
+        self.assertEqual(response.status_code, 200)
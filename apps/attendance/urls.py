@@ -4,8 +4,11 @@ from .views import (
     AttendanceCheckInView,
     AttendanceCheckOutView,
     AttendanceDashboardView,
+    AttendanceHistoryExportView,
     AttendanceHistoryView,
+    KioskScanView,
     MyAttendanceView,
+    TimesheetExportView,
 )
 
 app_name = "attendance"
@@ -17,6 +20,15 @@ urlpatterns = [
     path("myattendance/", MyAttendanceView.as_view(), name="my-attendance"),
     path("checkin/", AttendanceCheckInView.as_view(), name="check-in"),
     path("checkout/", AttendanceCheckOutView.as_view(), name="check-out"),
+    # Kiosco de fichaje por tarjeta (individual o por lotes)
+    path("kiosk/scans/", KioskScanView.as_view(), name="kiosk-scans"),
     # Historial personal
     path("history/", AttendanceHistoryView.as_view(), name="history"),
+    path(
+        "history/export/",
+        AttendanceHistoryExportView.as_view(),
+        name="history-export",
+    ),
+    # Exportación de nóminas (RRHH)
+    path("timesheet/export/", TimesheetExportView.as_view(), name="timesheet-export"),
 ]
@@ -1,16 +1,30 @@
+import hmac
+import json
 from datetime import timedelta
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import ListView, TemplateView
 
+from apps.core.utils import stream_csv
+from apps.employees.models import Employee
 from apps.leave.models import Leave
 
+from . import presence
+from .analytics import attendance_buckets, attendance_totals
+from .exports import attendance_csv_rows, attendance_header
+from .kiosk import ScanError, parse_scans, process_scans
 from .models import Attendance
+from .timesheets import timesheet, timesheet_csv_rows, timesheet_header
 
 
 class AttendanceDashboardView(LoginRequiredMixin, ListView):
@@ -21,9 +35,9 @@ class AttendanceDashboardView(LoginRequiredMixin, ListView):
     context_object_name = "today_attendances"
 
     def get_queryset(self):
-        today = timezone.now().date()
+        today = timezone.localdate()
         return (
-            Attendance.objects.filter(check_in__date=today)
+            Attendance.objects.filter(work_date=today)
             .select_related("employee", "employee__user")
             .order_by("-check_in")
         )
@@ -31,21 +45,17 @@ class AttendanceDashboardView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Total active employees
-        total_employees = Attendance.objects.filter(check_out__isnull=True).count()
+        total_employees = presence.count_present()
 
         # Today's statistics
+        today_bucket = attendance_buckets(today, today)[0]
         today_stats = {
-            "present": Attendance.objects.filter(
-                check_in__date=today, status__in=["present", "late"]
-            ).count(),
-            "absent": total_employees
-            - Attendance.objects.filter(check_in__date=today).count(),
-            "late": Attendance.objects.filter(
-                check_in__date=today, status="late"
-            ).count(),
+            "present": today_bucket["present"],
+            "absent": today_bucket["absent"],
+            "late": today_bucket["late"],
             "on_leave": Leave.objects.filter(
                 status="approved", start_date__lte=today, end_date__gte=today
             ).count(),
@@ -65,38 +75,24 @@ class AttendanceDashboardView(LoginRequiredMixin, ListView):
         # Current user's attendacence
         if hasattr(self.request.user, "employee"):
             context["today_attendance"] = Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             ).first()
 
         # Weekly chart data (last 7 days)
         week_ago = today - timedelta(days=6)
-        weekly_data = []
-        weekly_labels = []
+        weekly = attendance_buckets(week_ago, today)
 
-        for i in range(7):
-            day = week_ago + timedelta(days=i)
-            count = Attendance.objects.filter(
-                check_in__date=day, status__in=["present", "late"]
-            ).count()
-            weekly_data.append(count)
-            weekly_labels.append(day.strftime("%d/%m"))
-
-        context["weekly_data"] = weekly_data
-        context["weekly_labels"] = weekly_labels
+        context["weekly_data"] = [day["present"] for day in weekly]
+        context["weekly_labels"] = [day["start"].strftime("%d/%m") for day in weekly]
 
         # Monthly statistics
         first_day_month = today.replace(day=1)
-
-        month_attendances = Attendance.objects.filter(
-            check_in__date__gte=first_day_month, check_in__date__lte=today
-        )
+        month_days = attendance_buckets(first_day_month, today)
 
         month_stats = {
-            "worked_days": month_attendances.values("check_in__date")
-            .distinct()
-            .count(),
+            "worked_days": sum(1 for day in month_days if day["present"]),
             "absences": 0,  # Ajustar según tu lógica
-            "late_arrivals": month_attendances.filter(status="late").count(),
+            "late_arrivals": sum(day["late"] for day in month_days),
         }
 
         # Calculate percentages
@@ -129,7 +125,7 @@ class MyAttendanceView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
         profile = self.request.user
 
         # Get today's attendance
@@ -177,14 +173,9 @@ class AttendanceCheckInView(LoginRequiredMixin, View):
         employee = request.user.employee
 
         try:
-            # Use model method (handles validations)
+            # Use model method (handles validations and late status)
             attendance = Attendance.create_check_in(employee=employee)
 
-            # Determine if late (after 9:00 AM)
-            if attendance.check_in.time().hour >= 9:
-                attendance.status = "late"
-                attendance.save()
-
             messages.success(
                 request,
                 f'Fichaste tu entrada a las {attendance.check_in.strftime("%H:%M")}',
@@ -202,11 +193,11 @@ class AttendanceCheckOutView(LoginRequiredMixin, View):
 
     def post(self, request):
         employee = request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Find today's attendance without check-out
         attendance = Attendance.objects.filter(
-            employee=employee, check_in__date=today, check_out__isnull=True
+            employee=employee, work_date=today, check_out__isnull=True
         ).first()
 
         if not attendance:
@@ -230,6 +221,36 @@ class AttendanceCheckOutView(LoginRequiredMixin, View):
         return redirect("attendance:my-attendance")
 
 
+@method_decorator(csrf_exempt, name="dispatch")
+class KioskScanView(View):
+    """Badge scans from clock-in kiosks, single or batched, as JSON"""
+
+    def dispatch(self, request, *args, **kwargs):
+        # Kiosks authenticate with a shared token, not with a user session
+        token = settings.KIOSK_API_TOKEN
+        header = request.headers.get("Authorization", "")
+        if not token or not hmac.compare_digest(header, f"Bearer {token}"):
+            return JsonResponse({"error": "No autorizado"}, status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request):
+        try:
+            scans = parse_scans(json.loads(request.body))
+        except (ValueError, ScanError) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        results = process_scans(scans)
+        return JsonResponse({"results": [scan.as_dict() for scan in results]})
+
+
+def _filter_date(value):
+    """Date of a filter, or None if missing or not a valid date"""
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
 class AttendanceHistoryView(LoginRequiredMixin, ListView):
     """Complete attendance history for employee"""
 
@@ -243,15 +264,15 @@ class AttendanceHistoryView(LoginRequiredMixin, ListView):
             employee=self.request.user.employee
         ).order_by("-check_in")
 
-        # Apply filters if they exist
-        start_date = self.request.GET.get("start_date")
-        end_date = self.request.GET.get("end_date")
+        # Apply filters if they exist; dates that do not parse are ignored
+        start_date = _filter_date(self.request.GET.get("start_date"))
+        end_date = _filter_date(self.request.GET.get("end_date"))
         status = self.request.GET.get("status")
 
         if start_date:
-            queryset = queryset.filter(check_in__date__gte=start_date)
+            queryset = queryset.filter(work_date__gte=start_date)
         if end_date:
-            queryset = queryset.filter(check_in__date__lte=end_date)
+            queryset = queryset.filter(work_date__lte=end_date)
         if status:
             queryset = queryset.filter(status=status)
 
@@ -260,48 +281,80 @@ class AttendanceHistoryView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        today = timezone.now().date()
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
 
-        # Filter only current user's attendances
-        monthly_attendances = Attendance.objects.filter(
-            employee=self.request.user.employee,
-            check_in__date__gte=first_day_month,
-            check_out__isnull=False,
+        # Monthly summary for the current user, aggregated by the database
+        month = attendance_totals(
+            first_day_month, today, employees=self.request.user.employee
         )
 
-        # Calculate total hours
-        total_hours = timedelta()
-        for attendance in monthly_attendances:
-            if attendance.check_out:
-                total_hours += attendance.duration
-
-        # Calcular días laborables del mes
-        workdays = self._count_workdays(first_day_month, today)
-
-        # Absent days = total days - work days
-        absent_days = workdays - monthly_attendances.count()
-
-        # Convert to hours
-        total_hours_decimal = total_hours.total_seconds() / 3600
-
         context["summary"] = {
-            "total_days": monthly_attendances.count(),
-            "late_count": monthly_attendances.filter(status="late").count(),
-            "absent_count": absent_days,
-            "total_hours": round(total_hours_decimal, 1),
+            "total_days": month["closed"],
+            "late_count": month["late"],
+            "absent_count": month["absent"],
+            "total_hours": round(month["hours"].total_seconds() / 3600, 1),
         }
 
         context["today"] = today
 
         return context
 
-    def _count_workdays(self, start_date, end_date):
-        """Count working days (mon-fri) in a range"""
-        workdays = 0
-        current = start_date
-        while current <= end_date:
-            if current.weekday() < 5:  # 0=lun, 4=vie
-                workdays += 1
-            current += timedelta(days=1)
-        return workdays
+
+class AttendanceHistoryExportView(AttendanceHistoryView):
+    """Historial de asistencia con los mismos filtros, descargado como CSV"""
+
+    def get(self, request, *args, **kwargs):
+        attendances = self.get_queryset().select_related("employee__user")
+        today = timezone.localdate()
+        return stream_csv(
+            attendance_csv_rows(attendances),
+            filename=f"asistencia_{today:%Y%m%d}.csv",
+            header=attendance_header(),
+            compress=request.GET.get("gzip") == "1",
+        )
+
+
+class TimesheetExportView(LoginRequiredMixin, View):
+    """Payroll timesheet for the whole staff, streamed as CSV"""
+
+    def dispatch(self, request, *args, **kwargs):
+        # Only HR and direction can export payroll data
+        if not hasattr(request.user, "employee") or request.user.employee.role not in [
+            "director",
+            "rrhh",
+        ]:
+            messages.error(request, "No tienes permiso para exportar nóminas.")
+            return redirect("dashboard:home")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        today = timezone.localdate()
+
+        # Payroll period, current month by default
+        try:
+            start_date = parse_date(request.GET.get("start_date", "")) or today.replace(
+                day=1
+            )
+            end_date = parse_date(request.GET.get("end_date", "")) or today
+        except ValueError:
+            messages.error(request, "Las fechas indicadas no son válidas.")
+            return redirect("attendance:dashboard")
+        if end_date < start_date:
+            messages.error(request, "La fecha de fin es anterior a la de inicio.")
+            return redirect("attendance:dashboard")
+
+        employees = None
+        department = request.GET.get("department")
+        if department:
+            if not department.isdigit():
+                messages.error(request, "El departamento indicado no es válido.")
+                return redirect("attendance:dashboard")
+            employees = Employee.objects.filter(department_id=department)
+
+        lines = timesheet(start_date, end_date, employees=employees)
+        return stream_csv(
+            timesheet_csv_rows(lines),
+            filename=f"nominas_{start_date:%Y%m%d}_{end_date:%Y%m%d}.csv",
+            header=timesheet_header(),
+        )
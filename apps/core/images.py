@@ -0,0 +1,191 @@
+# apps/core/images.py
+"""
+Resized renditions of uploaded photos (avatars, task photos).
+
+When a tracked image field gets a new file, its renditions are queued
+once the transaction commits and are generated by a small pool of
+background threads, so the original is never decoded in the request
+thread. Each rendition is stored next to the original, in WebP and in
+JPEG:
+
+    avatars/ana.jpg -> avatars/ana.thumb.webp, avatars/ana.thumb.jpeg, ...
+
+Templates pick a size with the `rendition` filter (core_images), which
+falls back to the original until the renditions exist. Jobs live in
+memory: the ones lost when a process stops are redone by the
+build_renditions command, which only fills in what is missing.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest side, in pixels, of every rendition
+RENDITIONS = {
+    "thumb": 96,
+    "small": 320,
+    "large": 1280,
+}
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+DEFAULT_FORMAT = "webp"
+
+WORKERS = 2
+
+CACHE_PREFIX = "images:ready:"
+CACHE_TIMEOUT = 60 * 60 * 24
+# Files not ready yet are checked on storage again after this long
+MISSING_TIMEOUT = 60
+
+# Transparent uploads are flattened onto this colour (JPEG has no alpha)
+BACKGROUND = "white"
+
+# (model, field name) pairs whose uploads get renditions
+TRACKED = []
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def rendition_name(name, size, fmt=DEFAULT_FORMAT):
+    root, _ = os.path.splitext(name)
+    return f"{root}.{size}.{fmt}"
+
+
+def _last_rendition(name):
+    # Renditions are written from the largest down, so this one comes last
+    smallest = min(RENDITIONS, key=RENDITIONS.get)
+    return rendition_name(name, smallest, list(FORMATS)[-1])
+
+
+def is_ready(file):
+    """Whether the renditions of a stored file have been generated"""
+    key = CACHE_PREFIX + file.name
+    ready = cache.get(key)
+    if ready is not None:
+        return ready
+    # Generated by another process, or the cache entry expired
+    ready = file.storage.exists(_last_rendition(file.name))
+    cache.set(key, ready, CACHE_TIMEOUT if ready else MISSING_TIMEOUT)
+    return ready
+
+
+def rendition_url(file, size, fmt=DEFAULT_FORMAT):
+    """URL of a rendition, or of the original while it is not generated yet"""
+    if not file:
+        return ""
+    if size not in RENDITIONS or fmt not in FORMATS:
+        raise ValueError(f"Unknown rendition: {size}.{fmt}")
+    if not is_ready(file):
+        return file.url
+    return file.storage.url(rendition_name(file.name, size, fmt))
+
+
+def _flatten(image):
+    """RGB copy of an image, transparent areas painted with BACKGROUND"""
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, BACKGROUND)
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+
+def generate_renditions(name, storage):
+    """
+    Decodes the original once and writes every rendition, from the largest
+    down, each one resized from the previous so the work shrinks at every
+    step. Returns the names written.
+    """
+    written = []
+    with storage.open(name, "rb") as original:
+        image = Image.open(original)
+        # JPEG can be decoded directly at a reduced scale
+        largest = max(RENDITIONS.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = _flatten(image)
+
+        for size, side in sorted(RENDITIONS.items(), key=lambda item: -item[1]):
+            if image.width > side or image.height > side:
+                image.thumbnail((side, side), Image.Resampling.LANCZOS)
+            for fmt, options in FORMATS.items():
+                output = BytesIO()
+                image.save(output, **options)
+                target = rendition_name(name, size, fmt)
+                if storage.exists(target):
+                    storage.delete(target)
+                written.append(storage.save(target, ContentFile(output.getvalue())))
+
+    cache.set(CACHE_PREFIX + name, True, CACHE_TIMEOUT)
+    return written
+
+
+def _run(name, storage):
+    try:
+        generate_renditions(name, storage)
+    except Exception:
+        # A corrupt upload must not kill the worker; the original is served
+        logger.exception("Could not generate renditions of %s", name)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=WORKERS, thread_name_prefix="renditions"
+            )
+        return _executor
+
+
+def queue_renditions(file):
+    """Generates the renditions of a stored file in a background thread"""
+    future = _get_executor().submit(_run, file.name, file.storage)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return future
+
+
+def wait(timeout=None):
+    """Blocks until the queued renditions are done (management commands, tests)"""
+    wait_futures(list(_pending), timeout=timeout)
+
+
+def track(model, field_name):
+    """Queues renditions whenever a new file is saved in model.field_name"""
+    if (model, field_name) not in TRACKED:
+        TRACKED.append((model, field_name))
+    uid = f"renditions:{model._meta.label}.{field_name}"
+
+    def remember_upload(sender, instance, **kwargs):
+        # New uploads are still uncommitted: the field saves them after this
+        file = getattr(instance, field_name)
+        if file and not file._committed:
+            instance.__dict__.setdefault("_new_images", set()).add(field_name)
+
+    def queue_upload(sender, instance, **kwargs):
+        new_images = instance.__dict__.get("_new_images", set())
+        if field_name in new_images:
+            new_images.discard(field_name)
+            file = getattr(instance, field_name)
+            transaction.on_commit(lambda: queue_renditions(file))
+
+    pre_save.connect(remember_upload, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(queue_upload, sender=model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.images import TRACKED, generate_renditions, is_ready
+
+
+class Command(BaseCommand):
+    help = "Generate the missing renditions of uploaded photos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenera también las que ya existen",
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        for model, field_name in TRACKED:
+            names = (
+                model.objects.exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .values_list(field_name, flat=True)
+                .iterator()
+            )
+            field = model._meta.get_field(field_name)
+            for name in names:
+                file = field.attr_class(None, field, name)
+                if not options["force"] and is_ready(file):
+                    continue
+                try:
+                    generate_renditions(name, field.storage)
+                except Exception as e:
+                    self.stderr.write(f"{name}: {e}")
+                    continue
+                generated += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Miniaturas generadas para {generated} imágenes")
+        )
@@ -0,0 +1,31 @@
+# apps/core/mixins.py
+
+
+class TrackedFieldsMixin:
+    """
+    Remembers the loaded values of TRACKED_FIELDS, so a save can tell which
+    of them changed without reading the row again. Models call
+    remember_tracked() once the side effects of a save are applied.
+    """
+
+    TRACKED_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked()
+        return instance
+
+    def remember_tracked(self):
+        self._loaded_values = {
+            name: self.__dict__.get(name) for name in self.TRACKED_FIELDS
+        }
+
+    def loaded_value(self, name):
+        """Value of a tracked field when loaded or last saved"""
+        return getattr(self, "_loaded_values", {}).get(name)
+
+    def has_changed(self, name):
+        """Whether a tracked field differs from its loaded value"""
+        loaded = getattr(self, "_loaded_values", {})
+        return loaded.get(name, getattr(self, name)) != getattr(self, name)
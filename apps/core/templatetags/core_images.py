@@ -0,0 +1,16 @@
+from django import template
+
+from apps.core.images import DEFAULT_FORMAT, rendition_url
+
+register = template.Library()
+
+
+@register.filter
+def rendition(file, size):
+    """
+    URL of a resized copy of an image: {{ employee.avatar|rendition:"thumb" }}
+    or {{ task.photos|rendition:"large.jpeg" }}. Falls back to the original
+    while the renditions are being generated.
+    """
+    size, _, fmt = size.partition(".")
+    return rendition_url(file, size, fmt or DEFAULT_FORMAT)
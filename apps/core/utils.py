@@ -0,0 +1,56 @@
+# apps/core/utils.py
+import csv
+import zlib
+
+from django.http import StreamingHttpResponse
+
+# Filas que se escriben en el compresor antes de soltar un bloque
+GZIP_FLUSH_ROWS = 500
+
+
+class Echo:
+    """Pseudo-buffer: csv.writer escribe una línea y la devolvemos tal cual"""
+
+    def write(self, value):
+        return value
+
+
+def _gzip_chunks(lines):
+    """Comprime en gzip una secuencia de líneas sin acumular el fichero"""
+    # wbits=31: formato gzip (cabecera y CRC), no zlib en crudo
+    compressor = zlib.compressobj(wbits=31)
+    for number, line in enumerate(lines, start=1):
+        chunk = compressor.compress(line.encode("utf-8"))
+        if number % GZIP_FLUSH_ROWS == 0:
+            chunk += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def stream_csv(rows, filename, header=None, compress=False):
+    """
+    Devuelve una StreamingHttpResponse que va generando el CSV fila a fila,
+    de modo que la memoria no depende del número de filas y los primeros
+    bytes salen en cuanto la consulta empieza a devolver resultados.
+    Con compress=True se descarga como .csv.gz comprimido al vuelo.
+    """
+    writer = csv.writer(Echo())
+
+    def generate():
+        # BOM para que Excel abra correctamente los acentos
+        yield "\ufeff"
+        if header:
+            yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    if compress:
+        response = StreamingHttpResponse(
+            _gzip_chunks(generate()), content_type="application/gzip"
+        )
+        filename = f"{filename}.gz"
+    else:
+        response = StreamingHttpResponse(generate(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
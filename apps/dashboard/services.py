@@ -0,0 +1,330 @@
+# apps/dashboard/services.py
+from dataclasses import dataclass, replace
+from datetime import datetime
+from heapq import merge
+
+from django.core import signing
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.employees.models import Employee
+from apps.leave.models import Leave
+from apps.rooms.models import CleaningTask, MaintenanceTask, Reservation
+
+# Escala común de prioridad (1 = Alta, 5 = Baja), la misma que usa CleaningTask
+MAINTENANCE_PRIORITY_RANK = {
+    MaintenanceTask.PriorityChoices.URGENT: 1,
+    MaintenanceTask.PriorityChoices.HIGH: 2,
+    MaintenanceTask.PriorityChoices.MEDIUM: 3,
+    MaintenanceTask.PriorityChoices.LOW: 4,
+}
+RESERVATION_RANK = 2
+LEAVE_RANK = 3
+
+CURSOR_SALT = "dashboard.task_inbox"
+
+
+@dataclass(frozen=True)
+class InboxItem:
+    """Elemento de trabajo con forma común para todas las fuentes"""
+
+    kind: str
+    pk: int
+    title: str
+    subtitle: str
+    status: str
+    rank: int
+    since: datetime
+    url: str
+
+    @property
+    def age(self):
+        """Tiempo transcurrido desde que el elemento está pendiente"""
+        return timezone.now() - self.since
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "id": self.pk,
+            "title": self.title,
+            "subtitle": self.subtitle,
+            "status": self.status,
+            "priority": self.rank,
+            "since": self.since.isoformat(),
+            "age_seconds": int(self.age.total_seconds()),
+            "url": self.url,
+        }
+
+
+class InboxSource:
+    """Una fuente de elementos: un queryset anotado con rango y fecha"""
+
+    kind = None
+    order = 0
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def annotate(self, queryset):
+        return queryset.annotate(
+            inbox_rank=self.rank_expression(), inbox_since=F("created_at")
+        )
+
+    def rank_expression(self):
+        raise NotImplementedError
+
+    def after(self, queryset, cursor):
+        """Filtra en SQL los elementos posteriores al cursor (rank, since, order, pk)"""
+        rank, since, order, pk = cursor
+        condition = Q(inbox_rank__gt=rank) | Q(inbox_rank=rank, inbox_since__gt=since)
+        if self.order > order:
+            condition |= Q(inbox_rank=rank, inbox_since=since)
+        elif self.order == order:
+            condition |= Q(inbox_rank=rank, inbox_since=since, pk__gt=pk)
+        return queryset.filter(condition)
+
+    def fetch(self, cursor, limit):
+        queryset = self.annotate(self.queryset)
+        if cursor is not None:
+            queryset = self.after(queryset, cursor)
+        queryset = queryset.order_by("inbox_rank", "inbox_since", "pk")[:limit]
+        return [self.to_item(obj) for obj in queryset]
+
+    def to_item(self, obj):
+        raise NotImplementedError
+
+
+class CleaningSource(InboxSource):
+    kind = "cleaning"
+    order = 1
+
+    def rank_expression(self):
+        return F("priority")
+
+    def to_item(self, task):
+        return InboxItem(
+            kind=self.kind,
+            pk=task.pk,
+            title=f"Limpieza habitación {task.room.number}",
+            subtitle=task.get_cleaning_type_display(),
+            status=task.status,
+            rank=task.inbox_rank,
+            since=task.inbox_since,
+            url=reverse("cleaning:detail", kwargs={"pk": task.pk}),
+        )
+
+
+class MaintenanceSource(InboxSource):
+    kind = "maintenance"
+    order = 2
+
+    def rank_expression(self):
+        return Case(
+            *[
+                When(priority=key, then=Value(rank))
+                for key, rank in MAINTENANCE_PRIORITY_RANK.items()
+            ],
+            default=Value(5),
+            output_field=IntegerField(),
+        )
+
+    def to_item(self, task):
+        return InboxItem(
+            kind=self.kind,
+            pk=task.pk,
+            title=task.title,
+            subtitle=f"Habitación {task.room.number}",
+            status=task.status,
+            rank=task.inbox_rank,
+            since=task.inbox_since,
+            url=reverse("maintenance:detail", kwargs={"pk": task.pk}),
+        )
+
+
+class ArrivalSource(InboxSource):
+    kind = "arrival"
+    order = 3
+
+    def rank_expression(self):
+        return Value(RESERVATION_RANK, output_field=IntegerField())
+
+    def to_item(self, reservation):
+        return InboxItem(
+            kind=self.kind,
+            pk=reservation.pk,
+            title=f"Check-in {reservation.guest_full_name}",
+            subtitle=f"Habitación {reservation.room.number}",
+            status=reservation.status,
+            rank=reservation.inbox_rank,
+            since=reservation.inbox_since,
+            url=reverse("rooms:detail", kwargs={"pk": reservation.room_id}),
+        )
+
+
+class DepartureSource(ArrivalSource):
+    kind = "departure"
+    order = 4
+
+    def to_item(self, reservation):
+        return replace(
+            super().to_item(reservation),
+            kind=self.kind,
+            title=f"Check-out {reservation.guest_full_name}",
+        )
+
+
+class LeaveSource(InboxSource):
+    kind = "leave"
+    order = 5
+
+    def rank_expression(self):
+        return Value(LEAVE_RANK, output_field=IntegerField())
+
+    def to_item(self, leave):
+        return InboxItem(
+            kind=self.kind,
+            pk=leave.pk,
+            title=f"Permiso de {leave.employee.get_full_name()}",
+            subtitle=f"{leave.get_leave_type_display()} ({leave.start_date:%d/%m} - {leave.end_date:%d/%m})",
+            status=leave.status,
+            rank=leave.inbox_rank,
+            since=leave.inbox_since,
+            url=reverse("leave:approval", kwargs={"pk": leave.pk}),
+        )
+
+
+class TaskInbox:
+    """
+    Bandeja unificada de trabajo de un empleado.
+
+    Combina en un único feed ordenado por prioridad las tareas de limpieza,
+    mantenimiento, llegadas/salidas y permisos que corresponden a su rol.
+    Cada página cuesta una consulta por fuente, independientemente del
+    tamaño de las tablas, y se pagina con un cursor firmado.
+    """
+
+    OPEN_CLEANING = [
+        CleaningTask.StatusChoices.PENDING,
+        CleaningTask.StatusChoices.IN_PROGRESS,
+    ]
+    OPEN_MAINTENANCE = [
+        MaintenanceTask.StatusChoices.PENDING,
+        MaintenanceTask.StatusChoices.ASSIGNED,
+        MaintenanceTask.StatusChoices.IN_PROGRESS,
+    ]
+
+    def __init__(self, employee, today=None):
+        self.employee = employee
+        self.today = today or timezone.localdate()
+
+    def get_sources(self):
+        """Fuentes de trabajo según el rol del empleado"""
+        Roles = Employee.RoleChoices
+        role = self.employee.role
+
+        cleaning = CleaningTask.objects.filter(
+            status__in=self.OPEN_CLEANING
+        ).select_related("room")
+        maintenance = MaintenanceTask.objects.filter(
+            status__in=self.OPEN_MAINTENANCE
+        ).select_related("room")
+        arrivals = Reservation.objects.filter(
+            check_in_date=self.today,
+            status__in=[
+                Reservation.StatusChoices.CONFIRMED,
+                Reservation.StatusChoices.PENDING_CHECKIN,
+            ],
+        ).select_related("room")
+        departures = Reservation.objects.filter(
+            check_out_date=self.today, status=Reservation.StatusChoices.CHECKED_IN
+        ).select_related("room")
+        leaves = Leave.objects.filter(
+            status=Leave.StatusChoices.PENDING
+        ).select_related("employee", "employee__user")
+        team_leaves = leaves.managed_by(self.employee)
+
+        if role == Roles.DIRECTOR:
+            return [
+                CleaningSource(cleaning),
+                MaintenanceSource(
+                    maintenance.filter(priority=MaintenanceTask.PriorityChoices.URGENT)
+                ),
+                ArrivalSource(arrivals),
+                DepartureSource(departures),
+                LeaveSource(leaves),
+            ]
+        if role == Roles.RRHH:
+            return [LeaveSource(leaves)]
+        if role == Roles.RECEPTION_MANAGER:
+            return [
+                ArrivalSource(arrivals),
+                DepartureSource(departures),
+                LeaveSource(team_leaves),
+            ]
+        if role == Roles.RECEPTIONIST:
+            return [ArrivalSource(arrivals), DepartureSource(departures)]
+        if role == Roles.HOUSEKEEPING_MANAGER:
+            return [CleaningSource(cleaning), LeaveSource(team_leaves)]
+        if role == Roles.HOUSEKEEPER:
+            return [CleaningSource(cleaning.filter(assigned_to=self.employee))]
+        if role == Roles.MAINTENANCE_MANAGER:
+            return [MaintenanceSource(maintenance), LeaveSource(team_leaves)]
+        if role == Roles.MAINTENANCE:
+            return [
+                MaintenanceSource(
+                    maintenance.filter(assigned_to=self.employee).exclude(
+                        status=MaintenanceTask.StatusChoices.PENDING
+                    )
+                )
+            ]
+        return []
+
+    def page(self, cursor=None, limit=20):
+        """
+        Devuelve una página del feed: {"items": [...], "next_cursor": str|None}.
+        Lanza ValueError si el cursor no es válido.
+        """
+        position = self.decode_cursor(cursor) if cursor else None
+
+        # Cada fuente aporta como mucho limit + 1 elementos ya ordenados
+        batches = [source.fetch(position, limit + 1) for source in self.get_sources()]
+        merged = list(merge(*batches, key=self.sort_key))
+
+        items = merged[:limit]
+        next_cursor = None
+        if len(merged) > limit and items:
+            next_cursor = self.encode_cursor(items[-1])
+
+        return {"items": items, "next_cursor": next_cursor}
+
+    @staticmethod
+    def sort_key(item):
+        return (item.rank, item.since, SOURCE_ORDER[item.kind], item.pk)
+
+    @classmethod
+    def encode_cursor(cls, item):
+        rank, since, order, pk = cls.sort_key(item)
+        return signing.dumps(
+            [rank, since.isoformat(), order, pk], salt=CURSOR_SALT, compress=True
+        )
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            rank, since, order, pk = signing.loads(cursor, salt=CURSOR_SALT)
+            return int(rank), datetime.fromisoformat(since), int(order), int(pk)
+        except (signing.BadSignature, TypeError, ValueError) as e:
+            raise ValueError("Cursor no válido") from e
+
+
+SOURCE_ORDER = {
+    source.kind: source.order
+    for source in (
+        CleaningSource,
+        MaintenanceSource,
+        ArrivalSource,
+        DepartureSource,
+        LeaveSource,
+    )
+}
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.dashboard.services import TaskInbox
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms.models import CleaningTask, MaintenanceTask, Room, RoomType
+
+
+class TaskInboxTest(TestCase):
+    """Tests para la bandeja unificada de tareas"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        """Configuración inicial"""
+        self.department = Department.objects.create(name="Dirección", code="DIR")
+        self.director = Employee.objects.create(
+            user=User.objects.create_user(username="director"),
+            department=self.department,
+            role=Employee.RoleChoices.DIRECTOR,
+        )
+        room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.room = Room.objects.create(number="101", floor=1, room_type=room_type)
+
+    def test_items_merged_by_priority(self):
+        """Los elementos de distintas fuentes se ordenan por prioridad común"""
+        low = CleaningTask.objects.create(room=self.room, priority=5)
+        urgent = MaintenanceTask.objects.create(
+            room=self.room,
+            title="Fuga de agua",
+            description="Baño",
+            priority=MaintenanceTask.PriorityChoices.URGENT,
+        )
+        high = CleaningTask.objects.create(room=self.room, priority=2)
+
+        items = TaskInbox(self.director).page()["items"]
+
+        self.assertEqual(
+            [(item.kind, item.pk) for item in items],
+            [("maintenance", urgent.pk), ("cleaning", high.pk), ("cleaning", low.pk)],
+        )
+
+    def test_cursor_pagination_covers_all_items(self):
+        """Recorrer las páginas devuelve cada elemento una sola vez"""
+        for priority in [1, 1, 2, 3, 3, 3, 4]:
+            CleaningTask.objects.create(room=self.room, priority=priority)
+
+        inbox = TaskInbox(self.director)
+        seen = []
+        cursor = None
+        while True:
+            page = inbox.page(cursor=cursor, limit=3)
+            seen.extend(item.pk for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_constant_number_of_queries(self):
+        """El número de consultas no depende del número de tareas"""
+        for _ in range(10):
+            CleaningTask.objects.create(room=self.room, priority=3)
+
+        # Una consulta por cada fuente del director
+        with self.assertNumQueries(5):
+            TaskInbox(self.director).page(limit=5)
+
+    def test_invalid_cursor(self):
+        """Un cursor manipulado se rechaza"""
+        with self.assertRaises(ValueError):
+            TaskInbox(self.director).page(cursor="no-valido")
+
+    def test_my_tasks_renders_first_inbox_page(self):
+        """La vista de tareas muestra la primera página de la bandeja"""
+        self.director.user.set_password("testpass123")
+        self.director.user.save()
+        for priority in range(1, 26):
+            CleaningTask.objects.create(room=self.room, priority=min(priority, 5))
+        self.client.login(username="director", password="testpass123")
+
+        response = self.client.get(reverse("dashboard:tasks"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "dashboard/tasks/director_tasks.html")
+        inbox = response.context["inbox"]
+        self.assertEqual(len(inbox["items"]), 20)
+        self.assertIsNotNone(inbox["next_cursor"])
+        self.assertContains(response, 'id="task-inbox-more"')
@@ -1,10 +1,11 @@
 # apps/dashboard/urls.py
 from django.urls import path
-from .views import DashboardView, MyTasksView
+from .views import DashboardView, MyTasksView, TaskInboxView
 
 app_name = 'dashboard'
 
 urlpatterns = [
     path('', DashboardView.as_view(), name='home'),
     path('tareas/', MyTasksView.as_view(), name='tasks'),
+    path('tareas/bandeja/', TaskInboxView.as_view(), name='task-inbox'),
 ]
\ No newline at end of file
@@ -6,16 +6,22 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Avg, Count, Q
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.views import View
 from django.views.generic import DetailView, TemplateView, UpdateView
 
-from apps.attendance.models import Attendance
+from apps.attendance import presence
+from apps.attendance.models import Attendance, ExpectedShift
 from apps.employees.forms import EmployeeForm
 from apps.employees.models import Department, Employee
 from apps.leave.models import Leave
 from apps.rooms.models import CleaningTask, MaintenanceTask, Reservation, Room
+from apps.rooms.productivity import completed_between, completed_count
+
+from .services import TaskInbox
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -51,7 +57,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             return context
 
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Datos comunes para todos
         context["employee"] = employee
@@ -103,21 +109,19 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
     def get_director_context(self):
         """Dashboard para el Director"""
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         return {
             # Estadísticas generales
             "total_employees": Employee.objects.filter(is_available=True).count(),
             "total_rooms": Room.objects.count(),
             # Asistencia hoy
-            "employees_present": Attendance.objects.filter(
-                check_in__date=today, check_out__isnull=True
-            ).count(),
+            "employees_present": presence.count_present(),
             "today_attendances": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             ).order_by("-check_in"),
             "latest_attendance": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             )
             .order_by("-check_in")
             .first(),
@@ -141,8 +145,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_jefe_recepcion_context(self):
         """Dashboard para Jefe de Recepción"""
         employee = self.request.user.employee
-        team = employee.get_supervised_employees()
-        today = timezone.now().date()
+        team = Employee.objects.supervised_by(employee)
+        today = timezone.localdate()
 
         # Conteo de habitaciones con tareas pendientes:
         dirty_rooms = Room.objects.filter(status="dirty").count()
@@ -173,15 +177,13 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         total_checkouts_count = pending_checkouts.count() + completed_checkouts.count()
 
         today_attendances = Attendance.objects.filter(
-            employee=employee, check_in__date=today
+            employee=employee, work_date=today
         ).order_by("-check_in")
 
         return {
             # Mi equipo
-            "team_size": team.count(),
-            "team_present": Attendance.objects.filter(
-                employee__in=team, check_in__date=today, check_out__isnull=True
-            ).count(),
+            "team_size": len(employee.team_ids),
+            "team_present": presence.count_present(employee.team_ids),
             "team_members": team.select_related("user", "department"),
             "team_total": team.select_related("user", "department").count(),
             # Habitaciones
@@ -192,10 +194,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             # Calcular tasa de ocupación
             "occupancy_rate": self._calculate_occupancy_rate(),
             # Permisos del equipo
-            "pending_team_leaves": Leave.objects.filter(
-                employee__in=team, status="pending"
-            ).count(),
-            "team_leaves": Leave.objects.filter(employee__in=team)
+            "pending_team_leaves": Leave.objects.managed_by(employee)
+            .filter(status="pending")
+            .count(),
+            "team_leaves": Leave.objects.managed_by(employee)
             .select_related("employee", "employee__user")
             .order_by("-created_at")[:10],
             # Check-ins/outs del día
@@ -219,10 +221,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_recepcionista_context(self):
         """Dashboard para Recepcionista"""
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         today_attendances = Attendance.objects.filter(
-            employee=employee, check_in__date=today
+            employee=employee, work_date=today
         ).order_by("-check_in")
 
         return {
@@ -230,7 +232,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             # Mis datos
             "my_attendance_today": Attendance.objects.filter(
                 employee=self.request.user.employee,
-                check_in__date=timezone.now().date(),
+                work_date=timezone.localdate(),
             ).first(),
             # Habitaciones por tipo
             "rooms_by_type": Room.objects.values("room_type__name").annotate(
@@ -243,30 +245,26 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_jefe_limpieza_context(self):
         """Dashboard para Jefe de Limpieza"""
         employee = self.request.user.employee
-        team = employee.get_supervised_employees()
-        today = timezone.now().date()
+        team = Employee.objects.supervised_by(employee)
+        today = timezone.localdate()
 
         return {
             # Mi equipo
-            "team_size": team.count(),
-            "team_present": Attendance.objects.filter(
-                employee__in=team, check_in__date=today, check_out__isnull=True
-            ).count(),
+            "team_size": len(employee.team_ids),
+            "team_present": presence.count_present(employee.team_ids),
             # Tareas de limpieza
             "pending_tasks": CleaningTask.objects.filter(status="pending").count(),
             "in_progress_tasks": CleaningTask.objects.filter(
                 status="in_progress"
             ).count(),
-            "completed_today": CleaningTask.objects.filter(
-                status="completed", completed_at__date=today
-            ).count(),
+            "completed_today": completed_between(today).count(),
             # Habitaciones
             "dirty_rooms": Room.objects.filter(status="dirty").count(),
             "cleaning_rooms": Room.objects.filter(status="cleaning").count(),
             # Permisos del equipo
-            "pending_team_leaves": Leave.objects.filter(
-                employee__in=team, status="pending"
-            ).count(),
+            "pending_team_leaves": Leave.objects.managed_by(employee)
+            .filter(status="pending")
+            .count(),
             # Tareas sin asignar
             "unassigned_tasks": CleaningTask.objects.filter(
                 assigned_to__isnull=True, status="pending"
@@ -275,10 +273,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             "team_productivity": self.get_cleaning_team_stats(team),
             # Mi asistencia
             "today_attendances": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             ).order_by("-check_in"),
             "latest_attendance": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             )
             .order_by("-check_in")
             .first(),
@@ -287,7 +285,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_camarero_piso_context(self):
         """Dashboard para Camarero de Piso"""
         employee = getattr(self.request.user, "employee", None)
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Mis tareas
         if employee is None:
@@ -297,7 +295,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
         if employee:
             today_attendances = Attendance.objects.filter(
-                employee=employee, check_in__date=today
+                employee=employee, work_date=today
             ).order_by("-check_in")
         else:
             today_attendances = Attendance.objects.none()
@@ -311,7 +309,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             "next_task": my_tasks.filter(status="pending").order_by("priority").first(),
             # Mi asistencia
             "my_attendance": Attendance.objects.filter(
-                employee=employee, check_in__date=today
+                employee=employee, work_date=today
             ).first(),
             "today_attendances": today_attendances,
             "latest_attendance": today_attendances.first(),
@@ -324,15 +322,12 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_jefe_mantenimiento_context(self):
         """Dashboard para Jefe de Mantenimiento"""
         employee = self.request.user.employee
-        team = employee.get_supervised_employees()
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         return {
             # Mi equipo
-            "team_size": team.count(),
-            "team_present": Attendance.objects.filter(
-                employee__in=team, check_in__date=today, check_out__isnull=True
-            ).count(),
+            "team_size": len(employee.team_ids),
+            "team_present": presence.count_present(employee.team_ids),
             # Tareas de mantenimiento
             "pending_tasks": MaintenanceTask.objects.filter(status="pending").count(),
             "in_progress_tasks": MaintenanceTask.objects.filter(
@@ -344,15 +339,15 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             # Habitaciones en mantenimiento
             "maintenance_rooms": Room.objects.filter(status="maintenance").count(),
             # Permisos del equipo
-            "pending_team_leaves": Leave.objects.filter(
-                employee__in=team, status="pending"
-            ).count(),
+            "pending_team_leaves": Leave.objects.managed_by(employee)
+            .filter(status="pending")
+            .count(),
             # Mi asistencia
             "today_attendances": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             ).order_by("-check_in"),
             "latest_attendance": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             )
             .order_by("-check_in")
             .first(),
@@ -361,12 +356,12 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_mantenimiento_context(self):
         """Dashboard para Personal de Mantenimiento"""
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         my_tasks = MaintenanceTask.objects.filter(assigned_to=employee)
 
         today_attendances = Attendance.objects.filter(
-            employee=employee, check_in__date=today
+            employee=employee, work_date=today
         ).order_by("-check_in")
 
         return {
@@ -382,7 +377,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             .first(),
             # Mi asistencia
             "my_attendance": Attendance.objects.filter(
-                employee=employee, check_in__date=today
+                employee=employee, work_date=today
             ).first(),
             # Mis tareas del día
             "today_tasks": my_tasks.filter(assigned_to=employee),
@@ -392,7 +387,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
     def get_rrhh_context(self):
         """Dashboard para RRHH"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
 
         return {
@@ -400,19 +395,16 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             "total_employees": Employee.objects.count(),
             "active_employees": Employee.objects.filter(is_available=True).count(),
             # Asistencia hoy
-            "present_today": Attendance.objects.filter(
-                check_in__date=today, check_out__isnull=True
-            ).count(),
-            "absent_today": Employee.objects.count()
-            - Attendance.objects.filter(check_in__date=today).count(),
+            "present_today": presence.count_present(),
+            "absent_today": ExpectedShift.objects.filter(date=today).absent().count(),
             "late_today": Attendance.objects.filter(
-                check_in__date=today, status="late"
+                work_date=today, status="late"
             ).count(),
             "today_attendances": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             ).order_by("-check_in"),
             "latest_attendance": Attendance.objects.filter(
-                employee=self.request.user.employee, check_in__date=today
+                employee=self.request.user.employee, work_date=today
             )
             .order_by("-check_in")
             .first(),
@@ -501,9 +493,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     ):
         """Estadísticas de productividad del equipo de limpieza"""
 
-        from django.db.models import Count, Q
-
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Determinar rango según periodo
         if period == "custom":
@@ -511,33 +501,20 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 raise ValueError(
                     "start_date y end_date son requeridos para period='custom"
                 )
-            date_filter = Q(
-                cleaning_tasks__completed_at__date__gte=start_date,
-                cleaning_tasks__completed_at__date__lte=end_date,
-            )
         elif period == "today":
-            date_filter = Q(cleaning_tasks__completed_at__date=today)
+            start_date = end_date = today
         elif period == "month":
-            first_day_month = today.replace(day=1)
-            date_filter = Q(
-                cleaning_tasks__completed_at__date__gte=first_day_month,
-                cleaning_tasks__completed_at__date__lte=today,
-            )
+            start_date, end_date = today.replace(day=1), today
         elif period == "year":
-            first_day_year = today.replace(month=1, day=1)
-            date_filter = Q(
-                cleaning_tasks__completed_at__date__gte=first_day_year,
-                cleaning_tasks__completed_at__date__lte=today,
-            )
+            start_date, end_date = today.replace(month=1, day=1), today
         else:
-            date_filter = Q()
-
-        # Construir filtro dinámico
-        filters = Q(cleaning_tasks__status="completed") & date_filter
+            start_date = end_date = None
 
-        # Query optimizada
+        # Rango de completed_at, para que la consulta use el índice
         team_with_stats = team.annotate(
-            completed_tasks=Count("cleaning_tasks", filter=filters)
+            completed_tasks=completed_count(
+                start_date, end_date, prefix="cleaning_tasks__"
+            )
         ).order_by("-completed_tasks")[:5]
 
         return [
@@ -549,44 +526,47 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 class MyTasksView(LoginRequiredMixin, TemplateView):
     """Vista de tareas personalizadas según el rol del usuario"""
 
+    Roles = Employee.RoleChoices
+
+    template_map = {
+        Roles.DIRECTOR: "dashboard/tasks/director_tasks.html",
+        Roles.RECEPTION_MANAGER: "dashboard/tasks/jefe_recepcion_tasks.html",
+        Roles.RECEPTIONIST: "dashboard/tasks/recepcionista_tasks.html",
+        Roles.HOUSEKEEPING_MANAGER: "dashboard/tasks/jefe_limpieza_tasks.html",
+        Roles.HOUSEKEEPER: "dashboard/tasks/camarero_piso_tasks.html",
+        Roles.MAINTENANCE_MANAGER: "dashboard/tasks/jefe_mantenimiento_tasks.html",
+        Roles.MAINTENANCE: "dashboard/tasks/personal_mantenimiento_tasks.html",
+        Roles.RRHH: "dashboard/tasks/rrhh_tasks.html",
+    }
+
     def get_template_names(self):
         """Selecciona el template según el rol"""
         if not hasattr(self.request.user, "employee"):
             return ["dashboard/tasks/no_profile.html"]
 
         role = self.request.user.employee.role
-
-        template_map = {
-            "director": "dashboard/tasks/director_tasks.html",
-            "reception_manager": "dashboard/tasks/jefe_recepcion_tasks.html",
-            "receptionist": "dashboard/tasks/recepcionista_tasks.html",
-            "housekeeper_manager": "dashboard/tasks/jefe_limpieza_tasks.html",
-            "housekeeper": "dashboard/tasks/camarero_piso_tasks.html",
-            "maintenance_manager": "dashboard/tasks/jefe_mantenimiento_tasks.html",
-            "maintenance": "dashboard/tasks/personal_mantenimiento_tasks.html",
-            "rrhh": "dashboard/tasks/rrhh_tasks.html",
-        }
-
-        return [template_map.get(role, "dashboard/tasks/default_tasks.html")]
+        return [self.template_map.get(role, "dashboard/tasks/default_tasks.html")]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         context["employee"] = employee
         context["today"] = today
 
-        # Obtener tareas según el rol
+        # Primera página de la bandeja; el template pide las siguientes por cursor
+        context["inbox"] = TaskInbox(employee, today=today).page()
+
+        # Información propia de cada rol que no está en la bandeja
         role_context_methods = {
-            "director": self.get_director_tasks,
-            "reception_manager": self.get_jefe_recepcion_tasks,
-            "receptionist": self.get_recepcionista_tasks,
-            "housekeeper_manager": self.get_jefe_limpieza_tasks,
-            "housekeeper": self.get_camarero_piso_tasks,
-            "maintenance_manager": self.get_jefe_mantenimiento_tasks,
-            "maintenance": self.get_mantenimiento_tasks,
-            "rrhh": self.get_rrhh_tasks,
+            self.Roles.RECEPTION_MANAGER: self.get_jefe_recepcion_tasks,
+            self.Roles.RECEPTIONIST: self.get_recepcionista_tasks,
+            self.Roles.HOUSEKEEPING_MANAGER: self.get_jefe_limpieza_tasks,
+            self.Roles.HOUSEKEEPER: self.get_camarero_piso_tasks,
+            self.Roles.MAINTENANCE_MANAGER: self.get_jefe_mantenimiento_tasks,
+            self.Roles.MAINTENANCE: self.get_mantenimiento_tasks,
+            self.Roles.RRHH: self.get_rrhh_tasks,
         }
 
         method = role_context_methods.get(employee.role)
@@ -597,54 +577,12 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
 
     # ==================== TAREAS POR ROL ====================
 
-    def get_director_tasks(self):
-        """Tareas para el Director - ve todo"""
-        today = timezone.now().date()
-
-        return {
-            "pending_leaves": Leave.objects.filter(status="pending")
-            .select_related("employee", "employee__user")
-            .order_by("-created_at")[:10],
-            "urgent_maintenance": MaintenanceTask.objects.filter(
-                priority="urgent", status__in=["pending", "assigned", "in_progress"]
-            )
-            .select_related("room", "reported_by", "assigned_to")
-            .order_by("-created_at")[:10],
-            "pending_cleaning": CleaningTask.objects.filter(
-                status__in=["pending", "in_progress"]
-            )
-            .select_related("room", "assigned_to")
-            .order_by("priority")[:10],
-            "today_arrivals": Reservation.objects.filter(
-                check_in_date=today, status__in=["confirmed", "pending_checkin"]
-            ).select_related("room")[:10],
-            "today_departures": Reservation.objects.filter(
-                check_out_date=today, status="checked_in"
-            ).select_related("room")[:10],
-        }
-
     def get_jefe_recepcion_tasks(self):
         """Tareas para Jefe de Recepción"""
-        today = timezone.now().date()
-        team = self.request.user.employee.get_supervised_employees()
-
         return {
-            "pending_checkins": Reservation.objects.filter(
-                check_in_date=today, status__in=["confirmed", "pending_checkin"]
-            )
-            .select_related("room")
-            .order_by("check_in_date"),
-            "pending_checkouts": Reservation.objects.filter(
-                check_out_date=today, status="checked_in"
-            )
-            .select_related("room")
-            .order_by("check_out_date"),
             "dirty_rooms": Room.objects.filter(status="dirty", is_active=True)
             .select_related("room_type")
             .order_by("floor", "number")[:15],
-            "team_leaves": Leave.objects.filter(employee__in=team, status="pending")
-            .select_related("employee", "employee__user")
-            .order_by("-created_at")[:5],
             "maintenance_rooms": Room.objects.filter(
                 status="maintenance", is_active=True
             ).select_related("room_type")[:10],
@@ -652,19 +590,7 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
 
     def get_recepcionista_tasks(self):
         """Tareas para Recepcionista"""
-        today = timezone.now().date()
-
         return {
-            "pending_checkins": Reservation.objects.filter(
-                check_in_date=today, status__in=["confirmed", "pending_checkin"]
-            )
-            .select_related("room")
-            .order_by("check_in_date"),
-            "pending_checkouts": Reservation.objects.filter(
-                check_out_date=today, status="checked_in"
-            )
-            .select_related("room")
-            .order_by("check_out_date"),
             "available_rooms": Room.objects.filter(
                 status="clean", occupancy="vacant", is_active=True
             )
@@ -674,8 +600,9 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
 
     def get_jefe_limpieza_tasks(self):
         """Tareas para Jefe de Limpieza"""
-        team = self.request.user.employee.get_supervised_employees()
-        today = timezone.now().date()
+        employee = self.request.user.employee
+        team = Employee.objects.supervised_by(employee)
+        today = timezone.localdate()
 
         return {
             "unassigned_tasks": CleaningTask.objects.filter(
@@ -683,17 +610,8 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
             )
             .select_related("room")
             .order_by("priority", "created_at"),
-            "pending_tasks": CleaningTask.objects.filter(status="pending")
-            .select_related("room", "assigned_to")
-            .order_by("priority")[:15],
-            "in_progress_tasks": CleaningTask.objects.filter(status="in_progress")
-            .select_related("room", "assigned_to")
-            .order_by("created_at")[:10],
-            "team_leaves": Leave.objects.filter(
-                employee__in=team, status="pending"
-            ).select_related("employee", "employee__user"),
             "team_attendance": Attendance.objects.filter(
-                employee__in=team, check_in__date=today, check_out__isnull=True
+                employee__in=team, work_date=today, check_out__isnull=True
             ).select_related("employee", "employee__user"),
         }
 
@@ -702,50 +620,20 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
         employee = self.request.user.employee
 
         return {
-            "my_pending_tasks": CleaningTask.objects.filter(
-                assigned_to=employee, status="pending"
-            )
-            .select_related("room", "room__room_type")
-            .order_by("priority"),
-            "my_in_progress_tasks": CleaningTask.objects.filter(
-                assigned_to=employee, status="in_progress"
-            ).select_related("room", "room__room_type"),
-            "my_completed_today": CleaningTask.objects.filter(
-                assigned_to=employee,
-                status="completed",
-                updated_at__date=timezone.now().date(),
-            )
-            .select_related("room")
-            .count(),
+            "my_completed_today": completed_between(
+                timezone.localdate(),
+                queryset=CleaningTask.objects.filter(assigned_to=employee),
+            ).count(),
         }
 
     def get_jefe_mantenimiento_tasks(self):
         """Tareas para Jefe de Mantenimiento"""
-        team = self.request.user.employee.get_supervised_employees()
-        today = timezone.now().date()
-
         return {
             "unassigned_tasks": MaintenanceTask.objects.filter(
                 assigned_to__isnull=True, status="pending"
             )
             .select_related("room", "reported_by")
             .order_by("-priority", "created_at"),
-            "urgent_tasks": MaintenanceTask.objects.filter(
-                priority="urgent", status__in=["pending", "assigned", "in_progress"]
-            )
-            .select_related("room", "assigned_to")
-            .order_by("created_at"),
-            "pending_tasks": MaintenanceTask.objects.filter(
-                status__in=["pending", "assigned"]
-            )
-            .select_related("room", "assigned_to")
-            .order_by("-priority")[:15],
-            "in_progress_tasks": MaintenanceTask.objects.filter(status="in_progress")
-            .select_related("room", "assigned_to")
-            .order_by("-priority")[:10],
-            "team_leaves": Leave.objects.filter(
-                employee__in=team, status="pending"
-            ).select_related("employee", "employee__user"),
         }
 
     def get_mantenimiento_tasks(self):
@@ -753,42 +641,26 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
         employee = self.request.user.employee
 
         return {
-            "my_urgent_tasks": MaintenanceTask.objects.filter(
-                assigned_to=employee,
-                priority="urgent",
-                status__in=["assigned", "in_progress"],
-            )
-            .select_related("room", "reported_by")
-            .order_by("created_at"),
-            "my_pending_tasks": MaintenanceTask.objects.filter(
-                assigned_to=employee, status="assigned"
-            )
-            .select_related("room", "reported_by")
-            .order_by("-priority"),
-            "my_in_progress_tasks": MaintenanceTask.objects.filter(
-                assigned_to=employee, status="in_progress"
-            ).select_related("room", "reported_by"),
             "my_completed_today": MaintenanceTask.objects.filter(
                 assigned_to=employee,
                 status="completed",
-                resolved_at__date=timezone.now().date(),
+                resolved_at__date=timezone.localdate(),
             ).count(),
         }
 
     def get_rrhh_tasks(self):
         """Tareas para RRHH"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
 
         return {
-            "pending_leaves": Leave.objects.filter(status="pending")
-            .select_related("employee", "employee__user")
-            .order_by("-created_at"),
-            "absent_today": Employee.objects.filter(is_available=True)
-            .exclude(attendances__check_in__date=today)
-            .select_related("user", "department")[:10],
+            "absent_today": Employee.objects.filter(
+                pk__in=ExpectedShift.objects.filter(date=today)
+                .absent()
+                .values("employee_id")
+            ).select_related("user", "department")[:10],
             "late_today": Attendance.objects.filter(
-                check_in__date=today, status="late"
+                work_date=today, status="late"
             ).select_related("employee", "employee__user"),
             "leaves_this_month": Leave.objects.filter(
                 status="approved", start_date__gte=first_day_month
@@ -798,6 +670,34 @@ class MyTasksView(LoginRequiredMixin, TemplateView):
         }
 
 
+class TaskInboxView(LoginRequiredMixin, View):
+    """Bandeja unificada de tareas en JSON, paginada por cursor"""
+
+    max_limit = 100
+
+    def get(self, request):
+        if not hasattr(request.user, "employee"):
+            return JsonResponse({"items": [], "next_cursor": None})
+
+        try:
+            limit = min(int(request.GET.get("limit", 20)), self.max_limit)
+        except ValueError:
+            limit = 20
+
+        inbox = TaskInbox(request.user.employee)
+        try:
+            page = inbox.page(cursor=request.GET.get("cursor"), limit=max(limit, 1))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse(
+            {
+                "items": [item.as_dict() for item in page["items"]],
+                "next_cursor": page["next_cursor"],
+            }
+        )
+
+
 class MyProfileView(LoginRequiredMixin, DetailView):
     """Vista del perfil del usuario actual"""
 
@@ -812,7 +712,7 @@ class MyProfileView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         employee = self.object
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Información básica
         context["today"] = today
@@ -824,7 +724,7 @@ class MyProfileView(LoginRequiredMixin, DetailView):
         # Estadísticas del mes actual
         first_day_month = today.replace(day=1)
         monthly_attendances = employee.attendances.filter(
-            check_in__gte=first_day_month, check_out__isnull=False
+            work_date__gte=first_day_month, check_out__isnull=False
         )
 
         # Calcular horas trabajadas
@@ -865,7 +765,7 @@ class MyProfileView(LoginRequiredMixin, DetailView):
 
     def _get_role_specific_stats(self, employee):
         """Obtiene estadísticas específicas según el rol"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
 
         stats = {}
@@ -875,8 +775,8 @@ class MyProfileView(LoginRequiredMixin, DetailView):
             tasks = CleaningTask.objects.filter(assigned_to=employee)
             stats["cleaning"] = {
                 "total_month": tasks.filter(created_at__gte=first_day_month).count(),
-                "completed_month": tasks.filter(
-                    status="completed", completed_at__gte=first_day_month
+                "completed_month": completed_between(
+                    first_day_month, today, tasks
                 ).count(),
                 "pending": tasks.filter(status="pending").count(),
                 "in_progress": tasks.filter(status="in_progress").count(),
@@ -898,15 +798,12 @@ class MyProfileView(LoginRequiredMixin, DetailView):
 
         # Estadísticas para supervisores
         if employee.is_supervisor():
-            team = employee.get_supervised_employees()
             stats["team"] = {
-                "size": team.count(),
-                "present_today": Attendance.objects.filter(
-                    employee__in=team, check_in__date=today, check_out__isnull=True
-                ).count(),
-                "pending_leaves": Leave.objects.filter(
-                    employee__in=team, status="pending"
-                ).count(),
+                "size": len(employee.team_ids),
+                "present_today": presence.count_present(employee.team_ids),
+                "pending_leaves": Leave.objects.managed_by(employee)
+                .filter(status="pending")
+                .count(),
             }
 
         return stats
@@ -39,5 +39,6 @@ class EmployeeAdmin(admin.ModelAdmin):
         'employee_number'
         ]
     raw_id_fields = [
-        'user'
+        'user',
+        'manager'
         ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class EmployeesConfig(AppConfig):
@@ -8,3 +9,15 @@ class EmployeesConfig(AppConfig):
     def ready(self):
         # Import signals when Django starts
         import apps.employees.signals
+
+        post_migrate.connect(create_search_table, sender=self)
+
+
+def create_search_table(using, **kwargs):
+    # SQLite has no trigram index: the search document is mirrored in an FTS5
+    # table, recreated after migrations since table rebuilds drop its triggers
+    from django.db import connections
+
+    from .search import ensure_fts_table
+
+    ensure_fts_table(connections[using])
@@ -0,0 +1,24 @@
+# apps/employees/backends.py
+from django.contrib.auth.backends import ModelBackend
+
+from .permissions import user_permissions
+
+
+class CachedPermissionBackend(ModelBackend):
+    """
+    ModelBackend that resolves permissions from the shared cache (see
+    apps.employees.permissions), so checks in views and templates cost no
+    SQL once a user's permissions have been resolved.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if (
+            not user_obj.is_active
+            or user_obj.is_anonymous
+            or obj is not None
+            or user_obj.is_superuser
+        ):
+            return super().get_all_permissions(user_obj, obj)
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = set(user_permissions(user_obj))
+        return user_obj._perm_cache
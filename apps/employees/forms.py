@@ -3,13 +3,13 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
-from .models import Department, Employee
+from .models import Department, Employee, EmployeeHierarchy
 
 
 class DepartmentForm(forms.ModelForm):
     class Meta:
         model = Department
-        fields = ["name", "color", "code", "description", "is_active"]
+        fields = ["name", "color", "code", "description", "min_staff", "is_active"]
         widgets = {
             "name": forms.TextInput(
                 attrs={"class": "form-control", "placeholder": "Ej: Recepción"}
@@ -30,6 +30,7 @@ class DepartmentForm(forms.ModelForm):
                     "placeholder": "Descripción del departamento...",
                 }
             ),
+            "min_staff": forms.NumberInput(attrs={"class": "form-control", "min": 0}),
             "is_active": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
         labels = {
@@ -37,6 +38,7 @@ class DepartmentForm(forms.ModelForm):
             "color": "Color Identificativo",
             "code": "Código",
             "description": "Descripción",
+            "min_staff": "Personal mínimo disponible",
             "is_active": "Departamento Activo",
         }
 
@@ -102,6 +104,7 @@ class EmployeeForm(forms.ModelForm):
         fields = [
             "department",
             "role",
+            "manager",
             "dni",
             "address",
             "gender",
@@ -121,6 +124,7 @@ class EmployeeForm(forms.ModelForm):
                     "class": "form-control",
                 }
             ),
+            "manager": forms.Select(attrs={"class": "form-control"}),
             "phone": forms.TextInput(
                 attrs={"class": "form-control", "placeholder": "+34 600 000 000"}
             ),
@@ -160,6 +164,17 @@ class EmployeeForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Un empleado no puede depender de sí mismo ni de alguien de su equipo
+        managers = Employee.objects.select_related("user").order_by("user__first_name")
+        if self.instance.pk:
+            managers = managers.exclude(
+                pk__in=EmployeeHierarchy.objects.filter(ancestor=self.instance).values(
+                    "descendant"
+                )
+            )
+        self.fields["manager"].queryset = managers
+        self.fields["manager"].label_from_instance = Employee.get_full_name
+
         # Prellenar campos del User si existe
         if self.instance and self.instance.pk:
             try:
@@ -182,3 +197,15 @@ class EmployeeForm(forms.ModelForm):
             profile.save()
 
         return profile
+
+
+class EmployeeImportForm(forms.Form):
+    file = forms.FileField(
+        label="Fichero CSV",
+        widget=forms.FileInput(attrs={"class": "form-control", "accept": ".csv"}),
+    )
+    unusable_passwords = forms.BooleanField(
+        label="Sin contraseña: generar enlaces para que cada empleado elija la suya",
+        required=False,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
@@ -0,0 +1,71 @@
+# apps/employees/groups.py
+"""
+Auth groups of each role. The role to group mapping is resolved to group
+ids once and kept in the shared cache, so syncing the groups of a user only
+touches the memberships that actually change.
+"""
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+from .models import Employee
+
+CACHE_KEY = "employees:role_groups"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+Role = Employee.RoleChoices
+
+# Role to group mapping
+ROLE_GROUPS = {
+    Role.DIRECTOR: ["Management", "Supervisors"],
+    Role.RECEPTION_MANAGER: ["Reception", "Supervisors"],
+    Role.RECEPTIONIST: ["Reception"],
+    Role.HOUSEKEEPING_MANAGER: ["Housekeeping", "Supervisors"],
+    Role.HOUSEKEEPER: ["Housekeeping"],
+    Role.MAINTENANCE_MANAGER: ["Maitenance", "Supervisors"],
+    Role.MAINTENANCE: ["Maitenance"],
+    Role.RRHH: ["RRHH", "Supervisors"],
+}
+
+
+def _load():
+    names = {name for group_names in ROLE_GROUPS.values() for name in group_names}
+    Group.objects.bulk_create(
+        [Group(name=name) for name in names], ignore_conflicts=True
+    )
+    ids = dict(Group.objects.filter(name__in=names).values_list("name", "pk"))
+    role_groups = {
+        role: frozenset(ids[name] for name in group_names)
+        for role, group_names in ROLE_GROUPS.items()
+    }
+    cache.set(CACHE_KEY, role_groups, CACHE_TIMEOUT)
+    return role_groups
+
+
+def role_group_ids():
+    """{role: group ids}, creating the groups on first use"""
+    role_groups = cache.get(CACHE_KEY)
+    if role_groups is None:
+        role_groups = _load()
+    return role_groups
+
+
+def invalidate():
+    cache.delete(CACHE_KEY)
+
+
+def sync_user_groups(user, role):
+    """Adds and removes only the memberships that differ from the role's groups"""
+    wanted = role_group_ids().get(role, frozenset())
+    current = set(user.groups.values_list("pk", flat=True))
+
+    if current - wanted:
+        user.groups.remove(*(current - wanted))
+    missing = wanted - current
+    if missing:
+        groups = list(Group.objects.filter(pk__in=missing))
+        if len(groups) != len(missing):
+            # A group was deleted after the mapping was cached
+            invalidate()
+            return sync_user_groups(user, role)
+        user.groups.add(*groups)
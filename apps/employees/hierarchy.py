@@ -0,0 +1,91 @@
+# apps/employees/hierarchy.py
+"""
+Maintenance of the reporting-line closure table (EmployeeHierarchy).
+
+Every ancestor/descendant pair is stored with its depth, so "everyone
+under X", "X's chain of command" and team aggregates are single indexed
+lookups at any depth. When a manager changes only the paths between the
+moved subtree and its old and new superiors are rewritten.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import EmployeeHierarchy
+
+BATCH_SIZE = 1000
+
+CYCLE_ERROR = "An employee cannot report to their own team"
+
+
+@transaction.atomic
+def add_employee(employee):
+    """Paths of a new employee: itself and every superior of its manager"""
+    paths = [
+        EmployeeHierarchy(ancestor_id=employee.pk, descendant_id=employee.pk, depth=0)
+    ]
+    if employee.manager_id:
+        paths += [
+            EmployeeHierarchy(
+                ancestor_id=ancestor_id, descendant_id=employee.pk, depth=depth + 1
+            )
+            for ancestor_id, depth in _superiors(employee.manager_id)
+        ]
+    EmployeeHierarchy.objects.bulk_create(paths)
+
+
+def detach(employee):
+    """Removes the paths from an employee's superiors to its whole subtree"""
+    EmployeeHierarchy.objects.filter(
+        descendant__in=EmployeeHierarchy.objects.filter(ancestor=employee).values(
+            "descendant"
+        ),
+        ancestor__in=EmployeeHierarchy.objects.filter(
+            descendant=employee, depth__gt=0
+        ).values("ancestor"),
+    ).delete()
+
+
+def check_manager(employee, manager_id):
+    """Raises ValidationError if the new manager is in the employee's subtree"""
+    if manager_id is not None and (
+        EmployeeHierarchy.objects.filter(
+            ancestor_id=employee.pk, descendant_id=manager_id
+        ).exists()
+    ):
+        raise ValidationError(CYCLE_ERROR)
+
+
+@transaction.atomic
+def move_subtree(employee, manager_id):
+    """Hangs an employee, and everyone under them, from a new manager (or none)"""
+    subtree = list(
+        EmployeeHierarchy.objects.filter(ancestor=employee).values_list(
+            "descendant_id", "depth"
+        )
+    )
+    if manager_id is not None and manager_id in {pk for pk, _ in subtree}:
+        raise ValidationError(CYCLE_ERROR)
+
+    detach(employee)
+    if manager_id is None:
+        return
+    EmployeeHierarchy.objects.bulk_create(
+        [
+            EmployeeHierarchy(
+                ancestor_id=ancestor_id,
+                descendant_id=descendant_id,
+                depth=ancestor_depth + depth + 1,
+            )
+            for ancestor_id, ancestor_depth in _superiors(manager_id)
+            for descendant_id, depth in subtree
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def _superiors(employee_id):
+    """(ancestor id, depth) of an employee, itself included at depth 0"""
+    return EmployeeHierarchy.objects.filter(descendant_id=employee_id).values_list(
+        "ancestor_id", "depth"
+    )
@@ -0,0 +1,351 @@
+# apps/employees/imports.py
+"""
+Bulk onboarding of employees from a CSV file.
+
+The whole file is validated before anything is written. Then users,
+employees, reporting-line paths and group memberships are each inserted
+with one bulk INSERT inside a single transaction. bulk_create sends no
+post_save signals, so the work done by the signals and by Employee.save
+(profile creation, groups, hierarchy, search document) is done here in
+bulk instead.
+
+Hashing passwords is the slow part of creating users. Rows may carry
+their own password, or the import can give every user an unusable
+password and return password reset tokens so they choose their own.
+"""
+
+import csv
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.dateparse import parse_date
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from . import groups, permissions
+from .models import Department, Employee, EmployeeHierarchy
+from .search import build_document
+
+COLUMNS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "department",
+    "role",
+    "employee_number",
+    "manager",
+    "hire_date",
+    "phone",
+    "password",
+)
+REQUIRED_COLUMNS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "department",
+    "role",
+)
+
+MAX_ROWS = 2000
+
+BATCH_SIZE = 500
+
+MIN_PASSWORD_LENGTH = 8
+
+
+class ImportFileError(ValueError):
+    """The file cannot be read as an employee CSV"""
+
+
+@dataclass
+class ImportRow:
+    line: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    department: str
+    role: str
+    employee_number: str = ""
+    manager: str = ""
+    hire_date: str = ""
+    phone: str = ""
+    password: str = field(default="", repr=False)
+    errors: list = field(default_factory=list)
+    employee: Employee = None
+
+
+@dataclass
+class ResetToken:
+    user: User
+    uidb64: str
+    token: str
+
+
+def read_rows(lines):
+    """
+    Parses CSV lines (any iterable of str, e.g. an open file) into
+    ImportRows. Department is the department code; manager is the
+    employee number of an existing or imported employee.
+    """
+    reader = csv.DictReader(lines)
+    header = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFileError(f"Faltan columnas: {', '.join(missing)}")
+    reader.fieldnames = header
+
+    rows = []
+    for record in reader:
+        if len(rows) >= MAX_ROWS:
+            raise ImportFileError(f"Máximo {MAX_ROWS} empleados por fichero")
+        values = {
+            name: (record.get(name) or "").strip() for name in COLUMNS if name in header
+        }
+        if any(values.values()):
+            rows.append(ImportRow(line=reader.line_num, **values))
+    if not rows:
+        raise ImportFileError("El fichero no contiene empleados")
+    return rows
+
+
+def validate(rows, unusable_passwords=False):
+    """
+    Checks every row against the file and the database with a constant
+    number of queries. Fills row.errors and returns [(line, message)].
+    """
+    departments = {
+        department.code: department
+        for department in Department.objects.filter(
+            code__in={row.department.upper() for row in rows}
+        )
+    }
+    taken_usernames = set(
+        User.objects.filter(username__in=[row.username for row in rows]).values_list(
+            "username", flat=True
+        )
+    )
+    numbers = {row.employee_number for row in rows if row.employee_number}
+    managers = {row.manager for row in rows if row.manager}
+    existing_numbers = set(
+        Employee.objects.filter(employee_number__in=numbers | managers).values_list(
+            "employee_number", flat=True
+        )
+    )
+
+    username_validator = UnicodeUsernameValidator()
+    seen = {"username": set(), "email": set(), "employee_number": set()}
+    for row in rows:
+        for name in REQUIRED_COLUMNS:
+            if not getattr(row, name):
+                row.errors.append(f"Falta {name}")
+
+        if row.username:
+            try:
+                username_validator(row.username)
+            except ValidationError:
+                row.errors.append(f"Usuario no válido: {row.username}")
+            if len(row.username) > 150:
+                row.errors.append("Usuario demasiado largo")
+            if row.username in taken_usernames:
+                row.errors.append(f"El usuario {row.username} ya existe")
+        if row.email:
+            try:
+                validate_email(row.email)
+            except ValidationError:
+                row.errors.append(f"Email no válido: {row.email}")
+
+        if row.department:
+            row.department = row.department.upper()
+            if row.department not in departments:
+                row.errors.append(f"Departamento desconocido: {row.department}")
+        if row.role and row.role not in Employee.RoleChoices.values:
+            row.errors.append(f"Puesto desconocido: {row.role}")
+
+        if row.employee_number:
+            if len(row.employee_number) > 20:
+                row.errors.append("Número de empleado demasiado largo")
+            if row.employee_number in existing_numbers:
+                row.errors.append(
+                    f"El número de empleado {row.employee_number} ya existe"
+                )
+        if row.manager:
+            if row.manager == row.employee_number:
+                row.errors.append("Un empleado no puede ser su propio responsable")
+            elif row.manager not in numbers and row.manager not in existing_numbers:
+                row.errors.append(f"Responsable desconocido: {row.manager}")
+
+        if row.hire_date and parse_date(row.hire_date) is None:
+            row.errors.append(f"Fecha de contratación no válida: {row.hire_date}")
+        if len(row.phone) > 20:
+            row.errors.append("Teléfono demasiado largo")
+
+        if not unusable_passwords and len(row.password) < MIN_PASSWORD_LENGTH:
+            row.errors.append(
+                f"La contraseña debe tener al menos {MIN_PASSWORD_LENGTH} caracteres"
+            )
+
+        for name, values in seen.items():
+            value = getattr(row, name)
+            if name == "email":
+                value = value.lower()
+            if value and value in values:
+                row.errors.append(f"{name} repetido en el fichero: {value}")
+            values.add(value)
+
+    _check_manager_cycles(rows)
+
+    for row in rows:
+        row.department = departments.get(row.department, row.department)
+    return [(row.line, error) for row in rows for error in row.errors]
+
+
+def _check_manager_cycles(rows):
+    manager_of = {
+        row.employee_number: row.manager for row in rows if row.employee_number
+    }
+    for row in rows:
+        visited = set()
+        number = row.employee_number
+        while number in manager_of and number not in visited:
+            visited.add(number)
+            number = manager_of[number]
+        if number and number in visited:
+            row.errors.append("La cadena de responsables forma un ciclo")
+
+
+@transaction.atomic
+def import_employees(rows, unusable_passwords=False):
+    """
+    Creates the validated rows. Returns the reset tokens of the new users
+    when unusable_passwords is set, otherwise an empty list.
+    """
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=row.username,
+                email=row.email,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                password=make_password(None if unusable_passwords else row.password),
+            )
+            for row in rows
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    _ensure_pks(users, User, "username")
+
+    existing = dict(
+        Employee.objects.filter(
+            employee_number__in={row.manager for row in rows if row.manager}
+        ).values_list("employee_number", "pk")
+    )
+    employees = []
+    for row, user in zip(rows, users):
+        row.employee = Employee(
+            user=user,
+            department=row.department,
+            role=row.role,
+            employee_number=row.employee_number or None,
+            manager_id=existing.get(row.manager),
+            hire_date=parse_date(row.hire_date) if row.hire_date else None,
+            phone=row.phone,
+        )
+        row.employee.search_document = build_document(row.employee)
+        employees.append(row.employee)
+    Employee.objects.bulk_create(employees, batch_size=BATCH_SIZE)
+    _ensure_pks(employees, Employee, "user_id")
+
+    # Managers imported in the same file only have a pk now
+    created = {row.employee_number: row.employee.pk for row in rows}
+    reporting = []
+    for row in rows:
+        if row.manager and row.manager not in existing:
+            row.employee.manager_id = created[row.manager]
+            reporting.append(row.employee)
+    Employee.objects.bulk_update(reporting, ["manager"], batch_size=BATCH_SIZE)
+
+    EmployeeHierarchy.objects.bulk_create(
+        _hierarchy_paths(employees), batch_size=BATCH_SIZE
+    )
+    _add_group_memberships(rows)
+
+    if not unusable_passwords:
+        return []
+    return [
+        ResetToken(
+            user=user,
+            uidb64=urlsafe_base64_encode(force_bytes(user.pk)),
+            token=default_token_generator.make_token(user),
+        )
+        for user in users
+    ]
+
+
+def _ensure_pks(objects, model, key):
+    # Backends that cannot return ids from a bulk INSERT leave them unset
+    if all(obj.pk for obj in objects):
+        return
+    pks = dict(
+        model.objects.filter(
+            **{f"{key}__in": [getattr(obj, key) for obj in objects]}
+        ).values_list(key, "pk")
+    )
+    for obj in objects:
+        obj.pk = pks[getattr(obj, key)]
+
+
+def _hierarchy_paths(employees):
+    """Closure rows of the new employees, superiors of existing managers included"""
+    new = {employee.pk: employee for employee in employees}
+    existing_managers = {
+        employee.manager_id
+        for employee in employees
+        if employee.manager_id and employee.manager_id not in new
+    }
+    superiors = {}
+    for descendant_id, ancestor_id, depth in EmployeeHierarchy.objects.filter(
+        descendant_id__in=existing_managers
+    ).values_list("descendant_id", "ancestor_id", "depth"):
+        superiors.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+    def chain(pk):
+        # (ancestor, depth) pairs of an employee, itself included
+        if pk not in superiors:
+            manager_id = new[pk].manager_id
+            superiors[pk] = [(pk, 0)] + (
+                [(ancestor_id, depth + 1) for ancestor_id, depth in chain(manager_id)]
+                if manager_id
+                else []
+            )
+        return superiors[pk]
+
+    return [
+        EmployeeHierarchy(ancestor_id=ancestor_id, descendant_id=pk, depth=depth)
+        for pk in new
+        for ancestor_id, depth in chain(pk)
+    ]
+
+
+def _add_group_memberships(rows):
+    # Fresh mapping, so no membership points to a deleted group
+    groups.invalidate()
+    role_groups = groups.role_group_ids()
+    Membership = User.groups.through
+    Membership.objects.bulk_create(
+        [
+            Membership(user_id=row.employee.user_id, group_id=group_id)
+            for row in rows
+            for group_id in role_groups.get(row.role, ())
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    permissions.bump()
@@ -0,0 +1,67 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from apps.employees.imports import (
+    ImportFileError,
+    import_employees,
+    read_rows,
+    validate,
+)
+
+
+class Command(BaseCommand):
+    help = "Create employees in bulk from a CSV file (validated as a whole first)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichero CSV con una fila por empleado")
+        parser.add_argument(
+            "--unusable-passwords",
+            action="store_true",
+            help="Sin contraseña: genera enlaces para que cada empleado la elija",
+        )
+        parser.add_argument(
+            "--reset-links",
+            help="Fichero CSV donde guardar los enlaces de restablecimiento",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Solo valida el fichero"
+        )
+
+    def handle(self, *args, **options):
+        unusable = options["unusable_passwords"]
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as lines:
+                rows = read_rows(lines)
+        except (OSError, UnicodeDecodeError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        errors = validate(rows, unusable_passwords=unusable)
+        if errors:
+            for line, error in errors:
+                self.stderr.write(f"Línea {line}: {error}")
+            raise CommandError(
+                f"{len(errors)} errores, no se ha creado ningún empleado"
+            )
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(rows)} empleados válidos"))
+            return
+
+        tokens = import_employees(rows, unusable_passwords=unusable)
+        if tokens and options["reset_links"]:
+            with open(options["reset_links"], "w", newline="") as output:
+                writer = csv.writer(output)
+                writer.writerow(["username", "email", "reset_path"])
+                for token in tokens:
+                    writer.writerow(
+                        [
+                            token.user.username,
+                            token.user.email,
+                            reverse(
+                                "password_reset_confirm",
+                                kwargs={"uidb64": token.uidb64, "token": token.token},
+                            ),
+                        ]
+                    )
+        self.stdout.write(self.style.SUCCESS(f"{len(rows)} empleados creados"))
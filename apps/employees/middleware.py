@@ -0,0 +1,60 @@
+# apps/employees/middleware.py
+"""
+Employee profile of the logged-in user, loaded once with its department
+and kept in the shared cache until the profile is edited.
+"""
+
+from django.core.cache import cache
+
+from .models import Employee
+
+CACHE_TIMEOUT = 60 * 5
+
+# Cached for users without an employee profile (e.g. superusers)
+NO_EMPLOYEE = "none"
+
+
+def cache_key(user_id):
+    return f"employees:request:{user_id}"
+
+
+def invalidate(*user_ids):
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
+
+
+def get_employee(user):
+    """Employee of a user with its department loaded, cached per user"""
+    employee = cache.get(cache_key(user.pk))
+    if employee is None:
+        employee = (
+            Employee.objects.select_related("department")
+            .filter(user_id=user.pk)
+            .first()
+        ) or NO_EMPLOYEE
+        cache.set(cache_key(user.pk), employee, CACHE_TIMEOUT)
+    if employee == NO_EMPLOYEE:
+        return None
+    # The request's own user object, so views and templates share it
+    employee.user = user
+    return employee
+
+
+class EmployeeMiddleware:
+    """
+    Sets request.employee (None for anonymous users or users without a
+    profile) and primes request.user.employee with it, so views and the
+    navbar reach the employee and its department without queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.employee = None
+        if request.user.is_authenticated:
+            request.employee = get_employee(request.user)
+            # A cached None makes hasattr(user, "employee") False without SQL
+            Employee.user.field.remote_field.set_cached_value(
+                request.user, request.employee
+            )
+        return self.get_response(request)
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0006_employee_address_employee_birth_date_employee_dni_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="department",
+            name="min_staff",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Employees that must be available every day; 0 uses the default ratio",
+                verbose_name="Minimum staff on duty",
+            ),
+        ),
+    ]
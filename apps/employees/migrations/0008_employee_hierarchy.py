@@ -0,0 +1,88 @@
+# Generated by Django 6.0 on 2026-10-19 00:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_self_paths(apps, schema_editor):
+    # No manager is set yet, so every employee is only its own ancestor
+    Employee = apps.get_model("employees", "Employee")
+    EmployeeHierarchy = apps.get_model("employees", "EmployeeHierarchy")
+    EmployeeHierarchy.objects.bulk_create(
+        [
+            EmployeeHierarchy(ancestor_id=pk, descendant_id=pk, depth=0)
+            for pk in Employee.objects.values_list("pk", flat=True).iterator()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0007_department_min_staff"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="manager",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Direct manager in the reporting line",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reports",
+                to="employees.employee",
+                verbose_name="Manager",
+            ),
+        ),
+        migrations.CreateModel(
+            name="EmployeeHierarchy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveSmallIntegerField(verbose_name="Depth")),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subordinate_paths",
+                        to="employees.employee",
+                        verbose_name="Ancestor",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="superior_paths",
+                        to="employees.employee",
+                        verbose_name="Descendant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Hierarchy path",
+                "verbose_name_plural": "Hierarchy paths",
+                "indexes": [
+                    models.Index(
+                        fields=["descendant", "depth"],
+                        name="employees_e_descend_4a8e83_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ancestor", "descendant"), name="unique_hierarchy_path"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(add_self_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 6.0 on 2026-10-19 00:42
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+
+def fill_search_documents(apps, schema_editor):
+    Employee = apps.get_model("employees", "Employee")
+    employees = list(Employee.objects.select_related("user", "department"))
+    for employee in employees:
+        user = employee.user
+        department = employee.department
+        employee.search_document = normalize(
+            " ".join(
+                [
+                    user.first_name,
+                    user.last_name,
+                    user.username,
+                    user.email,
+                    employee.employee_number or "",
+                    department.name,
+                    department.code,
+                    str(employee.get_role_display()),
+                ]
+            )
+        )
+    Employee.objects.bulk_update(employees, ["search_document"], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    # SQLite gets an FTS5 table instead, see EmployeesConfig
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS employees_employee_search_trgm "
+        "ON employees_employee USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS employees_employee_search_trgm")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0008_employee_hierarchy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="search_document",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Normalised names, number, department and role for searches",
+                verbose_name="Search document",
+            ),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,11 +1,16 @@
 from datetime import timedelta
+from functools import cached_property
 
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import Count, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.mixins import TrackedFieldsMixin
+
 
 class Department(models.Model):
     class ColorChoices(models.TextChoices):
@@ -47,6 +52,13 @@ class Department(models.Model):
         help_text="3 uppercase letters code (e.g. : DIR, REC, LIM)",
     )
     description = models.TextField(_("Description"), blank=True)
+    min_staff = models.PositiveSmallIntegerField(
+        _("Minimum staff on duty"),
+        default=0,
+        help_text=_(
+            "Employees that must be available every day; 0 uses the default ratio"
+        ),
+    )
     is_active = models.BooleanField(_("Active"), default=True)
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
 
@@ -60,7 +72,46 @@ class Department(models.Model):
         super().save(*args, **kwargs)
 
 
-class Employee(models.Model):
+class EmployeeQuerySet(models.QuerySet):
+    def supervised_by(self, employee):
+        """
+        Team of a supervisor as a plain filter, so it compiles into a single
+        subquery wherever it is used (everyone for director and rrhh)
+        """
+        if not employee.can_manage_team():
+            return self.none()
+        if employee.can_see_all():
+            return self.all()
+        # Their reporting line plus the roles they supervise
+        roles = Employee.SUPERVISED_ROLES.get(employee.role, ())
+        return self.filter(Q(role__in=roles) | Q(pk__in=_descendant_ids(employee)))
+
+    def under(self, employee):
+        """Everyone reporting to an employee, directly or not, at any depth"""
+        return self.filter(pk__in=_descendant_ids(employee))
+
+    def chain_of_command(self, employee):
+        """Managers above an employee, closest first"""
+        return self.filter(
+            subordinate_paths__descendant=employee, subordinate_paths__depth__gt=0
+        ).order_by("subordinate_paths__depth")
+
+    def with_team_size(self):
+        """Annotates how many people report to each employee at any depth"""
+        return self.annotate(
+            team_size=Count(
+                "subordinate_paths", filter=Q(subordinate_paths__depth__gt=0)
+            )
+        )
+
+
+def _descendant_ids(employee):
+    return EmployeeHierarchy.objects.filter(ancestor=employee, depth__gt=0).values(
+        "descendant"
+    )
+
+
+class Employee(TrackedFieldsMixin, models.Model):
     class RoleChoices(models.TextChoices):
         # Direction
         DIRECTOR = "director", _("Director")
@@ -94,6 +145,15 @@ class Employee(models.Model):
         verbose_name=_("Departament"),
         on_delete=models.PROTECT,
     )
+    manager = models.ForeignKey(
+        "self",
+        verbose_name=_("Manager"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reports",
+        help_text=_("Direct manager in the reporting line"),
+    )
     role = models.CharField(
         _("Role"),
         max_length=30,
@@ -125,9 +185,34 @@ class Employee(models.Model):
         _("Biography"), blank=True, help_text=_("Additional employee information")
     )
     salary = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    search_document = models.TextField(
+        _("Search document"),
+        blank=True,
+        default="",
+        editable=False,
+        help_text=_("Normalised names, number, department and role for searches"),
+    )
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Last updated"), auto_now=True)
 
+    # Roles that see and manage the whole staff
+    FULL_ACCESS_ROLES = ("director", "rrhh")
+
+    # Mapping of managers to the roles of their subordinates
+    SUPERVISED_ROLES = {
+        RoleChoices.RECEPTION_MANAGER: (RoleChoices.RECEPTIONIST,),
+        RoleChoices.HOUSEKEEPING_MANAGER: (RoleChoices.HOUSEKEEPER,),
+        RoleChoices.MAINTENANCE_MANAGER: (RoleChoices.MAINTENANCE,),
+    }
+
+    # Fields whose changes are applied to groups, hierarchy and search on save
+    TRACKED_FIELDS = ("role", "manager_id", "department_id", "employee_number")
+
+    # Own fields that are part of the search document
+    SEARCH_FIELDS = ("role", "department_id", "employee_number")
+
+    objects = EmployeeQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Employee Profile")
         verbose_name_plural = _("Employee Profiles")
@@ -135,32 +220,55 @@ class Employee(models.Model):
     def __str__(self):
         return f"{self.get_full_name()} - {self.get_role_display()}"
 
+    def _search_outdated(self):
+        # A loaded user may have been edited; an unloaded one was not
+        return Employee.user.is_cached(self) or any(
+            self.has_changed(name) for name in self.SEARCH_FIELDS
+        )
+
+    def clean(self):
+        super().clean()
+        if self.manager_id and self.pk:
+            if self.manager_id == self.pk or (
+                EmployeeHierarchy.objects.filter(
+                    ancestor_id=self.pk, descendant_id=self.manager_id
+                ).exists()
+            ):
+                raise ValidationError(
+                    {"manager": _("An employee cannot report to their own team")}
+                )
+
     def save(self, *args, **kwargs):
+        from . import hierarchy
+        from .search import build_document
+
+        creating = self._state.adding
+        if creating or self._search_outdated():
+            self.search_document = build_document(self)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                # Partial saves (e.g. from the user post_save) refresh it too
+                kwargs["update_fields"] = {*update_fields, "search_document"}
+        if not creating and self.has_changed("manager_id"):
+            # Rejected before the new manager is written
+            hierarchy.check_manager(self, self.manager_id)
         super().save(*args, **kwargs)
-        self.assign_to_group()
+
+        # Groups are only synced when the role changes
+        if creating or self.has_changed("role"):
+            self.assign_to_group()
+
+        if creating:
+            hierarchy.add_employee(self)
+        elif self.has_changed("manager_id"):
+            hierarchy.move_subtree(self, self.manager_id)
+        self.remember_tracked()
 
     def assign_to_group(self):
         """Assigns the user to the corresponding group based on their role"""
-        from django.contrib.auth.models import Group
-
-        # Role to group mapping
-        role_group_map = {
-            "director": ["Management", "Supervisors"],
-            "reception_manager": ["Reception", "Supervisors"],
-            "receptionist": ["Reception"],
-            "housekeeping_manager": ["Housekeeping", "Supervisors"],
-            "housekeeper": ["Housekeeping"],
-            "maitenance_manager": ["Maitenance", "Supervisors"],
-            "mantenance": ["Maitenance"],
-            "rrhh": ["RRHH", "Supervisors"],
-        }
-
-        groups = role_group_map.get(self.role, [])
-        self.user.groups.clear()
-
-        for group_name in groups:
-            group, created = Group.objects.get_or_create(name=group_name)
-            self.user.groups.add(group)
+        from .groups import sync_user_groups
+
+        sync_user_groups(self.user, self.role)
 
     def is_supervisor(self):
         """Checks if the user is a supervisor/manager"""
@@ -176,21 +284,22 @@ class Employee(models.Model):
         """Checks if they can manage their team"""
         return self.is_supervisor()
 
+    def can_see_all(self):
+        """Checks if they see and manage the whole staff"""
+        return self.role in self.FULL_ACCESS_ROLES
+
     def get_supervised_employees(self):
         """Gets the employees under their supervision"""
-        if not self.can_manage_team():
-            return Employee.objects.none()
+        return Employee.objects.supervised_by(self)
 
-        # Mapping of managers to their subordinates
-        supervision_map = {
-            "director": Employee.objects.all(),  # Sees everyone
-            "reception_manager": Employee.objects.filter(role="receptionist"),
-            "housekeeper_manager": Employee.objects.filter(role="housekeeper"),
-            "maintenance_manager": Employee.objects.filter(role="maintenance"),
-            "rrhh": Employee.objects.all(),  # Sees everyone
-        }
-
-        return supervision_map.get(self.role, Employee.objects.none())
+    @cached_property
+    def team_ids(self):
+        """
+        Ids of the supervised employees, loaded once per instance. The
+        employee of request.user lives for one request, so this is a
+        per-request cache of the team.
+        """
+        return frozenset(self.get_supervised_employees().values_list("pk", flat=True))
 
     def get_full_name(self):
         return self.user.get_full_name() or self.user.username
@@ -200,13 +309,15 @@ class Employee(models.Model):
         return self.attendances.filter(check_out__isnull=True).first()
 
     def is_checked_in(self):
-        """Gets if the employee is currently clocked in"""
-        return self.get_current_attendance() is not None
+        """Gets if the employee is currently clocked in (from the presence cache)"""
+        from apps.attendance import presence
+
+        return presence.is_present(self.pk)
 
     def get_today_work_hours(self):
         """Calculates hours worked today"""
-        today = timezone.now().date()
-        attendances = self.attendances.filter(check_in__date=today)
+        today = timezone.localdate()
+        attendances = self.attendances.filter(work_date=today)
 
         total_hours = timedelta()
         for attendance in attendances:
@@ -214,3 +325,41 @@ class Employee(models.Model):
                 total_hours += attendance.duration()
 
         return total_hours
+
+
+class EmployeeHierarchy(models.Model):
+    """
+    Closure table of the reporting lines: one row per (ancestor, descendant)
+    pair at any depth, each employee paired with itself at depth 0. Kept in
+    sync by apps.employees.hierarchy when employees are created, moved or
+    deleted.
+    """
+
+    ancestor = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="subordinate_paths",
+        verbose_name=_("Ancestor"),
+    )
+    descendant = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="superior_paths",
+        verbose_name=_("Descendant"),
+    )
+    depth = models.PositiveSmallIntegerField(_("Depth"))
+
+    class Meta:
+        verbose_name = _("Hierarchy path")
+        verbose_name_plural = _("Hierarchy paths")
+        indexes = [
+            models.Index(fields=["descendant", "depth"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="unique_hierarchy_path"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
@@ -0,0 +1,76 @@
+# apps/employees/permissions.py
+"""
+Effective permissions of users, resolved through their groups and kept in
+the shared cache: one entry per group and one per user. Every entry is
+stored under a global version that is bumped whenever groups, memberships
+or permissions change, so stale entries are never read again and simply
+expire.
+"""
+
+import time
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+VERSION_KEY = "auth:perms:version"
+CACHE_TIMEOUT = 60 * 60
+
+
+def version():
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        # Time based, so a lost version never brings back older entries
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def bump():
+    """Invalidates every cached permission set"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        version()
+
+
+def _names(rows):
+    return {f"{app_label}.{codename}" for app_label, codename in rows}
+
+
+def group_permissions(group_ids, current_version):
+    """Permissions of a set of groups, one query for the groups not cached"""
+    keys = {
+        group_id: f"auth:perms:group:{group_id}:{current_version}"
+        for group_id in group_ids
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = [group_id for group_id, key in keys.items() if key not in cached]
+    if missing:
+        by_group = {group_id: set() for group_id in missing}
+        for group_id, app_label, codename in Permission.objects.filter(
+            group__in=missing
+        ).values_list("group", "content_type__app_label", "codename"):
+            by_group[group_id].add(f"{app_label}.{codename}")
+        fresh = {
+            keys[group_id]: frozenset(perms) for group_id, perms in by_group.items()
+        }
+        cache.set_many(fresh, CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return set().union(*cached.values())
+
+
+def user_permissions(user):
+    """Effective permissions of a user as {"app_label.codename"}"""
+    current_version = version()
+    key = f"auth:perms:user:{user.pk}:{current_version}"
+    perms = cache.get(key)
+    if perms is None:
+        own = _names(
+            user.user_permissions.values_list("content_type__app_label", "codename")
+        )
+        group_ids = user.groups.values_list("pk", flat=True)
+        perms = frozenset(own | group_permissions(group_ids, current_version))
+        cache.set(key, perms, CACHE_TIMEOUT)
+    return perms
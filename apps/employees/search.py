@@ -0,0 +1,143 @@
+# apps/employees/search.py
+"""
+Employee directory search.
+
+Every employee keeps a normalised search document (lower case, accents
+folded) with their names, username, e-mail, employee number, department
+and role. On PostgreSQL the document has a pg_trgm GIN index, so substring
+matches are index scans; on SQLite an FTS5 table with the trigram
+tokenizer mirrors it through triggers. Other backends use a plain LIKE.
+"""
+
+import unicodedata
+
+from django.db import DatabaseError, connections
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "employees_employee_fts"
+
+# Shortest term the trigram indexes can match
+MIN_INDEXED_LENGTH = 3
+
+AUTOCOMPLETE_LIMIT = 10
+
+
+def normalize(text):
+    """Lower case, accents folded and whitespace collapsed"""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+
+def build_document(employee):
+    user = employee.user
+    department = employee.department if employee.department_id else None
+    return normalize(
+        " ".join(
+            [
+                user.first_name,
+                user.last_name,
+                user.username,
+                user.email,
+                employee.employee_number or "",
+                department.name if department else "",
+                department.code if department else "",
+                str(employee.get_role_display()),
+            ]
+        )
+    )
+
+
+def search(queryset, term):
+    """Employees whose document contains every word of the term"""
+    connection = connections[queryset.db]
+    use_fts = connection.vendor == "sqlite" and has_fts_table(connection)
+    for word in normalize(term).split():
+        if use_fts and len(word) >= MIN_INDEXED_LENGTH:
+            queryset = queryset.filter(
+                pk__in=RawSQL(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                    ['"' + word.replace('"', '""') + '"'],
+                )
+            )
+        else:
+            queryset = queryset.filter(search_document__contains=word)
+    return queryset
+
+
+def autocomplete(queryset, term, limit=AUTOCOMPLETE_LIMIT):
+    """Best matches for a picker: [{"id", "name", "employee_number", "department"}]"""
+    employees = search(queryset, term).select_related("user", "department")
+    return [
+        {
+            "id": employee.pk,
+            "name": employee.get_full_name(),
+            "employee_number": employee.employee_number,
+            "department": employee.department.name,
+        }
+        for employee in employees.order_by("user__first_name", "user__last_name")[
+            :limit
+        ]
+    ]
+
+
+def refresh_documents(employees):
+    """Recomputes the documents of some employees, e.g. after a department edit"""
+    from .models import Employee
+
+    employees = list(employees.select_related("user", "department"))
+    for employee in employees:
+        employee.search_document = build_document(employee)
+    Employee.objects.bulk_update(employees, ["search_document"], batch_size=500)
+
+
+def has_fts_table(connection):
+    if not hasattr(connection, "_employee_fts"):
+        with connection.cursor() as cursor:
+            connection._employee_fts = FTS_TABLE in (
+                connection.introspection.table_names(cursor)
+            )
+    return connection._employee_fts
+
+
+def ensure_fts_table(connection):
+    """
+    Creates the SQLite FTS5 mirror of the documents and its triggers. Run
+    after every migrate, since SQLite table rebuilds drop the triggers.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "search_document, content='employees_employee', "
+                "content_rowid='id', tokenize='trigram')"
+            )
+        except DatabaseError:
+            # SQLite built without FTS5 or older than 3.34: LIKE fallback
+            return
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai "
+            "AFTER INSERT ON employees_employee BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, search_document) "
+            "VALUES (new.id, new.search_document); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad "
+            "AFTER DELETE ON employees_employee BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+            "VALUES ('delete', old.id, old.search_document); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+            "AFTER UPDATE OF search_document ON employees_employee BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+            "VALUES ('delete', old.id, old.search_document); "
+            f"INSERT INTO {FTS_TABLE}(rowid, search_document) "
+            "VALUES (new.id, new.search_document); END"
+        )
+        # A new table starts empty and triggers may have been missing:
+        # resync from the documents
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        connection._employee_fts = True
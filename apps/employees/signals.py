@@ -1,8 +1,14 @@
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import Employee
+from apps.core import images
+
+from . import groups, middleware, permissions, search
+from .hierarchy import detach
+from .models import Department, Employee
+
+images.track(Employee, "avatar")
 
 
 @receiver(post_save, sender=User)
@@ -18,7 +24,57 @@ def create_employee_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_employee_profile(sender, instance, **kwargs):
-    # Saves the Employee when the User is saved
+def save_employee_profile(sender, instance, update_fields=None, **kwargs):
+    # Saves the Employee when the User is saved, except for the last_login
+    # update done at every login
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
     if hasattr(instance, "employee"):
         instance.employee.save(update_fields=["updated_at"])
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_role_groups(sender, **kwargs):
+    # The cached role to group ids mapping may point to a changed group
+    groups.invalidate()
+
+
+@receiver(pre_delete, sender=Employee)
+def detach_from_hierarchy(sender, instance, **kwargs):
+    # Reports are set to no manager, so their subtrees become roots
+    detach(instance)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def invalidate_request_employee(sender, instance, **kwargs):
+    # Profile edits must reach the cached employee of the next requests
+    middleware.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Department)
+def invalidate_department_employees(sender, instance, **kwargs):
+    middleware.invalidate(
+        *Employee.objects.filter(department=instance).values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Department)
+def refresh_department_search(sender, instance, created, **kwargs):
+    # The department name and code are part of the employees' search document
+    if not created:
+        search.refresh_documents(Employee.objects.filter(department=instance))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions(sender, action, **kwargs):
+    # Memberships and grants changed (role changes sync the groups too)
+    if action in ("post_add", "post_remove", "post_clear"):
+        permissions.bump()
+
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_all_permissions(sender, **kwargs):
+    permissions.bump()
@@ -0,0 +1,119 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.core import images
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def photo(name="foto.jpg", size=(2000, 1500)):
+    output = BytesIO()
+    Image.new("RGB", size, "orange").save(output, "JPEG")
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class AvatarRenditionsTest(TestCase):
+    """Tests para las miniaturas generadas fuera de la petición"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="ana"),
+            department=Department.objects.create(name="Recepción", code="REC"),
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+
+    def test_generate_renditions(self):
+        """Cada tamaño se guarda junto al original en WebP y JPEG"""
+        name = default_storage.save("avatars/ana.jpg", photo())
+        written = images.generate_renditions(name, default_storage)
+
+        self.assertEqual(len(written), len(images.RENDITIONS) * len(images.FORMATS))
+        for size, side in images.RENDITIONS.items():
+            for fmt in images.FORMATS:
+                with default_storage.open(images.rendition_name(name, size, fmt)) as f:
+                    rendition = Image.open(f)
+                    self.assertEqual(rendition.format.lower(), fmt)
+                    self.assertEqual(max(rendition.size), side)
+
+    def test_upload_queues_renditions_after_commit(self):
+        """Subir un avatar no lo decodifica en la petición: se encola al confirmar"""
+        self.employee.avatar = photo()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.employee.save()
+        self.assertEqual(len(callbacks), 1)
+
+        # Mientras no existen, se sirve el original
+        template = Template('{% load core_images %}{{ avatar|rendition:"thumb" }}')
+        context = Context({"avatar": self.employee.avatar})
+        self.assertEqual(template.render(context), self.employee.avatar.url)
+
+        callbacks[0]()
+        images.wait(timeout=10)
+        self.assertEqual(
+            template.render(context),
+            default_storage.url(
+                images.rendition_name(self.employee.avatar.name, "thumb")
+            ),
+        )
+
+    def test_save_without_new_upload(self):
+        """Guardar sin subir un fichero nuevo no encola nada"""
+        self.employee.avatar = photo()
+        self.employee.save()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.employee.save()
+        self.assertEqual(callbacks, [])
+
+    def test_transparent_upload_on_white(self):
+        """Las zonas transparentes quedan en blanco, no en negro"""
+        output = BytesIO()
+        Image.new("RGBA", (200, 200), (255, 0, 0, 0)).save(output, "PNG")
+        name = default_storage.save("avatars/ana.png", ContentFile(output.getvalue()))
+
+        images.generate_renditions(name, default_storage)
+
+        for fmt in images.FORMATS:
+            with default_storage.open(images.rendition_name(name, "thumb", fmt)) as f:
+                pixel = Image.open(f).convert("RGB").getpixel((0, 0))
+                self.assertTrue(all(channel > 245 for channel in pixel), pixel)
+
+    def test_missing_renditions_checked_once(self):
+        """Mientras no existen, el almacenamiento no se consulta en cada render"""
+        self.employee.avatar = photo()
+        self.employee.save()
+        storage = self.employee.avatar.storage
+
+        with mock.patch.object(storage, "exists", wraps=storage.exists) as exists:
+            self.assertFalse(images.is_ready(self.employee.avatar))
+            self.assertFalse(images.is_ready(self.employee.avatar))
+        self.assertEqual(exists.call_count, 1)
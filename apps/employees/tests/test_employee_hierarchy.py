@@ -0,0 +1,134 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from apps.employees.models import Department, Employee, EmployeeHierarchy
+from apps.employees.signals import create_employee_profile
+
+
+class EmployeeHierarchyTest(TestCase):
+    """Tests para la jerarquía de responsables (tabla de cierre)"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        # director > jefe > encargado > recepcionista
+        self.director = self._employee("direccion", Employee.RoleChoices.DIRECTOR)
+        self.manager = self._employee(
+            "jefe", Employee.RoleChoices.RECEPTION_MANAGER, manager=self.director
+        )
+        self.lead = self._employee(
+            "encargado", Employee.RoleChoices.RECEPTIONIST, manager=self.manager
+        )
+        self.clerk = self._employee(
+            "recepcion", Employee.RoleChoices.RECEPTIONIST, manager=self.lead
+        )
+
+    def _employee(self, username, role, manager=None):
+        return Employee.objects.create(
+            user=User.objects.create_user(username=username),
+            department=self.department,
+            role=role,
+            manager=manager,
+        )
+
+    def test_paths_created_for_every_depth(self):
+        """Se guarda un camino por cada superior, a cualquier profundidad"""
+        depths = dict(
+            EmployeeHierarchy.objects.filter(descendant=self.clerk).values_list(
+                "ancestor_id", "depth"
+            )
+        )
+        self.assertEqual(
+            depths,
+            {
+                self.clerk.pk: 0,
+                self.lead.pk: 1,
+                self.manager.pk: 2,
+                self.director.pk: 3,
+            },
+        )
+
+    def test_under_and_chain_of_command(self):
+        """Equipo completo y cadena de mando en una consulta cada uno"""
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                set(Employee.objects.under(self.manager)), {self.lead, self.clerk}
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(Employee.objects.chain_of_command(self.clerk)),
+                [self.lead, self.manager, self.director],
+            )
+
+    def test_team_size(self):
+        """El tamaño del equipo se calcula con una agregación"""
+        sizes = dict(Employee.objects.with_team_size().values_list("pk", "team_size"))
+        self.assertEqual(sizes[self.director.pk], 3)
+        self.assertEqual(sizes[self.lead.pk], 1)
+        self.assertEqual(sizes[self.clerk.pk], 0)
+
+    def test_moving_a_subtree(self):
+        """Cambiar de responsable mueve a todo su equipo"""
+        other = self._employee("otro_jefe", Employee.RoleChoices.RECEPTION_MANAGER)
+
+        self.lead.manager = other
+        self.lead.save()
+
+        self.assertEqual(set(Employee.objects.under(self.manager)), set())
+        self.assertEqual(set(Employee.objects.under(other)), {self.lead, self.clerk})
+        self.assertEqual(
+            list(Employee.objects.chain_of_command(self.clerk)), [self.lead, other]
+        )
+
+    def test_cycle_rejected(self):
+        """Nadie puede depender de alguien de su propio equipo"""
+        self.manager.manager = self.clerk
+        with self.assertRaises(ValidationError):
+            self.manager.full_clean()
+
+    def test_cycle_not_saved(self):
+        """Guardar un ciclo falla sin cambiar el responsable"""
+        self.manager.manager = self.clerk
+        with self.assertRaises(ValidationError):
+            self.manager.save()
+
+        self.manager.refresh_from_db()
+        self.assertEqual(self.manager.manager, self.director)
+        self.assertEqual(
+            list(Employee.objects.chain_of_command(self.manager)), [self.director]
+        )
+
+    def test_deleting_a_manager_detaches_reports(self):
+        """Al borrar un responsable su equipo queda sin superiores"""
+        self.lead.user.delete()
+
+        self.clerk.refresh_from_db()
+        self.assertIsNone(self.clerk.manager)
+        self.assertEqual(list(Employee.objects.chain_of_command(self.clerk)), [])
+        self.assertEqual(set(Employee.objects.under(self.director)), {self.manager})
+
+    def test_supervised_by_includes_reporting_line(self):
+        """El equipo de un jefe incluye a quien depende de él"""
+        other = self._employee(
+            "mantenimiento",
+            Employee.RoleChoices.MAINTENANCE,
+            manager=self.manager,
+        )
+
+        team = set(Employee.objects.supervised_by(self.manager))
+
+        self.assertIn(other, team)
+        self.assertIn(self.clerk, team)
@@ -0,0 +1,123 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.imports import import_employees, read_rows, validate
+from apps.employees.models import Department, Employee
+from apps.employees.search import search
+from apps.employees.signals import create_employee_profile
+
+HEADER = "username,email,first_name,last_name,department,role,employee_number,manager,password\n"
+
+
+class EmployeeImportTest(TestCase):
+    """Tests para el alta masiva de empleados desde CSV"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.director = Employee.objects.create(
+            user=User.objects.create_user(username="directora"),
+            department=self.department,
+            role=Employee.RoleChoices.DIRECTOR,
+            employee_number="E-001",
+        )
+
+    def _rows(self, *lines):
+        return read_rows((HEADER + "".join(lines)).splitlines(keepends=True))
+
+    def test_import_creates_everything(self):
+        """Usuarios, empleados, jerarquía, grupos e índice de búsqueda"""
+        rows = self._rows(
+            "ana,ana@hotel.com,Ana,Núñez,rec,reception_manager,E-010,E-001,secreto123\n",
+            "luis,luis@hotel.com,Luis,Pardo,REC,receptionist,E-011,E-010,secreto123\n",
+        )
+        self.assertEqual(validate(rows), [])
+        import_employees(rows)
+
+        ana = Employee.objects.get(user__username="ana")
+        luis = Employee.objects.get(user__username="luis")
+        self.assertTrue(luis.user.check_password("secreto123"))
+        self.assertEqual(luis.manager, ana)
+        self.assertEqual(
+            list(Employee.objects.chain_of_command(luis)), [ana, self.director]
+        )
+        self.assertEqual(list(Employee.objects.under(self.director)), [ana, luis])
+        self.assertEqual(
+            set(ana.user.groups.values_list("name", flat=True)),
+            {"Reception", "Supervisors"},
+        )
+        self.assertEqual(list(search(Employee.objects.all(), "nunez")), [ana])
+
+    def test_invalid_file_creates_nothing(self):
+        """Un solo error impide crear cualquier empleado"""
+        rows = self._rows(
+            "ana,ana@hotel.com,Ana,Núñez,REC,receptionist,E-010,,secreto123\n",
+            "directora,no-es-email,Eva,Gil,XXX,chef,E-001,E-999,corta\n",
+            "bea,ANA@hotel.com,Bea,Ruiz,REC,receptionist,E-010,,secreto123\n",
+        )
+        errors = validate(rows)
+
+        self.assertEqual({line for line, _ in errors}, {3, 4})
+        self.assertEqual(len(rows[1].errors), 7)
+        self.assertEqual(len(rows[2].errors), 2)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_manager_cycle(self):
+        """Los responsables del fichero no pueden formar un ciclo"""
+        rows = self._rows(
+            "ana,ana@hotel.com,Ana,Núñez,REC,receptionist,E-010,E-011,secreto123\n",
+            "luis,luis@hotel.com,Luis,Pardo,REC,receptionist,E-011,E-010,secreto123\n",
+        )
+        self.assertEqual(len(validate(rows)), 2)
+
+    def test_unusable_passwords_with_reset_tokens(self):
+        """Sin contraseña no se calcula ningún hash y se devuelven tokens válidos"""
+        rows = self._rows(
+            "ana,ana@hotel.com,Ana,Núñez,REC,receptionist,,,\n",
+        )
+        self.assertEqual(validate(rows, unusable_passwords=True), [])
+        tokens = import_employees(rows, unusable_passwords=True)
+
+        user = User.objects.get(username="ana")
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(tokens[0].user, user)
+        self.assertTrue(default_token_generator.check_token(user, tokens[0].token))
+
+    def test_import_view(self):
+        """Solo RRHH y dirección pueden importar desde la vista"""
+        url = reverse("employees:import")
+        upload = SimpleUploadedFile(
+            "plantilla.csv",
+            ("﻿" + HEADER + "ana,ana@hotel.com,Ana,Núñez,REC,receptionist,,,\n").encode(
+                "utf-8"
+            ),
+        )
+
+        self.client.force_login(self.director.user)
+        response = self.client.post(url, {"file": upload, "unusable_passwords": "on"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["tokens"]), 1)
+        self.assertTrue(Employee.objects.filter(user__username="ana").exists())
+
+        self.client.force_login(User.objects.get(username="ana"))
+        self.assertRedirects(
+            self.client.get(url),
+            reverse("employees:list"),
+            fetch_redirect_response=False,
+        )
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from apps.employees.middleware import EmployeeMiddleware
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+
+class EmployeeMiddlewareTest(TestCase):
+    """Tests para el empleado cacheado por petición"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.user = User.objects.create_user(username="recepcion")
+        self.employee = Employee.objects.create(
+            user=self.user,
+            department=self.department,
+            role=Employee.RoleChoices.RECEPTIONIST,
+        )
+        self.middleware = EmployeeMiddleware(lambda request: HttpResponse())
+
+    def _request(self, user=None):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=(user or self.user).pk)
+        self.middleware(request)
+        return request
+
+    def test_employee_loaded_once(self):
+        """El empleado y su departamento se cargan con una consulta y se cachean"""
+        # Primera petición: usuario y empleado con su departamento
+        with self.assertNumQueries(2):
+            self._request()
+        # Siguientes peticiones: solo la consulta del usuario
+        with self.assertNumQueries(1):
+            request = self._request()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(request.employee, self.employee)
+            self.assertEqual(request.user.employee.department.code, "REC")
+            self.assertIs(request.employee.user, request.user)
+
+    def test_profile_edit_invalidates(self):
+        """Editar el perfil o el departamento invalida la caché"""
+        self._request()
+
+        self.employee.phone = "+34 600 000 000"
+        self.employee.save()
+        self.assertEqual(self._request().employee.phone, "+34 600 000 000")
+
+        self.department.name = "Front Office"
+        self.department.save()
+        self.assertEqual(self._request().employee.department.name, "Front Office")
+
+    def test_user_without_employee(self):
+        """Un usuario sin perfil no consulta la base de datos en cada acceso"""
+        admin = User.objects.create_superuser(username="admin")
+        request = self._request(admin)
+
+        self.assertIsNone(request.employee)
+        with self.assertNumQueries(0):
+            self.assertFalse(hasattr(request.user, "employee"))
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.search import (
+    ensure_fts_table,
+    has_fts_table,
+    normalize,
+    search,
+)
+from apps.employees.signals import create_employee_profile
+
+
+class EmployeeSearchTest(TestCase):
+    """Tests para el índice de búsqueda del directorio"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.reception = Department.objects.create(name="Recepción", code="REC")
+        self.housekeeping = Department.objects.create(name="Pisos", code="PIS")
+        self.ines = self._employee(
+            "inesm", "Inés", "Muñoz Peña", self.reception, "E-100", "receptionist"
+        )
+        self.jose = self._employee(
+            "jgarcia", "José", "García", self.housekeeping, "E-200", "housekeeper"
+        )
+
+    def _employee(self, username, first, last, department, number, role):
+        user = User.objects.create_user(
+            username=username, first_name=first, last_name=last, password="x"
+        )
+        return Employee.objects.create(
+            user=user, department=department, employee_number=number, role=role
+        )
+
+    def test_normalize(self):
+        """Minúsculas, sin tildes y con los espacios compactados"""
+        self.assertEqual(normalize("  Inés   MUÑOZ "), "ines munoz")
+
+    def test_accent_insensitive_search(self):
+        """Se encuentra con o sin tildes, por nombre, número o departamento"""
+        employees = Employee.objects.all()
+        self.assertEqual(list(search(employees, "munoz")), [self.ines])
+        self.assertEqual(list(search(employees, "JOSÉ garc")), [self.jose])
+        self.assertEqual(list(search(employees, "e-200")), [self.jose])
+        self.assertEqual(list(search(employees, "recepcion")), [self.ines])
+        self.assertEqual(list(search(employees, "ines pisos")), [])
+
+    def test_fts_table_in_sync(self):
+        """En SQLite el espejo FTS5 sigue los cambios de la tabla"""
+        if connection.vendor != "sqlite" or not has_fts_table(connection):
+            self.skipTest("Sin FTS5")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM employees_employee_fts "
+                "WHERE employees_employee_fts MATCH %s",
+                ['"garcia"'],
+            )
+            self.assertEqual(cursor.fetchall(), [(self.jose.pk,)])
+
+        self.jose.user.delete()
+        self.assertFalse(search(Employee.objects.all(), "garcia").exists())
+
+    def test_fts_table_created_over_existing_rows(self):
+        """Al crear el espejo FTS5 se indexan los empleados que ya existen"""
+        if connection.vendor != "sqlite" or not has_fts_table(connection):
+            self.skipTest("Sin FTS5")
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE employees_employee_fts")
+
+        ensure_fts_table(connection)
+
+        self.assertEqual(list(search(Employee.objects.all(), "garcia")), [self.jose])
+
+    def test_document_follows_user_and_department(self):
+        """Cambiar el nombre del usuario o del departamento actualiza el índice"""
+        self.ines.user.last_name = "Ortega"
+        self.ines.user.save()
+        self.assertEqual(list(search(Employee.objects.all(), "ortega")), [self.ines])
+        self.assertFalse(search(Employee.objects.all(), "munoz").exists())
+
+        self.housekeeping.name = "Limpieza"
+        self.housekeeping.save()
+        self.assertEqual(list(search(Employee.objects.all(), "limpieza")), [self.jose])
+
+    def test_autocomplete(self):
+        """El autocompletado devuelve JSON con pocos campos"""
+        self.client.force_login(self.jose.user)
+        url = reverse("employees:autocomplete")
+
+        response = self.client.get(url, {"q": "ines"})
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {
+                        "id": self.ines.pk,
+                        "name": "Inés Muñoz Peña",
+                        "employee_number": "E-100",
+                        "department": "Recepción",
+                    }
+                ]
+            },
+        )
+        # Términos demasiado cortos no consultan nada
+        self.assertEqual(self.client.get(url, {"q": "i"}).json(), {"results": []})
@@ -1,4 +1,5 @@
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
 from django.db.models.signals import post_save
 from django.test import TestCase
 from django.utils import timezone
@@ -26,6 +27,7 @@ class EmployeeModelTest(TestCase):
     def setUp(self):
         """Configuración inicial para cada test"""
 
+        cache.clear()
         self.department = Department.objects.create(name="Recepción", code="REC")
         self.user = User.objects.create_user(
             username="jperez",
@@ -95,3 +97,88 @@ class EmployeeModelTest(TestCase):
         )
 
         self.assertTrue(self.employee.is_checked_in())
+
+    def test_supervised_by_team(self):
+        """Cada jefe ve a su equipo y dirección a toda la plantilla"""
+        manager = Employee.objects.create(
+            user=User.objects.create_user(username="jefe_recepcion"),
+            role=Employee.RoleChoices.RECEPTION_MANAGER,
+            department=self.department,
+        )
+        director = Employee.objects.create(
+            user=User.objects.create_user(username="direccion"),
+            role=Employee.RoleChoices.DIRECTOR,
+            department=self.department,
+        )
+
+        self.assertEqual(list(Employee.objects.supervised_by(manager)), [self.employee])
+        self.assertEqual(Employee.objects.supervised_by(director).count(), 3)
+        self.assertFalse(Employee.objects.supervised_by(self.employee).exists())
+
+    def test_supervised_by_every_manager_role(self):
+        """Cada jefe de área ve a los empleados de su rol"""
+        for manager_role, (role,) in Employee.SUPERVISED_ROLES.items():
+            with self.subTest(manager_role=manager_role):
+                staff = Employee.objects.create(
+                    user=User.objects.create_user(username=f"equipo_{role}"),
+                    role=role,
+                    department=self.department,
+                )
+                manager = Employee.objects.create(
+                    user=User.objects.create_user(username=f"jefe_{manager_role}"),
+                    role=manager_role,
+                    department=self.department,
+                )
+
+                self.assertIn(manager_role, Employee.RoleChoices.values)
+                self.assertIn(staff, Employee.objects.supervised_by(manager))
+
+    def test_team_ids_loaded_once(self):
+        """Los ids del equipo se consultan una sola vez por instancia"""
+        manager = Employee.objects.create(
+            user=User.objects.create_user(username="jefe_recepcion"),
+            role=Employee.RoleChoices.RECEPTION_MANAGER,
+            department=self.department,
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(manager.team_ids, {self.employee.pk})
+            self.assertIn(self.employee.pk, manager.team_ids)
+
+    def test_groups_synced_only_on_role_change(self):
+        """Los grupos solo se recalculan cuando cambia el puesto"""
+        employee = Employee.objects.get(pk=self.employee.pk)
+
+        # Sin cambio de puesto: solo el UPDATE del empleado
+        with self.assertNumQueries(1):
+            employee.save()
+
+        employee.role = Employee.RoleChoices.RECEPTION_MANAGER
+        employee.save()
+
+        self.assertEqual(
+            set(self.user.groups.values_list("name", flat=True)),
+            {"Reception", "Supervisors"},
+        )
+
+    def test_maintenance_roles_get_groups(self):
+        """El personal y el jefe de mantenimiento reciben sus grupos"""
+        employee = Employee.objects.get(pk=self.employee.pk)
+
+        employee.role = Employee.RoleChoices.MAINTENANCE
+        employee.save()
+        self.assertEqual(
+            set(self.user.groups.values_list("name", flat=True)), {"Maitenance"}
+        )
+
+        employee.role = Employee.RoleChoices.MAINTENANCE_MANAGER
+        employee.save()
+        self.assertEqual(
+            set(self.user.groups.values_list("name", flat=True)),
+            {"Maitenance", "Supervisors"},
+        )
+
+    def test_login_does_not_save_profile(self):
+        """Actualizar last_login al entrar no guarda el perfil"""
+        with self.assertNumQueries(1):
+            update_last_login(None, self.user)
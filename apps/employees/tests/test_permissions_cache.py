@@ -0,0 +1,66 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+
+
+class PermissionCacheTest(TestCase):
+    """Tests para la caché de permisos por grupo y usuario"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="jefe_recepcion"),
+            department=self.department,
+            role=Employee.RoleChoices.RECEPTION_MANAGER,
+        )
+        self.change_leave = Permission.objects.get(codename="change_leave")
+        Group.objects.get(name="Supervisors").permissions.add(self.change_leave)
+
+    def _user(self):
+        # A fresh user object, as loaded by every request
+        return User.objects.get(pk=self.employee.user_id)
+
+    def test_permissions_cached_across_requests(self):
+        """Tras la primera resolución los permisos no consultan la base de datos"""
+        self.assertTrue(self._user().has_perm("leave.change_leave"))
+
+        user = self._user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("leave.change_leave"))
+            self.assertFalse(user.has_perm("leave.delete_leave"))
+
+    def test_group_change_invalidates(self):
+        """Cambiar los permisos de un grupo invalida la caché"""
+        self.assertFalse(self._user().has_perm("leave.delete_leave"))
+
+        Group.objects.get(name="Reception").permissions.add(
+            Permission.objects.get(codename="delete_leave")
+        )
+
+        self.assertTrue(self._user().has_perm("leave.delete_leave"))
+
+    def test_role_change_invalidates(self):
+        """Cambiar de puesto cambia los permisos efectivos"""
+        self.assertTrue(self._user().has_perm("leave.change_leave"))
+
+        self.employee.role = Employee.RoleChoices.RECEPTIONIST
+        self.employee.save()
+
+        self.assertFalse(self._user().has_perm("leave.change_leave"))
@@ -6,6 +6,8 @@ from apps.employees.views.employees_views import (
     EmployeeUpdateView,
     EmployeeDeleteView,
     MyTeamView,
+    EmployeeAutocompleteView,
+    EmployeeImportView,
  
 )
 
@@ -14,6 +16,8 @@ app_name = 'employees'
 urlpatterns = [
     path('', EmployeeListView.as_view(), name='list'),
     path('crear/', EmployeeCreateView.as_view(), name='create'),
+    path('importar/', EmployeeImportView.as_view(), name='import'),
+    path('autocompletar/', EmployeeAutocompleteView.as_view(), name='autocomplete'),
     path('<int:pk>/', EmployeeDetailView.as_view(), name='detail'),
     path('<int:pk>/editar/', EmployeeUpdateView.as_view(), name='update'),
     path('<int:pk>/eliminar/', EmployeeDeleteView.as_view(), name='delete'),
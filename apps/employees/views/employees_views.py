@@ -1,9 +1,12 @@
+import csv
+import io
 from datetime import datetime, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db.models import Count
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
@@ -13,13 +16,25 @@ from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    FormView,
     ListView,
     UpdateView,
 )
 
+from apps.attendance import presence
+from apps.attendance.analytics import attendance_totals
 from apps.attendance.models import Attendance
-from apps.employees.forms import EmployeeForm
+from apps.employees.forms import EmployeeForm, EmployeeImportForm
+from apps.employees.imports import (
+    COLUMNS,
+    ImportFileError,
+    import_employees,
+    read_rows,
+    validate,
+)
 from apps.employees.models import Department, Employee
+from apps.employees.search import autocomplete
+from apps.employees.search import search as search_employees
 from apps.leave.models import Leave
 
 # ==================== EMPLOYEE VIEWS ====================
@@ -42,12 +57,7 @@ class EmployeeListView(LoginRequiredMixin, ListView):
         if department:
             queryset = queryset.filter(department_id=department)
         if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(employee_number__icontains=search)
-                | Q(position__icontains=search)
-            )
+            queryset = search_employees(queryset, search)
         if available:
             queryset = queryset.filter(is_available=True)
 
@@ -62,9 +72,7 @@ class EmployeeListView(LoginRequiredMixin, ListView):
         ).count()
 
         # Empleados fichados actualmente
-        context["checked_in_count"] = Attendance.objects.filter(
-            check_out__isnull=True
-        ).count()
+        context["checked_in_count"] = presence.count_present()
 
         return context
 
@@ -89,20 +97,14 @@ class EmployeeDetailView(LoginRequiredMixin, DetailView):
             status="approved"
         ).order_by("-start_date")[:5]
 
-        # Estadísticas del mes actual
-        today = timezone.now()
+        # Estadísticas del mes actual (agregadas en la base de datos)
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
+        month = attendance_totals(first_day_month, today, employees=self.object)
 
-        monthly_attendances = self.object.attendances.filter(
-            check_in__gte=first_day_month, check_out__isnull=False
-        )
-
-        total_hours = timedelta()
-        for attendance in monthly_attendances:
-            total_hours += attendance.duration
-
-        count_days = monthly_attendances.count()
-        average_hours = total_hours / count_days if count_days > 0 else timedelta()
+        count_days = month["closed"]
+        total_hours = month["hours"]
+        average_hours = month["average"]
 
         # Convertir a horas y minutos
         total_seconds = int(total_hours.total_seconds())
@@ -160,6 +162,53 @@ class EmployeeCreateView(LoginRequiredMixin, CreateView):
         return context
 
 
+class EmployeeImportView(LoginRequiredMixin, FormView):
+    """Alta masiva de empleados desde un CSV, validado entero antes de crear nada"""
+
+    form_class = EmployeeImportForm
+    template_name = "employees/EmployeeImport.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        # Solo RRHH y dirección pueden dar de alta plantilla
+        employee = getattr(request, "employee", None)
+        if request.user.is_authenticated and (
+            employee is None or not employee.can_see_all()
+        ):
+            messages.error(request, "No tienes permiso para importar empleados.")
+            return redirect("employees:list")
+        return super().dispatch(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        unusable = form.cleaned_data["unusable_passwords"]
+        # Se lee línea a línea, sin cargar el fichero entero en memoria
+        lines = io.TextIOWrapper(form.cleaned_data["file"], encoding="utf-8-sig")
+        try:
+            rows = read_rows(lines)
+        except (ImportFileError, UnicodeDecodeError, csv.Error) as e:
+            form.add_error("file", str(e))
+            return self.form_invalid(form)
+
+        errors = validate(rows, unusable_passwords=unusable)
+        if errors:
+            return self.render_to_response(
+                self.get_context_data(form=form, errors=errors)
+            )
+
+        tokens = import_employees(rows, unusable_passwords=unusable)
+        messages.success(self.request, f"{len(rows)} empleados creados.")
+        if not tokens:
+            return redirect("employees:list")
+        # Los enlaces solo se muestran una vez, no se guardan
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), tokens=tokens)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["columns"] = COLUMNS
+        return context
+
+
 class EmployeeUpdateView(LoginRequiredMixin, UpdateView):
     model = Employee
     form_class = EmployeeForm
@@ -201,6 +250,18 @@ class EmployeeDeleteView(LoginRequiredMixin, DeleteView):
         return result
 
 
+class EmployeeAutocompleteView(LoginRequiredMixin, View):
+    """Empleados que coinciden con ?q=, en JSON para los selectores"""
+
+    MIN_LENGTH = 2
+
+    def get(self, request):
+        term = request.GET.get("q", "").strip()
+        if len(term) < self.MIN_LENGTH:
+            return JsonResponse({"results": []})
+        return JsonResponse({"results": autocomplete(Employee.objects.all(), term)})
+
+
 class MyTeamView(LoginRequiredMixin, ListView):
     """Vista para que jefes vean solo su equipo"""
 
@@ -221,19 +282,14 @@ class MyTeamView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         """Obtiene solo los empleados supervisados"""
-        employee = self.request.user.employee
-        team = employee.get_supervised_employees()
+        team = Employee.objects.supervised_by(self.request.user.employee)
 
         # Aplicar filtros opcionales
         search = self.request.GET.get("search")
         available = self.request.GET.get("available")
 
         if search:
-            team = team.filter(
-                Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(employee_number__icontains=search)
-            )
+            team = search_employees(team, search)
 
         if available:
             team = team.filter(is_available=True)
@@ -243,13 +299,11 @@ class MyTeamView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        today = timezone.now().date()
+        today = timezone.localdate()
         team = self.get_queryset()
 
         context["team_total"] = team.count()
-        context["team_present"] = Attendance.objects.filter(
-            employee__in=team, check_in__date=today, check_out__isnull=True
-        ).count()
+        context["team_present"] = presence.count_present(team)
         context["team_available"] = team.filter(is_available=True).count()
 
         return context
@@ -11,11 +11,14 @@ from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import DetailView, TemplateView, UpdateView
 
+from apps.attendance import presence
+from apps.attendance.analytics import attendance_buckets, attendance_totals
 from apps.attendance.models import Attendance
 from apps.employees.forms import EmployeeForm
 from apps.employees.models import Employee
 from apps.leave.models import Leave
 from apps.rooms.models import CleaningTask, MaintenanceTask
+from apps.rooms.productivity import completed_between
 
 
 class MyProfileView(LoginRequiredMixin, DetailView):
@@ -32,7 +35,7 @@ class MyProfileView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         employee = self.object
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Información básica
         context["today"] = today
@@ -41,25 +44,15 @@ class MyProfileView(LoginRequiredMixin, DetailView):
         context["current_attendance"] = employee.get_current_attendance()
         context["is_checked_in"] = employee.is_checked_in()
 
-        # Estadísticas del mes actual
+        # Estadísticas del mes actual (agregadas en la base de datos)
         first_day_month = today.replace(day=1)
-        monthly_attendances = employee.attendances.filter(
-            check_in__gte=first_day_month, check_out__isnull=False
-        )
-
-        # Calcular horas trabajadas
-        total_hours = timedelta()
-        for attendance in monthly_attendances:
-            total_hours += attendance.duration
-
-        days_worked = monthly_attendances.count()
-        avg_hours = total_hours / days_worked if days_worked > 0 else timedelta()
+        month = attendance_totals(first_day_month, today, employees=employee)
 
         context["monthly_stats"] = {
-            "days_worked": days_worked,
-            "total_hours": self._format_timedelta(total_hours),
-            "average_hours": self._format_timedelta(avg_hours),
-            "late_arrivals": monthly_attendances.filter(status="late").count(),
+            "days_worked": month["closed"],
+            "total_hours": self._format_timedelta(month["hours"]),
+            "average_hours": self._format_timedelta(month["average"]),
+            "late_arrivals": month["late"],
         }
 
         # Permisos
@@ -85,7 +78,7 @@ class MyProfileView(LoginRequiredMixin, DetailView):
 
     def _get_role_specific_stats(self, employee):
         """Obtiene estadísticas específicas según el rol"""
-        today = timezone.now().date()
+        today = timezone.localdate()
         first_day_month = today.replace(day=1)
 
         stats = {}
@@ -95,8 +88,8 @@ class MyProfileView(LoginRequiredMixin, DetailView):
             tasks = CleaningTask.objects.filter(assigned_to=employee)
             stats["cleaning"] = {
                 "total_month": tasks.filter(created_at__gte=first_day_month).count(),
-                "completed_month": tasks.filter(
-                    status="completed", completed_at__gte=first_day_month
+                "completed_month": completed_between(
+                    first_day_month, today, tasks
                 ).count(),
                 "pending": tasks.filter(status="pending").count(),
                 "in_progress": tasks.filter(status="in_progress").count(),
@@ -118,15 +111,12 @@ class MyProfileView(LoginRequiredMixin, DetailView):
 
         # Estadísticas para supervisores
         if employee.is_supervisor():
-            team = employee.get_supervised_employees()
             stats["team"] = {
-                "size": team.count(),
-                "present_today": Attendance.objects.filter(
-                    employee__in=team, check_in__date=today, check_out__isnull=True
-                ).count(),
-                "pending_leaves": Leave.objects.filter(
-                    employee__in=team, status="pending"
-                ).count(),
+                "size": len(employee.team_ids),
+                "present_today": presence.count_present(employee.team_ids),
+                "pending_leaves": Leave.objects.managed_by(employee)
+                .filter(status="pending")
+                .count(),
             }
 
         return stats
@@ -163,7 +153,7 @@ class ProfileStatsView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         employee = self.request.user.employee
-        today = timezone.now().date()
+        today = timezone.localdate()
 
         # Período seleccionado (por defecto mes actual)
         period = self.request.GET.get("period", "month")
@@ -182,25 +172,14 @@ class ProfileStatsView(LoginRequiredMixin, TemplateView):
         context["period_name"] = period_name
         context["start_date"] = start_date
 
-        # Asistencias del período
-        attendances = employee.attendances.filter(
-            check_in__date__gte=start_date, check_in__date__lte=today
-        )
+        # Asistencias del período, agrupadas por día en una sola consulta
+        days = attendance_buckets(start_date, today, employees=employee)
 
         # Estadísticas de asistencia
-        total_hours = timedelta()
-        on_time = 0
-        late = 0
-
-        for attendance in attendances:
-            if attendance.check_out:
-                total_hours += attendance.duration
-            if attendance.status == "present":
-                on_time += 1
-            elif attendance.status == "late":
-                late += 1
-
-        total_days = attendances.count()
+        total_hours = sum((day["hours"] for day in days), timedelta())
+        late = sum(day["late"] for day in days)
+        total_days = sum(day["present"] for day in days)
+        on_time = total_days - late
         avg_hours = total_hours / total_days if total_days > 0 else timedelta()
 
         context["attendance_stats"] = {
@@ -209,20 +188,19 @@ class ProfileStatsView(LoginRequiredMixin, TemplateView):
             "late": late,
             "total_hours": self._format_timedelta(total_hours),
             "average_hours": self._format_timedelta(avg_hours),
-            "punctuality_rate": round((on_time / total_days * 100), 1)
-            if total_days > 0
-            else 0,
+            "punctuality_rate": (
+                round((on_time / total_days * 100), 1) if total_days > 0 else 0
+            ),
         }
 
         # Datos para gráficos
-        daily_hours_data = self._get_daily_hours_data(attendances, start_date, today)
+        daily_hours_data = self._get_daily_hours_data(days)
 
         context["daily_hours_labels"] = json.dumps(list(daily_hours_data.keys()))
         context["daily_hours_values"] = json.dumps(list(daily_hours_data.values()))
 
-        attendance_by_status = self._get_attendance_by_status(attendances)
-        context["attendance_present"] = attendance_by_status["present"]
-        context["attendance_late"] = attendance_by_status["late"]
+        context["attendance_present"] = on_time
+        context["attendance_late"] = late
 
         # Permisos del período
         leaves = employee.leaves.filter(
@@ -255,28 +233,13 @@ class ProfileStatsView(LoginRequiredMixin, TemplateView):
         minutes = (total_seconds % 3600) // 60
         return {"hours": hours, "minutes": minutes}
 
-    def _get_daily_hours_data(self, attendances, start_date, end_date):
+    def _get_daily_hours_data(self, days):
         """Obtiene datos de horas trabajadas por día"""
-        daily_data = {}
-        current_date = start_date
-
-        while current_date <= end_date:
-            day_attendances = attendances.filter(check_in__date=current_date)
-            total_hours = sum(
-                (att.duration.total_seconds() / 3600)
-                for att in day_attendances
-                if att.check_out
-            )
-            daily_data[current_date.strftime("%d/%m")] = round(total_hours, 2)
-            current_date += timedelta(days=1)
-
-        return daily_data
-
-    def _get_attendance_by_status(self, attendances):
-        """Obtiene distribución de asistencias por estado"""
         return {
-            "present": attendances.filter(status="present").count(),
-            "late": attendances.filter(status="late").count(),
+            day["start"].strftime("%d/%m"): round(
+                day["hours"].total_seconds() / 3600, 2
+            )
+            for day in days
         }
 
     def _get_cleaning_task_stats(self, employee, start_date, end_date):
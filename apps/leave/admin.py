@@ -1,8 +1,34 @@
+from copy import copy
+
+from django import forms
 from django.contrib import admin
-from .models import Leave
+from django.db import transaction
+from django.forms.models import construct_instance
+
+from .balances import apply_decision, check_decision
+from .models import Leave, LeaveBalance, LeaveLedgerEntry
+
+
+class LeaveAdminForm(forms.ModelForm):
+    class Meta:
+        model = Leave
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors:
+            # Status changes made here also move the leave balance: one that
+            # does not fit rejects the form. The balances are opened now,
+            # before the leave is saved with its new status
+            leave = construct_instance(self, copy(self.instance))
+            previous_status = self.initial.get('status') if self.instance.pk else None
+            check_decision(leave, previous_status)
+        return cleaned_data
+
 
 @admin.register(Leave)
 class LeaveAdmin(admin.ModelAdmin):
+    form = LeaveAdminForm
     list_display = ['employee', 'leave_type', 'start_date', 'end_date', 'status', 'created_at']
     list_filter = ['status', 'leave_type', 'start_date']
     search_fields = ['employee__user__first_name', 'employee__user__last_name', 'reason']
@@ -28,4 +54,31 @@ class LeaveAdmin(admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         if obj and obj.status != 'pending':
             return self.readonly_fields + ('employee', 'leave_type', 'start_date', 'end_date')
-        return self.readonly_fields
\ No newline at end of file
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        previous_status = form.initial.get('status') if change else None
+        with transaction.atomic():
+            # Saved first: the ledger entries point at the leave
+            super().save_model(request, obj, form, change)
+            apply_decision(obj, previous_status, user=request.user)
+
+
+class LeaveLedgerEntryInline(admin.TabularInline):
+    model = LeaveLedgerEntry
+    fields = ['kind', 'days', 'leave', 'note', 'created_by', 'created_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LeaveBalance)
+class LeaveBalanceAdmin(admin.ModelAdmin):
+    list_display = ['employee', 'year', 'accrued', 'consumed', 'adjusted', 'available']
+    list_filter = ['year']
+    search_fields = ['employee__user__first_name', 'employee__user__last_name']
+    readonly_fields = ['employee', 'year', 'accrued', 'consumed', 'adjusted', 'available', 'updated_at']
+    inlines = [LeaveLedgerEntryInline]
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LeaveConfig(AppConfig):
     name = 'apps.leave'
+
+    def ready(self):
+        # Import signals when Django starts
+        import apps.leave.signals
@@ -0,0 +1,303 @@
+# apps/leave/balances.py
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Exists, F, OuterRef, Subquery, When
+
+from .models import Leave, LeaveBalance, LeaveLedgerEntry
+
+# Yearly leave entitlement in days
+ANNUAL_DAYS = 22
+
+# Unused days that can be carried over into the next year
+MAX_CARRY_OVER = 5
+
+Kind = LeaveLedgerEntry.KindChoices
+
+# Denormalised column that each kind of entry moves (besides `available`)
+KIND_COLUMNS = {
+    Kind.ACCRUAL: "accrued",
+    Kind.CARRY_OVER: "accrued",
+    Kind.ADJUSTMENT: "adjusted",
+}
+
+
+def get_balance(employee, year, for_update=False):
+    """
+    Balance of an employee for a year, created on first use with the yearly
+    accrual and the leaves already approved before the ledger existed
+    """
+    balances = LeaveBalance.objects.all()
+    if for_update:
+        balances = balances.select_for_update()
+    balance = balances.filter(employee=employee, year=year).first()
+    if balance is not None:
+        return balance
+
+    try:
+        with transaction.atomic():
+            balance = LeaveBalance.objects.create(employee=employee, year=year)
+            post_entry(balance, Kind.ACCRUAL, ANNUAL_DAYS, note="Asignación anual")
+            consumed = sum(
+                leave.days_by_year().get(year, 0)
+                for leave in Leave.objects.filter(
+                    employee=employee,
+                    status=Leave.StatusChoices.APPROVED,
+                    leave_type__in=Leave.BALANCE_TYPES,
+                    start_date__year__lte=year,
+                    end_date__year__gte=year,
+                )
+            )
+            if consumed:
+                post_entry(balance, Kind.CONSUMPTION, -consumed, note="Saldo inicial")
+    except IntegrityError:
+        # Created concurrently by another request
+        pass
+    return balances.get(employee=employee, year=year)
+
+
+def post_entry(balance, kind, days, leave=None, note="", user=None):
+    """Adds a ledger entry and moves the denormalised totals with one UPDATE"""
+    entry = LeaveLedgerEntry.objects.create(
+        balance=balance, kind=kind, days=days, leave=leave, note=note, created_by=user
+    )
+    if kind == Kind.CONSUMPTION:
+        # Consumptions are negative; `consumed` counts them as positive days
+        changes = {"consumed": F("consumed") - days}
+    else:
+        changes = {KIND_COLUMNS[kind]: F(KIND_COLUMNS[kind]) + days}
+    LeaveBalance.objects.filter(pk=balance.pk).update(
+        available=F("available") + days, **changes
+    )
+    balance.refresh_from_db(fields=["accrued", "consumed", "adjusted", "available"])
+    return entry
+
+
+@transaction.atomic
+def _decision(leave, previous_status):
+    """(sign, note) of the entries a status change posts, or None"""
+    if not leave.consumes_balance:
+        return None
+    approved = Leave.StatusChoices.APPROVED
+    if leave.status == approved and previous_status != approved:
+        return -1, "Permiso aprobado"
+    if previous_status == approved and leave.status != approved:
+        return 1, f"Permiso {leave.get_status_display().lower()}"
+    return None
+
+
+def check_decision(leave, previous_status, for_update=False):
+    """
+    Opens the balances a status change moves and raises ValidationError if
+    an approval would leave one below zero. Returns {year: balance}.
+
+    Run it before the leave is saved with its new status, so a balance
+    opened here still sees the previous status.
+    """
+    decision = _decision(leave, previous_status)
+    if decision is None:
+        return {}
+    balances = {}
+    for year, days in leave.days_by_year().items():
+        balance = get_balance(leave.employee, year, for_update=for_update)
+        if decision[0] < 0 and balance.available < days:
+            raise ValidationError(
+                f"Saldo insuficiente en {year}: quedan {balance.available} días "
+                f"y el permiso necesita {days}."
+            )
+        balances[year] = balance
+    return balances
+
+
+def apply_decision(leave, previous_status, user=None):
+    """
+    Posts the ledger entries of a status change: approving consumes the
+    leave days from the balance of each year they fall in, and undoing an
+    approval gives them back. Raises ValidationError if an approval would
+    leave a balance below zero.
+
+    Call it inside the same transaction as the save of the leave, either
+    before it or after check_decision() opened the balances.
+    """
+    decision = _decision(leave, previous_status)
+    if decision is None:
+        return
+    sign, note = decision
+    days_by_year = leave.days_by_year()
+    for year, balance in check_decision(
+        leave, previous_status, for_update=True
+    ).items():
+        post_entry(
+            balance,
+            Kind.CONSUMPTION,
+            sign * days_by_year[year],
+            leave=leave,
+            note=note,
+            user=user,
+        )
+
+
+@transaction.atomic
+def apply_approvals(leaves, user=None):
+    """
+    Bulk counterpart of apply_decision for pending leaves approved together:
+    the balances are locked with one query, the consumptions inserted with
+    one bulk INSERT and the totals moved with one UPDATE. Leaves are taken
+    in the given order and the ones that no longer fit in their balance are
+    left out. Returns {leave pk: reason} for those.
+    """
+    leaves = [leave for leave in leaves if leave.consumes_balance]
+    if not leaves:
+        return {}
+
+    needed = {
+        (leave.employee_id, year) for leave in leaves for year in leave.days_by_year()
+    }
+    balances = {
+        (balance.employee_id, balance.year): balance
+        for balance in LeaveBalance.objects.select_for_update().filter(
+            employee_id__in={employee_id for employee_id, _ in needed},
+            year__in={year for _, year in needed},
+        )
+    }
+    for leave in leaves:
+        for year in leave.days_by_year():
+            if (leave.employee_id, year) not in balances:
+                balances[leave.employee_id, year] = get_balance(
+                    leave.employee, year, for_update=True
+                )
+
+    available = {key: balance.available for key, balance in balances.items()}
+    consumed = defaultdict(int)
+    entries = []
+    refused = {}
+    for leave in leaves:
+        days_by_year = leave.days_by_year()
+        short = [
+            year
+            for year, days in days_by_year.items()
+            if available[leave.employee_id, year] < days
+        ]
+        if short:
+            year = short[0]
+            refused[leave.pk] = (
+                f"Saldo insuficiente en {year}: quedan "
+                f"{available[leave.employee_id, year]} días y el permiso "
+                f"necesita {days_by_year[year]}."
+            )
+            continue
+        for year, days in days_by_year.items():
+            balance = balances[leave.employee_id, year]
+            available[leave.employee_id, year] -= days
+            consumed[balance.pk] += days
+            entries.append(
+                LeaveLedgerEntry(
+                    balance=balance,
+                    kind=Kind.CONSUMPTION,
+                    days=-days,
+                    leave=leave,
+                    note="Permiso aprobado",
+                    created_by=user,
+                )
+            )
+
+    if entries:
+        LeaveLedgerEntry.objects.bulk_create(entries)
+        days = Case(*[When(pk=pk, then=days) for pk, days in consumed.items()])
+        LeaveBalance.objects.filter(pk__in=consumed).update(
+            available=F("available") - days, consumed=F("consumed") + days
+        )
+    return refused
+
+
+@transaction.atomic
+def rollover(year, annual_days=ANNUAL_DAYS, max_carry_over=MAX_CARRY_OVER):
+    """
+    Carries the unused days of `year`, capped at max_carry_over, into the
+    balances of year + 1 of every employee with a balance in `year`. The
+    balances missing are opened with the yearly accrual; the ones already
+    opened (e.g. by an approval in January) get the carry-over entry, unless
+    they already have one. Returns the number of balances rolled over.
+    """
+    next_year = year + 1
+    next_balances = LeaveBalance.objects.filter(
+        employee_id=OuterRef("employee_id"), year=next_year
+    )
+    previous = (
+        LeaveBalance.objects.filter(year=year)
+        .annotate(
+            next_pk=Subquery(next_balances.values("pk")[:1]),
+            carried=Exists(
+                LeaveLedgerEntry.objects.filter(
+                    balance__employee_id=OuterRef("employee_id"),
+                    balance__year=next_year,
+                    kind=Kind.CARRY_OVER,
+                )
+            ),
+        )
+        .filter(carried=False)
+        .values_list("employee_id", "available", "next_pk")
+    )
+
+    carry_overs = {}
+    existing = {}
+    for employee_id, available, next_pk in previous:
+        carried = max(min(available, max_carry_over), 0)
+        if next_pk is None:
+            carry_overs[employee_id] = carried
+        elif carried:
+            existing[next_pk] = carried
+
+    LeaveBalance.objects.bulk_create(
+        [
+            LeaveBalance(
+                employee_id=employee_id,
+                year=next_year,
+                accrued=annual_days + carried,
+                available=annual_days + carried,
+            )
+            for employee_id, carried in carry_overs.items()
+        ]
+    )
+
+    # bulk_create only returns primary keys on some backends
+    balances = LeaveBalance.objects.filter(
+        year=next_year, employee_id__in=carry_overs
+    ).values_list("pk", "employee_id")
+    entries = []
+    for pk, employee_id in balances:
+        entries.append(
+            LeaveLedgerEntry(
+                balance_id=pk,
+                kind=Kind.ACCRUAL,
+                days=annual_days,
+                note="Asignación anual",
+            )
+        )
+        if carry_overs[employee_id]:
+            entries.append(
+                LeaveLedgerEntry(
+                    balance_id=pk,
+                    kind=Kind.CARRY_OVER,
+                    days=carry_overs[employee_id],
+                    note=f"Días no disfrutados de {year}",
+                )
+            )
+    entries.extend(
+        LeaveLedgerEntry(
+            balance_id=pk,
+            kind=Kind.CARRY_OVER,
+            days=carried,
+            note=f"Días no disfrutados de {year}",
+        )
+        for pk, carried in existing.items()
+    )
+    LeaveLedgerEntry.objects.bulk_create(entries)
+
+    if existing:
+        days = Case(*[When(pk=pk, then=days) for pk, days in existing.items()])
+        LeaveBalance.objects.filter(pk__in=existing).update(
+            accrued=F("accrued") + days, available=F("available") + days
+        )
+    return len(carry_overs) + len(existing)
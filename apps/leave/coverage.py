@@ -0,0 +1,104 @@
+# apps/leave/coverage.py
+import math
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.employees.models import Employee
+
+from .models import Leave, LeaveDay
+
+# Share of a department that must stay available when min_staff is not set
+DEFAULT_COVERAGE_RATIO = 0.75
+
+# Leaves that take people off the schedule (pending ones are shown apart)
+ACTIVE_STATUSES = (Leave.StatusChoices.PENDING, Leave.StatusChoices.APPROVED)
+
+
+def leave_day_rows(leave):
+    if leave.status not in ACTIVE_STATUSES:
+        return []
+    approved = leave.status == Leave.StatusChoices.APPROVED
+    return [
+        LeaveDay(
+            leave_id=leave.pk,
+            employee_id=leave.employee_id,
+            date=leave.start_date + timedelta(days=offset),
+            is_approved=approved,
+        )
+        for offset in range(leave.duration_days())
+    ]
+
+
+@transaction.atomic
+def sync_leave_days(leave):
+    """Rewrites the day rows of a leave after its dates or status changed"""
+    LeaveDay.objects.filter(leave_id=leave.pk).delete()
+    LeaveDay.objects.bulk_create(leave_day_rows(leave))
+
+
+def required_staff(department, headcount):
+    if department.min_staff:
+        return department.min_staff
+    return math.ceil(headcount * DEFAULT_COVERAGE_RATIO)
+
+
+def team_coverage(department, start_date, end_date, leave=None):
+    """
+    Per-day coverage of a department: [{"date", "headcount", "off",
+    "pending", "available", "required", "below"}].
+
+    Absences come from one grouped query over LeaveDay. When `leave` is given
+    (a leave under review), "available" is computed as if it were approved,
+    so the page can flag approvals that would drop below the required staff.
+    """
+    headcount = Employee.objects.filter(
+        department=department, user__is_active=True
+    ).count()
+    required = required_staff(department, headcount)
+
+    reviewed = Q()
+    if leave is not None:
+        reviewed = Q(employee_id=leave.employee_id)
+    rows = (
+        LeaveDay.objects.filter(
+            employee__department=department,
+            employee__user__is_active=True,
+            date__gte=start_date,
+            date__lte=end_date,
+        )
+        .values("date")
+        .annotate(
+            off=Count(
+                "employee", distinct=True, filter=Q(is_approved=True) & ~reviewed
+            ),
+            pending=Count(
+                "employee", distinct=True, filter=Q(is_approved=False) & ~reviewed
+            ),
+        )
+        .order_by("date")
+    )
+    by_date = {row["date"]: row for row in rows}
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        row = by_date.get(day, {})
+        off = row.get("off", 0)
+        if leave is not None and leave.start_date <= day <= leave.end_date:
+            off += 1
+        available = headcount - off
+        days.append(
+            {
+                "date": day,
+                "headcount": headcount,
+                "off": off,
+                "pending": row.get("pending", 0),
+                "available": available,
+                "required": required,
+                "below": available < required,
+            }
+        )
+        day += timedelta(days=1)
+    return days
@@ -0,0 +1,71 @@
+# apps/leave/decisions.py
+from django.db import transaction
+from django.utils import timezone
+
+from .balances import apply_approvals
+from .models import Leave, LeaveDay
+from .notifications import queue_decision_emails
+
+Status = Leave.StatusChoices
+
+DECISIONS = (Status.APPROVED, Status.REJECTED)
+
+
+@transaction.atomic
+def decide_leaves(leaves, status, user, rejection_reason=""):
+    """
+    Approves or rejects in bulk the pending leaves of a queryset, which must
+    already be scoped to what `user` is allowed to manage:
+
+    1. the pending leaves are locked and read with one query
+    2. approvals of balance leaves are checked and posted to the ledger in
+       bulk (see apply_approvals); the ones without balance are left pending
+    3. status, approver and timestamps are written with one UPDATE
+    4. the day rows of the coverage calendar are updated with one query,
+       since update() skips the post_save signal
+    5. the employees' e-mails are queued until the transaction commits
+
+    Returns (decided leaves, {leave pk: reason} of the refused ones).
+    """
+    if status not in DECISIONS:
+        raise ValueError(f"Unknown decision: {status}")
+
+    pending = list(
+        leaves.filter(status=Status.PENDING)
+        .select_related(None)
+        .select_related("employee__user")
+        .select_for_update(of=("self",))
+        .order_by("created_at")
+    )
+
+    refused = {}
+    if status == Status.APPROVED:
+        rejection_reason = ""
+        refused = apply_approvals(pending, user=user)
+    decided = [leave for leave in pending if leave.pk not in refused]
+    if not decided:
+        return decided, refused
+
+    now = timezone.now()
+    ids = [leave.pk for leave in decided]
+    changes = {
+        "status": status,
+        "approved_by": user,
+        "approved_at": now,
+        "rejection_reason": rejection_reason,
+        # auto_now is not applied by update()
+        "updated_at": now,
+    }
+    Leave.objects.filter(pk__in=ids).update(**changes)
+    for leave in decided:
+        for name, value in changes.items():
+            setattr(leave, name, value)
+
+    days = LeaveDay.objects.filter(leave_id__in=ids)
+    if status == Status.APPROVED:
+        days.update(is_approved=True)
+    else:
+        days.delete()
+
+    queue_decision_emails(decided)
+    return decided, refused
@@ -0,0 +1,53 @@
+# apps/leave/exports.py
+from django.utils import timezone
+
+# Rows fetched per round trip while streaming; memory stays constant
+CHUNK_SIZE = 2000
+
+
+def leave_header():
+    return [
+        "Nº empleado",
+        "Empleado",
+        "Departamento",
+        "Tipo",
+        "Desde",
+        "Hasta",
+        "Días",
+        "Estado",
+        "Gestionado por",
+        "Fecha de gestión",
+        "Solicitado",
+    ]
+
+
+def leave_csv_rows(leaves):
+    """
+    CSV rows for a leave queryset, read in chunks with a server-side cursor.
+    The queryset should select_related the employee, user, department and
+    approved_by.
+    """
+    tz = timezone.get_default_timezone()
+    for leave in leaves.iterator(chunk_size=CHUNK_SIZE):
+        employee = leave.employee
+        yield [
+            employee.employee_number or "",
+            employee.get_full_name(),
+            employee.department.name,
+            leave.get_leave_type_display(),
+            leave.start_date.isoformat(),
+            leave.end_date.isoformat(),
+            leave.duration_days(),
+            leave.get_status_display(),
+            (
+                leave.approved_by.get_full_name() or leave.approved_by.username
+                if leave.approved_by
+                else ""
+            ),
+            (
+                timezone.localtime(leave.approved_at, tz).strftime("%Y-%m-%d %H:%M")
+                if leave.approved_at
+                else ""
+            ),
+            timezone.localtime(leave.created_at, tz).strftime("%Y-%m-%d %H:%M"),
+        ]
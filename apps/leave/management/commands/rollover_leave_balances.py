@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.leave.balances import ANNUAL_DAYS, MAX_CARRY_OVER, rollover
+
+
+class Command(BaseCommand):
+    help = "Open next year's leave balances carrying over unused days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="Año que se cierra (por defecto, el año en curso)",
+        )
+        parser.add_argument("--annual-days", type=int, default=ANNUAL_DAYS)
+        parser.add_argument("--max-carry-over", type=int, default=MAX_CARRY_OVER)
+
+    def handle(self, *args, **options):
+        year = options["year"] or timezone.localdate().year
+        rolled = rollover(
+            year,
+            annual_days=options["annual_days"],
+            max_carry_over=options["max_carry_over"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{rolled} saldos de {year + 1} con los días de {year}")
+        )
@@ -0,0 +1,158 @@
+# Generated by Django 6.0 on 2026-10-19 00:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "employees",
+            "0006_employee_address_employee_birth_date_employee_dni_and_more",
+        ),
+        ("leave", "0003_alter_leave_attachment_alter_leave_leave_type_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(verbose_name="Year")),
+                (
+                    "accrued",
+                    models.IntegerField(default=0, verbose_name="Accrued days"),
+                ),
+                (
+                    "consumed",
+                    models.IntegerField(default=0, verbose_name="Consumed days"),
+                ),
+                (
+                    "adjusted",
+                    models.IntegerField(default=0, verbose_name="Adjusted days"),
+                ),
+                (
+                    "available",
+                    models.IntegerField(default=0, verbose_name="Available days"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Last updated"),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leave_balances",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Leave balance",
+                "verbose_name_plural": "Leave balances",
+                "ordering": ["-year", "employee"],
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaveLedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("accrual", "Accrual"),
+                            ("carry_over", "Carry over"),
+                            ("consumption", "Consumption"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        max_length=20,
+                        verbose_name="Kind",
+                    ),
+                ),
+                ("days", models.IntegerField(verbose_name="Days")),
+                (
+                    "note",
+                    models.CharField(blank=True, max_length=255, verbose_name="Note"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "balance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="leave.leavebalance",
+                        verbose_name="Balance",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Created by",
+                    ),
+                ),
+                (
+                    "leave",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ledger_entries",
+                        to="leave.leave",
+                        verbose_name="Leave",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Leave ledger entry",
+                "verbose_name_plural": "Leave ledger entries",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="leavebalance",
+            index=models.Index(
+                fields=["year", "available"], name="leave_leave_year_4bf17c_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leavebalance",
+            constraint=models.UniqueConstraint(
+                fields=("employee", "year"), name="unique_leave_balance_per_year"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leaveledgerentry",
+            index=models.Index(
+                fields=["balance", "created_at"], name="leave_leave_balance_ebfc1b_idx"
+            ),
+        ),
+    ]
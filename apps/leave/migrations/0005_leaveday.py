@@ -0,0 +1,92 @@
+# Generated by Django 6.0 on 2026-10-19 00:28
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_leave_days(apps, schema_editor):
+    Leave = apps.get_model("leave", "Leave")
+    LeaveDay = apps.get_model("leave", "LeaveDay")
+
+    rows = []
+    for leave in Leave.objects.filter(status__in=["pending", "approved"]).iterator(
+        chunk_size=2000
+    ):
+        for offset in range((leave.end_date - leave.start_date).days + 1):
+            rows.append(
+                LeaveDay(
+                    leave_id=leave.pk,
+                    employee_id=leave.employee_id,
+                    date=leave.start_date + timedelta(days=offset),
+                    is_approved=leave.status == "approved",
+                )
+            )
+        if len(rows) >= 2000:
+            LeaveDay.objects.bulk_create(rows)
+            rows = []
+    LeaveDay.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0007_department_min_staff"),
+        ("leave", "0004_leave_balance_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaveDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "is_approved",
+                    models.BooleanField(default=False, verbose_name="Approved"),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leave_days",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+                (
+                    "leave",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="days",
+                        to="leave.leave",
+                        verbose_name="Leave",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Leave day",
+                "verbose_name_plural": "Leave days",
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["date", "employee"], name="leave_leave_date_3e31ee_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("leave", "date"), name="unique_leave_day_per_leave"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_leave_days, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.contrib.auth.models import User
 from django.db import models
 from django.db.models import F, Q
@@ -6,6 +8,23 @@ from django.utils.translation import gettext_lazy as _
 from apps.employees.models import Employee
 
 
+class LeaveQuerySet(models.QuerySet):
+    def managed_by(self, employee):
+        """Leaves an employee can manage: the ones of their team"""
+        if employee.can_see_all():
+            return self.all()
+        return self.filter(employee__in=Employee.objects.supervised_by(employee))
+
+    def visible_to(self, employee):
+        """Leaves an employee can see: their own and the ones they manage"""
+        if employee.can_see_all():
+            return self.all()
+        return self.filter(
+            Q(employee=employee)
+            | Q(employee__in=Employee.objects.supervised_by(employee))
+        )
+
+
 class Leave(models.Model):
     """Leave and vacation management"""
 
@@ -22,6 +41,9 @@ class Leave(models.Model):
         REJECTED = "rejected", _("Rejected")
         CANCELLED = "cancelled", _("Cancelled")
 
+    # Leave types deducted from the annual leave balance
+    BALANCE_TYPES = (LeaveTypeChoices.VACATION,)
+
     employee = models.ForeignKey(
         Employee,
         on_delete=models.CASCADE,
@@ -60,6 +82,8 @@ class Leave(models.Model):
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Last updated"), auto_now=True)
 
+    objects = LeaveQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Leave")
         verbose_name_plural = _("Leaves")
@@ -78,3 +102,137 @@ class Leave(models.Model):
     def duration_days(self):
         """Calculates duration in days"""
         return (self.end_date - self.start_date).days + 1
+
+    @property
+    def consumes_balance(self):
+        return self.leave_type in self.BALANCE_TYPES
+
+    def days_by_year(self):
+        """Leave days split by calendar year: {year: days}"""
+        days = {}
+        for year in range(self.start_date.year, self.end_date.year + 1):
+            start = max(self.start_date, date(year, 1, 1))
+            end = min(self.end_date, date(year, 12, 31))
+            days[year] = (end - start).days + 1
+        return days
+
+
+class LeaveDay(models.Model):
+    """
+    One row per day of a pending or approved leave, so "who is off on these
+    days" is an indexed range lookup instead of an interval scan of Leave
+    """
+
+    leave = models.ForeignKey(
+        Leave, on_delete=models.CASCADE, related_name="days", verbose_name=_("Leave")
+    )
+    # Denormalised from the leave for the (date, employee) index
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="leave_days",
+        verbose_name=_("Employee"),
+    )
+    date = models.DateField(_("Date"))
+    is_approved = models.BooleanField(_("Approved"), default=False)
+
+    class Meta:
+        verbose_name = _("Leave day")
+        verbose_name_plural = _("Leave days")
+        ordering = ["date"]
+        indexes = [
+            models.Index(fields=["date", "employee"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["leave", "date"], name="unique_leave_day_per_leave"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.employee} - {self.date}"
+
+
+class LeaveBalance(models.Model):
+    """
+    Leave days of an employee for one year. The totals are denormalised from
+    the ledger entries and updated in the same transaction that posts them.
+    """
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="leave_balances",
+        verbose_name=_("Employee"),
+    )
+    year = models.PositiveSmallIntegerField(_("Year"))
+    # Yearly entitlement plus days carried over from the previous year
+    accrued = models.IntegerField(_("Accrued days"), default=0)
+    consumed = models.IntegerField(_("Consumed days"), default=0)
+    adjusted = models.IntegerField(_("Adjusted days"), default=0)
+    available = models.IntegerField(_("Available days"), default=0)
+    updated_at = models.DateTimeField(_("Last updated"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Leave balance")
+        verbose_name_plural = _("Leave balances")
+        ordering = ["-year", "employee"]
+        indexes = [
+            models.Index(fields=["year", "available"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "year"], name="unique_leave_balance_per_year"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.employee.get_full_name()} - {self.year}: {self.available}"
+
+
+class LeaveLedgerEntry(models.Model):
+    """Movement of a leave balance; days are signed by their effect on it"""
+
+    class KindChoices(models.TextChoices):
+        ACCRUAL = "accrual", _("Accrual")
+        CARRY_OVER = "carry_over", _("Carry over")
+        CONSUMPTION = "consumption", _("Consumption")
+        ADJUSTMENT = "adjustment", _("Adjustment")
+
+    balance = models.ForeignKey(
+        LeaveBalance,
+        on_delete=models.CASCADE,
+        related_name="entries",
+        verbose_name=_("Balance"),
+    )
+    kind = models.CharField(_("Kind"), max_length=20, choices=KindChoices.choices)
+    days = models.IntegerField(_("Days"))
+    leave = models.ForeignKey(
+        Leave,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="ledger_entries",
+        verbose_name=_("Leave"),
+    )
+    note = models.CharField(_("Note"), max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name=_("Created by"),
+    )
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Leave ledger entry")
+        verbose_name_plural = _("Leave ledger entries")
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["balance", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.balance} {self.get_kind_display()} {self.days:+d}"
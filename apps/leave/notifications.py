@@ -0,0 +1,33 @@
+# apps/leave/notifications.py
+from django.core.mail import send_mass_mail
+from django.db import transaction
+
+
+def decision_email(leave):
+    """(subject, message, from_email, recipients) telling an employee the decision"""
+    status = leave.get_status_display().lower()
+    lines = [
+        f"Hola {leave.employee.get_full_name()},",
+        "",
+        f"Tu solicitud de {leave.get_leave_type_display().lower()} del "
+        f"{leave.start_date:%d/%m/%Y} al {leave.end_date:%d/%m/%Y} ha sido {status}.",
+    ]
+    if leave.rejection_reason:
+        lines += ["", f"Comentarios: {leave.rejection_reason}"]
+    return (
+        f"Solicitud de ausencia {status}",
+        "\n".join(lines),
+        None,
+        [leave.employee.user.email],
+    )
+
+
+def queue_decision_emails(leaves):
+    """
+    Sends the decision e-mails once the current transaction commits, all
+    over a single connection. Employees without an e-mail are skipped and
+    delivery errors never undo a decision.
+    """
+    emails = [decision_email(leave) for leave in leaves if leave.employee.user.email]
+    if emails:
+        transaction.on_commit(lambda: send_mass_mail(emails, fail_silently=True))
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .coverage import sync_leave_days
+from .models import Leave
+
+
+@receiver(post_save, sender=Leave)
+def update_leave_days(sender, instance, **kwargs):
+    # Keeps the day-level absence table used by the coverage calendar
+    sync_leave_days(instance)
@@ -0,0 +1,187 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.balances import ANNUAL_DAYS, apply_decision, get_balance, rollover
+from apps.leave.models import Leave, LeaveBalance, LeaveLedgerEntry
+
+
+class LeaveBalanceTest(TestCase):
+    """Tests para el libro de saldos de vacaciones"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Limpieza", code="LIM")
+        self.employee = Employee.objects.create(
+            user=User.objects.create_user(username="limpieza"),
+            department=self.department,
+            role=Employee.RoleChoices.HOUSEKEEPER,
+        )
+        self.director = Employee.objects.create(
+            user=User.objects.create_user(username="direccion"),
+            department=self.department,
+            role=Employee.RoleChoices.DIRECTOR,
+        )
+
+    def _leave(self, start, end, leave_type=Leave.LeaveTypeChoices.VACATION, **extra):
+        return Leave.objects.create(
+            employee=self.employee,
+            leave_type=leave_type,
+            start_date=start,
+            end_date=end,
+            reason="Vacaciones",
+            **extra,
+        )
+
+    def test_balance_opened_with_accrual_and_previous_leaves(self):
+        """El saldo se abre con la asignación anual y lo ya aprobado"""
+        self._leave(
+            date(2026, 2, 2), date(2026, 2, 6), status=Leave.StatusChoices.APPROVED
+        )
+        self._leave(
+            date(2026, 3, 2),
+            date(2026, 3, 3),
+            leave_type=Leave.LeaveTypeChoices.SICK,
+            status=Leave.StatusChoices.APPROVED,
+        )
+
+        balance = get_balance(self.employee, 2026)
+
+        self.assertEqual(balance.accrued, ANNUAL_DAYS)
+        self.assertEqual(balance.consumed, 5)
+        self.assertEqual(balance.available, ANNUAL_DAYS - 5)
+        self.assertEqual(balance.entries.count(), 2)
+
+    def test_approval_splits_days_across_years(self):
+        """Un permiso que cruza el fin de año descuenta de cada año"""
+        leave = self._leave(date(2026, 12, 28), date(2027, 1, 2))
+        leave.status = Leave.StatusChoices.APPROVED
+
+        apply_decision(leave, Leave.StatusChoices.PENDING)
+
+        self.assertEqual(get_balance(self.employee, 2026).consumed, 4)
+        self.assertEqual(get_balance(self.employee, 2027).consumed, 2)
+
+        # Cancelar la aprobación devuelve los días
+        leave.save()
+        leave.status = Leave.StatusChoices.CANCELLED
+        apply_decision(leave, Leave.StatusChoices.APPROVED)
+
+        self.assertEqual(get_balance(self.employee, 2026).available, ANNUAL_DAYS)
+        self.assertEqual(get_balance(self.employee, 2027).available, ANNUAL_DAYS)
+
+    def test_approval_rejected_without_balance(self):
+        """No se puede aprobar más de lo disponible"""
+        leave = self._leave(date(2026, 6, 1), date(2026, 6, 30))
+        leave.status = Leave.StatusChoices.APPROVED
+
+        with self.assertRaises(ValidationError):
+            apply_decision(leave, Leave.StatusChoices.PENDING)
+
+        self.assertFalse(LeaveLedgerEntry.objects.filter(leave=leave).exists())
+
+    def test_approval_view_updates_balance(self):
+        """Aprobar desde la vista mueve el saldo en la misma transacción"""
+        leave = self._leave(date(2030, 7, 1), date(2030, 7, 10))
+        self.client.force_login(self.director.user)
+
+        response = self.client.post(
+            reverse("leave:approval", args=[leave.pk]), {"status": "approved"}
+        )
+
+        self.assertRedirects(
+            response, reverse("leave:management"), fetch_redirect_response=False
+        )
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, Leave.StatusChoices.APPROVED)
+        self.assertEqual(
+            LeaveBalance.objects.get(employee=self.employee, year=2030).available,
+            ANNUAL_DAYS - 10,
+        )
+
+    def test_rollover_caps_carry_over(self):
+        """El cierre de año abre el siguiente con los días sobrantes limitados"""
+        get_balance(self.employee, 2026)
+        leave = self._leave(date(2026, 8, 3), date(2026, 8, 21))
+        leave.status = Leave.StatusChoices.APPROVED
+        apply_decision(leave, Leave.StatusChoices.PENDING)
+
+        # Número fijo de consultas, sin importar cuántos empleados haya
+        with self.assertNumQueries(6):
+            opened = rollover(2026, max_carry_over=5)
+
+        self.assertEqual(opened, 1)
+        balance = LeaveBalance.objects.get(employee=self.employee, year=2027)
+        self.assertEqual(balance.available, ANNUAL_DAYS + 3)
+        self.assertEqual(rollover(2026), 0)
+
+    def test_rollover_into_balance_already_opened(self):
+        """Un permiso aprobado para enero no hace perder los días sobrantes"""
+        get_balance(self.employee, 2026)
+        leave = self._leave(date(2027, 1, 4), date(2027, 1, 5))
+        leave.status = Leave.StatusChoices.APPROVED
+        apply_decision(leave, Leave.StatusChoices.PENDING)
+        leave.save()
+
+        self.assertEqual(rollover(2026, max_carry_over=5), 1)
+
+        balance = LeaveBalance.objects.get(employee=self.employee, year=2027)
+        self.assertEqual(balance.accrued, ANNUAL_DAYS + 5)
+        self.assertEqual(balance.available, ANNUAL_DAYS + 5 - 2)
+        self.assertEqual(
+            balance.entries.filter(
+                kind=LeaveLedgerEntry.KindChoices.CARRY_OVER
+            ).count(),
+            1,
+        )
+        self.assertEqual(rollover(2026), 0)
+
+    def test_admin_adds_approved_leave(self):
+        """Desde el admin se puede crear un permiso ya aprobado"""
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="x")
+        )
+        url = reverse("admin:leave_leave_add")
+        data = {
+            "employee": self.employee.pk,
+            "leave_type": Leave.LeaveTypeChoices.VACATION,
+            "start_date": "2030-07-01",
+            "end_date": "2030-07-10",
+            "reason": "Vacaciones",
+            "status": Leave.StatusChoices.APPROVED,
+            "approved_at_0": "",
+            "approved_at_1": "",
+            "rejection_reason": "",
+        }
+
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 302)
+        leave = Leave.objects.get()
+        self.assertEqual(get_balance(self.employee, 2030).available, ANNUAL_DAYS - 10)
+        self.assertEqual(leave.ledger_entries.count(), 1)
+
+        # Sin saldo suficiente el formulario se rechaza y no se guarda nada
+        data.update(start_date="2031-01-01", end_date="2031-02-28")
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Saldo insuficiente")
+        self.assertEqual(Leave.objects.count(), 1)
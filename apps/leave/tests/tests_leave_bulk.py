@@ -0,0 +1,185 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.balances import get_balance
+from apps.leave.decisions import decide_leaves
+from apps.leave.models import Leave, LeaveDay, LeaveLedgerEntry
+
+
+class BulkLeaveDecisionTest(TestCase):
+    """Tests para la aprobación y el rechazo de permisos en bloque"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.receptionists = [
+            self._employee(f"recepcion{i}", Employee.RoleChoices.RECEPTIONIST)
+            for i in range(3)
+        ]
+        self.housekeeper = self._employee("limpieza", Employee.RoleChoices.HOUSEKEEPER)
+        self.manager = self._employee(
+            "jefe_recepcion", Employee.RoleChoices.RECEPTION_MANAGER
+        )
+        self.director = self._employee("direccion", Employee.RoleChoices.DIRECTOR)
+
+    def _employee(self, username, role):
+        return Employee.objects.create(
+            user=User.objects.create_user(
+                username=username, email=f"{username}@hotel.test"
+            ),
+            department=self.department,
+            role=role,
+        )
+
+    def _leave(self, employee, start, end, leave_type=Leave.LeaveTypeChoices.PERSONAL):
+        return Leave.objects.create(
+            employee=employee,
+            leave_type=leave_type,
+            start_date=start,
+            end_date=end,
+            reason="Asuntos propios",
+        )
+
+    def test_bulk_approval_uses_constant_queries(self):
+        """Aprobar muchas solicitudes no añade consultas por permiso"""
+        leaves = [
+            self._leave(employee, date(2026, 6, 1), date(2026, 6, 3))
+            for employee in self.receptionists * 10
+        ]
+
+        # Lectura, UPDATE de permisos y de días, más los savepoints
+        with self.assertNumQueries(7), self.captureOnCommitCallbacks(execute=True):
+            decided, refused = decide_leaves(
+                Leave.objects.all(), Leave.StatusChoices.APPROVED, self.director.user
+            )
+
+        self.assertEqual(len(decided), len(leaves))
+        self.assertEqual(refused, {})
+        self.assertEqual(
+            Leave.objects.filter(
+                status=Leave.StatusChoices.APPROVED, approved_by=self.director.user
+            ).count(),
+            30,
+        )
+        self.assertFalse(LeaveDay.objects.filter(is_approved=False).exists())
+        self.assertEqual(len(mail.outbox), 30)
+
+    def test_rejection_removes_days(self):
+        """Rechazar libera los días del calendario de cobertura"""
+        leave = self._leave(self.receptionists[0], date(2026, 6, 1), date(2026, 6, 2))
+
+        decide_leaves(
+            Leave.objects.all(),
+            Leave.StatusChoices.REJECTED,
+            self.director.user,
+            rejection_reason="Temporada alta",
+        )
+
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, Leave.StatusChoices.REJECTED)
+        self.assertEqual(leave.rejection_reason, "Temporada alta")
+        self.assertFalse(LeaveDay.objects.filter(leave=leave).exists())
+
+    def test_vacation_without_balance_stays_pending(self):
+        """Las vacaciones que no caben en el saldo quedan pendientes"""
+        employee = self.receptionists[0]
+        first = self._leave(
+            employee,
+            date(2026, 7, 1),
+            date(2026, 7, 15),
+            leave_type=Leave.LeaveTypeChoices.VACATION,
+        )
+        second = self._leave(
+            employee,
+            date(2026, 8, 3),
+            date(2026, 8, 12),
+            leave_type=Leave.LeaveTypeChoices.VACATION,
+        )
+
+        decided, refused = decide_leaves(
+            Leave.objects.all(), Leave.StatusChoices.APPROVED, self.director.user
+        )
+
+        self.assertEqual(decided, [first])
+        self.assertIn(second.pk, refused)
+        second.refresh_from_db()
+        self.assertEqual(second.status, Leave.StatusChoices.PENDING)
+        balance = get_balance(employee, 2026)
+        self.assertEqual((balance.consumed, balance.available), (15, 7))
+        self.assertEqual(
+            LeaveLedgerEntry.objects.filter(balance=balance, leave=first).count(), 1
+        )
+
+    def test_manager_only_decides_for_team(self):
+        """Un jefe solo puede decidir sobre los permisos de su equipo"""
+        own = self._leave(self.receptionists[0], date(2026, 6, 1), date(2026, 6, 1))
+        other = self._leave(self.housekeeper, date(2026, 6, 1), date(2026, 6, 1))
+        self.client.force_login(self.manager.user)
+
+        response = self.client.post(
+            reverse("leave:management"),
+            {"decision": "approved", "leaves": [own.pk, other.pk]},
+        )
+
+        self.assertRedirects(response, reverse("leave:management") + "?")
+        own.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(own.status, Leave.StatusChoices.APPROVED)
+        self.assertEqual(other.status, Leave.StatusChoices.PENDING)
+
+    def test_all_matching_applies_filters(self):
+        """La opción de todo el filtro respeta los filtros del listado"""
+        sick = self._leave(
+            self.receptionists[0],
+            date(2026, 6, 1),
+            date(2026, 6, 1),
+            leave_type=Leave.LeaveTypeChoices.SICK,
+        )
+        personal = self._leave(
+            self.receptionists[1], date(2026, 6, 1), date(2026, 6, 1)
+        )
+        self.client.force_login(self.director.user)
+
+        self.client.post(
+            reverse("leave:management") + "?leave_type=sick",
+            {
+                "decision": "rejected",
+                "rejection_reason": "Falta justificante",
+                "all_matching": "1",
+            },
+        )
+
+        sick.refresh_from_db()
+        personal.refresh_from_db()
+        self.assertEqual(sick.status, Leave.StatusChoices.REJECTED)
+        self.assertEqual(personal.status, Leave.StatusChoices.PENDING)
+
+    def test_rejection_requires_reason(self):
+        """Rechazar en bloque exige un motivo"""
+        leave = self._leave(self.receptionists[0], date(2026, 6, 1), date(2026, 6, 1))
+        self.client.force_login(self.director.user)
+
+        self.client.post(
+            reverse("leave:management"), {"decision": "rejected", "leaves": [leave.pk]}
+        )
+
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, Leave.StatusChoices.PENDING)
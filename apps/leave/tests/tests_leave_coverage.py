@@ -0,0 +1,131 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.coverage import sync_leave_days, team_coverage
+from apps.leave.models import Leave, LeaveDay
+
+
+class TeamCoverageTest(TestCase):
+    """Tests para la tabla de días de permiso y la cobertura del equipo"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.staff = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=f"recepcion{i}"),
+                department=self.department,
+                role=Employee.RoleChoices.RECEPTIONIST,
+            )
+            for i in range(4)
+        ]
+        self.director = Employee.objects.create(
+            user=User.objects.create_user(username="direccion"),
+            department=Department.objects.create(name="Dirección", code="DIR"),
+            role=Employee.RoleChoices.DIRECTOR,
+        )
+
+    def _leave(self, employee, start, end, **extra):
+        return Leave.objects.create(
+            employee=employee,
+            leave_type=Leave.LeaveTypeChoices.PERSONAL,
+            start_date=start,
+            end_date=end,
+            reason="Asuntos propios",
+            **extra,
+        )
+
+    def test_days_follow_dates_and_status(self):
+        """Los días se reescriben al cambiar fechas o estado"""
+        leave = self._leave(self.staff[0], date(2026, 5, 4), date(2026, 5, 6))
+        days = LeaveDay.objects.filter(leave=leave)
+        self.assertEqual(days.count(), 3)
+        self.assertFalse(days.filter(is_approved=True).exists())
+
+        leave.end_date = date(2026, 5, 5)
+        leave.status = Leave.StatusChoices.APPROVED
+        leave.save()
+        self.assertEqual(days.count(), 2)
+        self.assertEqual(days.filter(is_approved=True).count(), 2)
+
+        leave.status = Leave.StatusChoices.CANCELLED
+        leave.save()
+        self.assertFalse(days.exists())
+
+    def test_coverage_counts_overlaps_in_one_query(self):
+        """La cobertura se calcula con una consulta agrupada"""
+        self._leave(
+            self.staff[0],
+            date(2026, 5, 4),
+            date(2026, 5, 5),
+            status=Leave.StatusChoices.APPROVED,
+        )
+        self._leave(self.staff[1], date(2026, 5, 5), date(2026, 5, 6))
+
+        with self.assertNumQueries(2):
+            coverage = team_coverage(
+                self.department, date(2026, 5, 4), date(2026, 5, 6)
+            )
+
+        self.assertEqual([day["off"] for day in coverage], [1, 1, 0])
+        self.assertEqual([day["pending"] for day in coverage], [0, 1, 1])
+        self.assertEqual([day["available"] for day in coverage], [3, 3, 4])
+        # Sin mínimo definido se exige el 75 % de la plantilla
+        self.assertEqual(coverage[0]["required"], 3)
+        self.assertFalse(any(day["below"] for day in coverage))
+
+    def test_reviewed_leave_counted_as_approved(self):
+        """El permiso en revisión cuenta como aprobado"""
+        self.department.min_staff = 3
+        self.department.save()
+        self._leave(
+            self.staff[0],
+            date(2026, 5, 4),
+            date(2026, 5, 4),
+            status=Leave.StatusChoices.APPROVED,
+        )
+        leave = self._leave(self.staff[1], date(2026, 5, 4), date(2026, 5, 5))
+
+        coverage = team_coverage(
+            self.department, leave.start_date, leave.end_date, leave=leave
+        )
+
+        self.assertEqual([day["off"] for day in coverage], [2, 1])
+        self.assertEqual([day["pending"] for day in coverage], [0, 0])
+        self.assertEqual([day["below"] for day in coverage], [True, False])
+
+    def test_sync_is_idempotent(self):
+        """Sincronizar dos veces no duplica los días"""
+        leave = self._leave(self.staff[0], date(2026, 5, 4), date(2026, 5, 8))
+        sync_leave_days(leave)
+        self.assertEqual(LeaveDay.objects.filter(leave=leave).count(), 5)
+
+    def test_approval_page_shows_coverage(self):
+        """La pantalla de aprobación avisa si falta personal"""
+        self.department.min_staff = 4
+        self.department.save()
+        leave = self._leave(self.staff[0], date(2026, 5, 4), date(2026, 5, 5))
+        self.client.force_login(self.director.user)
+
+        response = self.client.get(reverse("leave:approval", args=[leave.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["coverage"]), 2)
+        self.assertTrue(response.context["coverage_below"])
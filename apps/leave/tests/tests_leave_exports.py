@@ -0,0 +1,101 @@
+import gzip
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.models import Leave
+
+
+class LeaveExportTest(TestCase):
+    """Tests para la exportación de permisos en CSV"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Limpieza", code="LIM")
+        self.director = Employee.objects.create(
+            user=User.objects.create_user(username="direccion"),
+            department=self.department,
+            role=Employee.RoleChoices.DIRECTOR,
+        )
+        self.housekeeper = Employee.objects.create(
+            user=User.objects.create_user(
+                username="limpieza", first_name="Ana", last_name="Ruiz"
+            ),
+            department=self.department,
+            role=Employee.RoleChoices.HOUSEKEEPER,
+        )
+        for leave_type, status in [
+            (Leave.LeaveTypeChoices.VACATION, Leave.StatusChoices.APPROVED),
+            (Leave.LeaveTypeChoices.SICK, Leave.StatusChoices.PENDING),
+        ]:
+            Leave.objects.create(
+                employee=self.housekeeper,
+                leave_type=leave_type,
+                start_date=date(2026, 3, 2),
+                end_date=date(2026, 3, 4),
+                reason="Motivo",
+                status=status,
+            )
+        self.client.force_login(self.director.user)
+
+    def _rows(self, response):
+        content = b"".join(response.streaming_content)
+        if response["Content-Type"] == "application/gzip":
+            content = gzip.decompress(content)
+        return content.decode("utf-8-sig").splitlines()
+
+    def test_export_applies_management_filters(self):
+        """La exportación usa los mismos filtros que el listado"""
+        response = self.client.get(
+            reverse("leave:management-export"), {"status": "approved"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = self._rows(response)
+        self.assertEqual(len(rows), 2)
+        self.assertIn("Ana Ruiz", rows[1])
+        self.assertIn("2026-03-02,2026-03-04,3", rows[1])
+
+    def test_gzip_export(self):
+        """Con gzip=1 se descarga comprimido"""
+        response = self.client.get(reverse("leave:management-export"), {"gzip": "1"})
+
+        self.assertIn(".csv.gz", response["Content-Disposition"])
+        self.assertEqual(len(self._rows(response)), 3)
+
+    def test_export_requires_supervisor(self):
+        self.client.force_login(self.housekeeper.user)
+
+        response = self.client.get(reverse("leave:management-export"))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_rejects_post(self):
+        """La exportación no permite aprobar ni rechazar permisos"""
+        leave = Leave.objects.filter(status=Leave.StatusChoices.PENDING).first()
+
+        response = self.client.post(
+            reverse("leave:management-export"),
+            {"decision": "approved", "leaves": [leave.pk]},
+        )
+
+        self.assertEqual(response.status_code, 405)
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, Leave.StatusChoices.PENDING)
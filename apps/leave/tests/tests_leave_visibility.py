@@ -0,0 +1,95 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.models import Leave
+
+
+class LeaveVisibilityTest(TestCase):
+    """Tests para la visibilidad de permisos según el rol"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Recepción", code="REC")
+        self.receptionist = self._employee(
+            "recepcion", Employee.RoleChoices.RECEPTIONIST
+        )
+        self.housekeeper = self._employee("limpieza", Employee.RoleChoices.HOUSEKEEPER)
+        self.manager = self._employee(
+            "jefe_recepcion", Employee.RoleChoices.RECEPTION_MANAGER
+        )
+        self.rrhh = self._employee("rrhh", Employee.RoleChoices.RRHH)
+
+        self.team_leave = self._leave(self.receptionist)
+        self.other_leave = self._leave(self.housekeeper)
+        self.own_leave = self._leave(self.manager)
+
+    def _employee(self, username, role):
+        return Employee.objects.create(
+            user=User.objects.create_user(username=username),
+            department=self.department,
+            role=role,
+        )
+
+    def _leave(self, employee):
+        return Leave.objects.create(
+            employee=employee,
+            leave_type=Leave.LeaveTypeChoices.PERSONAL,
+            start_date=date(2026, 6, 1),
+            end_date=date(2026, 6, 1),
+            reason="Asuntos propios",
+        )
+
+    def test_managed_by(self):
+        """Los jefes gestionan los permisos de su equipo y RRHH todos"""
+        self.assertEqual(
+            list(Leave.objects.managed_by(self.manager)), [self.team_leave]
+        )
+        self.assertEqual(Leave.objects.managed_by(self.rrhh).count(), 3)
+        self.assertFalse(Leave.objects.managed_by(self.receptionist).exists())
+
+    def test_visible_to(self):
+        """Cada empleado ve sus permisos y los que gestiona"""
+        self.assertEqual(
+            set(Leave.objects.visible_to(self.manager)),
+            {self.team_leave, self.own_leave},
+        )
+        self.assertEqual(
+            list(Leave.objects.visible_to(self.receptionist)), [self.team_leave]
+        )
+
+    def test_visibility_is_one_query(self):
+        """El filtro de visibilidad se resuelve en una única consulta"""
+        with self.assertNumQueries(1):
+            list(Leave.objects.visible_to(self.manager))
+
+    def test_detail_outside_team_not_found(self):
+        """Un jefe no puede abrir permisos de fuera de su equipo"""
+        self.client.force_login(self.manager.user)
+
+        response = self.client.get(reverse("leave:detail", args=[self.other_leave.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            reverse("leave:approval", args=[self.other_leave.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse("leave:detail", args=[self.own_leave.pk]))
+        self.assertEqual(response.status_code, 200)
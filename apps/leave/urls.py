@@ -4,6 +4,7 @@ from .views import (
     LeaveCreateView,
     LeaveDetailView,
     LeaveManagementView,
+    LeaveManagementExportView,
     LeaveApprovalView,
     LeaveUpdateView
 )
@@ -15,6 +16,7 @@ urlpatterns = [
     path('', LeaveListView.as_view(), name='list'),
     path('create/', LeaveCreateView.as_view(), name='create'),
     path('management/', LeaveManagementView.as_view(), name='management'),
+    path('management/export/', LeaveManagementExportView.as_view(), name='management-export'),
     
     
     # Leave dinámicas
@@ -3,16 +3,24 @@ from datetime import datetime, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
+from apps.core.utils import stream_csv
 from apps.employees.models import Employee
 
+from .balances import apply_decision, get_balance
+from .coverage import team_coverage
+from .decisions import DECISIONS, decide_leaves
+from .exports import leave_csv_rows, leave_header
 from .forms import LeaveApprovalForm, LeaveRequestForm
-from .models import Leave
+from .models import Leave, LeaveBalance
+from .notifications import queue_decision_emails
 
 
 class LeaveListView(LoginRequiredMixin, ListView):
@@ -33,8 +41,13 @@ class LeaveListView(LoginRequiredMixin, ListView):
 
         employee = self.request.user.employee
 
+        # Saldo del año en curso (una lectura del libro de saldos)
+        balance = get_balance(employee, timezone.localdate().year)
+        context["balance"] = balance
+        context["available_days"] = balance.available
+        context["used_days"] = balance.consumed
+
         # Estadísticas personales
-        context["available_days"] = 22  # Ajustado según caso
         context["pending_count"] = Leave.objects.filter(
             employee=employee, status="pending"
         ).count()
@@ -42,11 +55,6 @@ class LeaveListView(LoginRequiredMixin, ListView):
             employee=employee, status="approved"
         ).count()
 
-        # Calcular días usados
-        approved_leaves = Leave.objects.filter(employee=employee, status="approved")
-        used_days = sum(leave.duration_days() for leave in approved_leaves)
-        context["used_days"] = used_days
-
         return context
 
 
@@ -79,18 +87,8 @@ class LeaveDetailView(LoginRequiredMixin, DetailView):
     context_object_name = "leave"
 
     def get_queryset(self):
-        employee = self.request.user.employee
-
-        # Supervisor: ve permisos de su equipo
-        if employee.is_supervisor():
-            team = employee.get_supervised_employees()
-            queryset = Leave.objects.filter(employee__in=team)
-
-        # Usuario normal: solo ve los suyos
-        else:
-            queryset = Leave.objects.filter(employee=employee)
-
-        return queryset
+        # Los suyos y, si es supervisor, los de su equipo
+        return Leave.objects.visible_to(self.request.user.employee)
 
 
 class LeaveManagementView(LoginRequiredMixin, ListView):
@@ -119,13 +117,8 @@ class LeaveManagementView(LoginRequiredMixin, ListView):
         leave_type = self.request.GET.get("leave_type", "")
         employee_search = self.request.GET.get("employee", "")
 
-        # Dirección y RRHH ven todos los permisos
-        if profile.role in ["director", "rrhh"]:
-            queryset = Leave.objects.all()
-        else:
-            # Jefes solo ven los de su equipo
-            supervised_employees = profile.get_supervised_employees()
-            queryset = Leave.objects.filter(employee__in=supervised_employees)
+        # Dirección y RRHH ven todos los permisos, los jefes los de su equipo
+        queryset = Leave.objects.managed_by(profile)
 
         # Aplicar filtros
         if status:
@@ -150,11 +143,7 @@ class LeaveManagementView(LoginRequiredMixin, ListView):
         profile = self.request.user.employee
 
         # Base queryset según rol
-        if profile.role in ["director", "rrhh"]:
-            base_queryset = Leave.objects.all()
-        else:
-            supervised = profile.get_supervised_employees()
-            base_queryset = Leave.objects.filter(employee__in=supervised)
+        base_queryset = Leave.objects.managed_by(profile)
 
         # Estadísticas
         context["pending_count"] = base_queryset.filter(status="pending").count()
@@ -168,8 +157,75 @@ class LeaveManagementView(LoginRequiredMixin, ListView):
             created_at__gte=first_day_month
         ).count()
 
+        # Saldos del equipo con menos días disponibles
+        balances = LeaveBalance.objects.filter(year=today.year)
+        if not profile.can_see_all():
+            balances = balances.filter(
+                employee__in=Employee.objects.supervised_by(profile)
+            )
+        context["team_balances"] = balances.select_related(
+            "employee", "employee__user"
+        ).order_by("available")[:10]
+
         return context
 
+    def post(self, request, *args, **kwargs):
+        """Aprobar o rechazar en bloque las solicitudes seleccionadas"""
+        # Volver al listado con los mismos filtros
+        next_url = f"{reverse('leave:management')}?{request.GET.urlencode()}"
+
+        status = request.POST.get("decision")
+        rejection_reason = request.POST.get("rejection_reason", "").strip()
+        if status not in DECISIONS:
+            messages.error(request, "Selecciona aprobar o rechazar.")
+            return redirect(next_url)
+        if status == "rejected" and not rejection_reason:
+            messages.error(request, "Indica el motivo del rechazo.")
+            return redirect(next_url)
+
+        # El queryset ya está limitado al equipo del usuario y a los filtros
+        leaves = self.get_queryset()
+        if request.POST.get("all_matching") != "1":
+            selected = [pk for pk in request.POST.getlist("leaves") if pk.isdigit()]
+            if not selected:
+                messages.warning(request, "No has seleccionado ninguna solicitud.")
+                return redirect(next_url)
+            leaves = leaves.filter(pk__in=selected)
+
+        decided, refused = decide_leaves(
+            leaves, status, request.user, rejection_reason=rejection_reason
+        )
+
+        # Mensajes
+        if decided:
+            verb = "aprobadas" if status == "approved" else "rechazadas"
+            messages.success(request, f"{len(decided)} solicitudes {verb}.")
+        elif not refused:
+            messages.warning(request, "Ninguna de las solicitudes estaba pendiente.")
+        if refused:
+            messages.warning(
+                request,
+                f"{len(refused)} solicitudes siguen pendientes por falta de saldo.",
+            )
+
+        return redirect(next_url)
+
+
+class LeaveManagementExportView(LeaveManagementView):
+    """Permisos gestionables con los mismos filtros, descargados como CSV"""
+
+    # Solo descarga: no hereda la aprobación masiva del listado
+    http_method_names = ["get"]
+
+    def get(self, request, *args, **kwargs):
+        today = timezone.localdate()
+        return stream_csv(
+            leave_csv_rows(self.get_queryset()),
+            filename=f"permisos_{today:%Y%m%d}.csv",
+            header=leave_header(),
+            compress=request.GET.get("gzip") == "1",
+        )
+
 
 class LeaveApprovalView(LoginRequiredMixin, UpdateView):
     """Vista para aprobar o rechazar un permiso"""
@@ -188,18 +244,10 @@ class LeaveApprovalView(LoginRequiredMixin, UpdateView):
             messages.error(request, "No tienes permiso para aprobar permisos.")
             return redirect("dashboard:home")
 
-        # Obtener el permiso
+        # Obtener el permiso: el queryset ya está limitado a su equipo, así
+        # que los permisos de otros empleados no se encuentran
         leave = self.get_object()
 
-        # Verificar que puede gestionar este permiso
-        profile = request.user.employee
-        if profile.role not in ["director", "rrhh"]:
-            # Los jefes solo pueden aprobar permisos de su equipo
-            supervised = profile.get_supervised_employees()
-            if leave.employee not in supervised:
-                messages.error(request, "No puedes aprobar este permiso.")
-                return redirect("leave:management")
-
         # Verificar que el permiso está pendiente
         if leave.status != "pending":
             messages.warning(request, "Este permiso ya ha sido procesado.")
@@ -208,32 +256,53 @@ class LeaveApprovalView(LoginRequiredMixin, UpdateView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        profile = self.request.user.employee
-
-        if profile.role in ["director", "rrhh"]:
-            return Leave.objects.all()
-
         # Jefes solo ven los de su equipo
-        supervised = profile.get_supervised_employees()
-        return Leave.objects.filter(employee__in=supervised)
+        return Leave.objects.managed_by(self.request.user.employee)
+
+    def get_object(self, queryset=None):
+        # dispatch, get/post y el contexto comparten la misma consulta
+        if not hasattr(self, "_leave"):
+            self._leave = super().get_object(
+                queryset
+                or self.get_queryset().select_related(
+                    "employee__user", "employee__department"
+                )
+            )
+        return self._leave
 
     def form_valid(self, form):
+        previous_status = form.initial.get("status")
         leave = form.save(commit=False, user=self.request.user)
 
-        # Guardar
-        leave.save()
+        # Mover el saldo y guardar en la misma transacción
+        try:
+            with transaction.atomic():
+                apply_decision(leave, previous_status, user=self.request.user)
+                leave.save()
+        except ValidationError as e:
+            form.add_error("status", e)
+            return self.form_invalid(form)
+        self.object = leave
+        queue_decision_emails([leave])
 
         # Mensajes
         if leave.status == "approved":
             messages.success(
                 self.request, f"Permiso aprobado para {leave.employee.get_full_name()}"
             )
+            if any(day["below"] for day in self._coverage(leave)):
+                messages.warning(
+                    self.request,
+                    f"El departamento queda por debajo del personal mínimo "
+                    f"en algunos días del permiso de "
+                    f"{leave.employee.get_full_name()}.",
+                )
         elif leave.status == "rejected":
             messages.warning(
                 self.request, f"Permiso rechazado para {leave.employee.get_full_name()}"
             )
 
-        return super().form_valid(form)
+        return redirect(self.get_success_url())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -247,8 +316,18 @@ class LeaveApprovalView(LoginRequiredMixin, UpdateView):
             .order_by("-created_at")[:5]
         )
 
+        # Cobertura del equipo si se aprueba el permiso
+        context["coverage"] = self._coverage(leave)
+        context["coverage_below"] = any(day["below"] for day in context["coverage"])
+
         return context
 
+    def _coverage(self, leave):
+        department = leave.employee.department
+        if department is None:
+            return []
+        return team_coverage(department, leave.start_date, leave.end_date, leave=leave)
+
 
 class LeaveUpdateView(LoginRequiredMixin, UpdateView):
     """Editar un permiso (solo si está pendiente)"""
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class RoomsConfig(AppConfig):
     name = 'apps.rooms'
+
+    def ready(self):
+        # Import signals when Django starts
+        import apps.rooms.signals
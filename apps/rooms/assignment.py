@@ -0,0 +1,175 @@
+# apps/rooms/assignment.py
+"""
+Automatic assignment of the pending cleaning tasks to the housekeepers on
+duty (clocked in, available and not on approved leave).
+
+Tasks are laid out floor by floor, highest priority first within a floor,
+and the sequence is cut into one contiguous stretch per housekeeper whose
+expected minutes are as close as possible to an even share. Contiguous
+stretches keep floor changes to the minimum: a housekeeper only moves to
+the next floor up. Everything is computed in memory in linear time and
+written with a single UPDATE.
+"""
+
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, Q, When
+from django.utils import timezone
+
+from apps.attendance import presence
+from apps.employees.models import Employee
+from apps.leave.models import LeaveDay
+
+from . import routes
+from .models import CleaningTask
+
+# Expected minutes of each cleaning type
+EXPECTED_MINUTES = {
+    CleaningTask.TypeChoices.CHECKOUT: 30,
+    CleaningTask.TypeChoices.STAY_OVER: 15,
+    CleaningTask.TypeChoices.DEEP_CLEANING: 60,
+}
+DEFAULT_MINUTES = 30
+
+CLEANING_DEPARTMENT = "LIM"
+
+
+@dataclass
+class TaskLoad:
+    pk: int
+    floor: int
+    priority: int
+    room_number: str
+    minutes: int
+    assigned_to_id: int = None
+
+
+def cleaning_staff():
+    """Housekeepers (by role or department) that accept assignments"""
+    return Employee.objects.filter(
+        Q(role=Employee.RoleChoices.HOUSEKEEPER)
+        | Q(department__code=CLEANING_DEPARTMENT),
+        is_available=True,
+        user__is_active=True,
+    )
+
+
+def staff_on_duty(day=None):
+    """Ids of the cleaning staff clocked in and without approved leave on the day"""
+    day = day or timezone.localdate()
+    on_leave = LeaveDay.objects.filter(date=day, is_approved=True).values("employee_id")
+    staff = cleaning_staff().exclude(pk__in=on_leave).values_list("pk", flat=True)
+    return sorted(presence.present_in(staff))
+
+
+def pending_loads(day=None):
+    """Pending tasks created up to the day, with the fields the planner needs"""
+    day = day or timezone.localdate()
+    rows = (
+        CleaningTask.objects.filter(
+            status=CleaningTask.StatusChoices.PENDING,
+            created_at__date__lte=day,
+            room__is_active=True,
+        )
+        .values_list(
+            "pk",
+            "room__floor",
+            "priority",
+            "room__number",
+            "cleaning_type",
+            "assigned_to_id",
+        )
+        .order_by()
+    )
+    return [
+        TaskLoad(
+            pk=pk,
+            floor=floor,
+            priority=priority,
+            room_number=number,
+            minutes=EXPECTED_MINUTES.get(cleaning_type, DEFAULT_MINUTES),
+            assigned_to_id=assigned_to_id,
+        )
+        for pk, floor, priority, number, cleaning_type, assigned_to_id in rows
+    ]
+
+
+def plan(tasks, staff_ids):
+    """
+    {task pk: employee id} for the tasks without an assignee among
+    staff_ids. Tasks already assigned to someone on duty stay with them and
+    count as that person's starting load.
+    """
+    staff_ids = list(staff_ids)
+    if not staff_ids:
+        return {}
+    on_duty = set(staff_ids)
+
+    load = dict.fromkeys(staff_ids, 0)
+    floors = {}
+    free = []
+    for task in tasks:
+        if task.assigned_to_id in on_duty:
+            load[task.assigned_to_id] += task.minutes
+            floors.setdefault(task.assigned_to_id, []).append(task.floor)
+        else:
+            free.append(task)
+    if not free:
+        return {}
+
+    # Staff already working on a floor get the stretch that starts near it
+    def start_floor(pk):
+        kept = sorted(floors.get(pk, []))
+        return (kept[len(kept) // 2] if kept else float("inf"), pk)
+
+    staff_ids.sort(key=start_floor)
+    free.sort(key=lambda task: (task.floor, task.priority, task.room_number))
+
+    remaining = sum(task.minutes for task in free)
+    assignments = {}
+    index = 0
+    for position, pk in enumerate(staff_ids):
+        rest = staff_ids[position:]
+        # Even share of what is left, tasks already assigned included
+        target = (remaining + sum(load[other] for other in rest)) / len(rest)
+        target -= load[pk]
+        last = len(rest) == 1
+        taken = 0
+        while index < len(free):
+            minutes = free[index].minutes
+            # Take the task while that leaves the stretch closer to the target
+            if not last and taken + minutes / 2 > target:
+                break
+            assignments[free[index].pk] = pk
+            taken += minutes
+            index += 1
+        remaining -= taken
+    return assignments
+
+
+@transaction.atomic
+def auto_assign(day=None, reassign=False):
+    """
+    Assigns the pending tasks of the day to the staff on duty. With
+    reassign=True the existing assignments of pending tasks are redone too.
+    Returns {task pk: employee id} of the tasks written.
+    """
+    tasks = pending_loads(day)
+    previous = {task.pk: task.assigned_to_id for task in tasks}
+    if reassign:
+        for task in tasks:
+            task.assigned_to_id = None
+    assignments = plan(tasks, staff_on_duty(day))
+    if assignments:
+        CleaningTask.objects.filter(
+            pk__in=assignments, status=CleaningTask.StatusChoices.PENDING
+        ).update(
+            assigned_to=Case(
+                *[When(pk=pk, then=employee) for pk, employee in assignments.items()]
+            ),
+            updated_at=timezone.now(),
+        )
+        # update() skips post_save: rebuild the routes of everyone involved
+        routes.changed(*assignments.values(), *(previous[pk] for pk in assignments))
+    return assignments
@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 
 from apps.employees.models import Employee
+from apps.rooms import states
+from apps.rooms.assignment import cleaning_staff
 from apps.rooms.models import CleaningTask, MaintenanceTask, Room, RoomType
 
 
@@ -85,6 +87,17 @@ class RoomForm(forms.ModelForm):
             "is_active": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        # Los cambios de estado de una habitación existente siguen el flujo
+        if self.instance.pk:
+            for field in states.TRANSITIONS:
+                current = self.instance.loaded_value(field)
+                value = cleaned_data.get(field)
+                if value and not states.can_change(field, current, value):
+                    self.add_error(field, "Cambio de estado no permitido.")
+        return cleaned_data
+
 
 class CleaningTaskForm(forms.ModelForm):
     class Meta:
@@ -116,24 +129,9 @@ class CleaningTaskForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         self.fields["assigned_to"].required = False
-        # Filtrar solo usuarios del departamento de limpieza
-        from apps.employees.models import Department
-
-        try:
-            limpieza_dept = Department.objects.get(code="LIM")
-            cleaning_staff = Employee.objects.filter(
-                department=limpieza_dept, is_available=True
-            ).select_related("user")
-
-            # Asignación directa del queryset de Employee
-            self.fields["assigned_to"].queryset = cleaning_staff
-
-            # Personalización de cómo se muestra para cada empleado
-            self.fields["assigned_to"].label_from_instance = (
-                lambda obj: obj.get_full_name() or obj.username
-            )
-        except Department.DoesNotExist:
-            pass
+        # Solo personal de limpieza disponible
+        self.fields["assigned_to"].queryset = cleaning_staff().select_related("user")
+        self.fields["assigned_to"].label_from_instance = Employee.get_full_name
 
         # Filtrar solo habitaciones sucias o que necesiten limpieza
         self.fields["room"].queryset = Room.objects.filter(is_active=True).exclude(
@@ -161,28 +159,27 @@ class CleaningTaskUpdateForm(forms.ModelForm):
             ),
         }
 
+    def clean_status(self):
+        status = self.cleaned_data["status"]
+        room = self.instance.room
+        if status == CleaningTask.StatusChoices.COMPLETED and not states.can_change(
+            "status", room.status, Room.StatusChoices.CLEAN
+        ):
+            raise forms.ValidationError(
+                "La habitación no se puede marcar como limpia en su estado actual."
+            )
+        return status
+
     def save(self, commit=True):
         instance = super().save(commit=False)
 
-        # Si se marca como completada, registrar la hora
+        # Las horas de inicio y fin las registra la tarea al cambiar de estado
         if (
             instance.status == CleaningTask.StatusChoices.COMPLETED
-            and not instance.completed_at
+            and instance.has_changed("status")
         ):
-            instance.completed_at = timezone.now()
-            if not instance.started_at:
-                instance.started_at = timezone.now()
             # Actualizar el estado de la habitación
-            instance.room.status = Room.StatusChoices.CLEAN
-            instance.room.last_cleaned = timezone.now()
-            instance.room.save()
-
-        # Si se marca como en progreso, registrar hora de inicio
-        elif (
-            instance.status == CleaningTask.StatusChoices.IN_PROGRESS
-            and not instance.started_at
-        ):
-            instance.started_at = timezone.now()
+            instance.clean_room()
 
         if commit:
             instance.save()
@@ -222,8 +219,11 @@ class MaintenanceRequestForm(forms.ModelForm):
             instance.save()
             # Actualizar estado de la habitación
             if instance.room:
-                instance.room.status = Room.StatusChoices.MAINTENANCE
-                instance.room.save()
+                states.change(
+                    instance.room,
+                    getattr(user, "employee", None),
+                    status=Room.StatusChoices.MAINTENANCE,
+                )
         return instance
 
 
@@ -301,10 +301,9 @@ class MaintenanceRequestUpdateForm(forms.ModelForm):
             and not instance.resolved_at
         ):
             instance.resolved_at = timezone.now()
-            # Actualizar estado de la habitación
-            if instance.room:
-                instance.room.status = Room.StatusChoices.INSPECTED
-                instance.room.save()
+            # La habitación reparada queda lista para revisar
+            if instance.room.status == Room.StatusChoices.MAINTENANCE:
+                states.change(instance.room, status=Room.StatusChoices.INSPECTED)
 
         if commit:
             instance.save()
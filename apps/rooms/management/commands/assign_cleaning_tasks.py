@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.rooms.assignment import auto_assign
+
+
+class Command(BaseCommand):
+    help = "Distribute pending cleaning tasks among the housekeepers on duty"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reassign",
+            action="store_true",
+            help="Rehace también las asignaciones de tareas pendientes",
+        )
+
+    def handle(self, *args, **options):
+        assignments = auto_assign(reassign=options["reassign"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(assignments)} tareas asignadas entre "
+                f"{len(set(assignments.values()))} personas"
+            )
+        )
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.rooms import states
+from apps.rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = "Change the status and/or occupancy of many rooms at once"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--floor", type=int, help="Habitaciones de esta planta")
+        parser.add_argument(
+            "--rooms", nargs="+", metavar="NUMBER", help="Números de habitación"
+        )
+        parser.add_argument(
+            "--status", choices=Room.StatusChoices.values, help="Nuevo estado"
+        )
+        parser.add_argument(
+            "--occupancy", choices=Room.OccupancyChoices.values, help="Nueva ocupación"
+        )
+
+    def handle(self, *args, **options):
+        values = {
+            field: options[field]
+            for field in states.TRANSITIONS
+            if options[field] is not None
+        }
+        if not values:
+            raise CommandError("Indica --status y/o --occupancy")
+        if options["floor"] is None and not options["rooms"]:
+            raise CommandError("Indica --floor y/o --rooms")
+
+        rooms = Room.objects.filter(is_active=True)
+        if options["floor"] is not None:
+            rooms = rooms.filter(floor=options["floor"])
+        if options["rooms"]:
+            rooms = rooms.filter(number__in=options["rooms"])
+
+        events, rejected = states.change_many(rooms, **values)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len({event.room_id for event in events})} habitaciones cambiadas"
+            )
+        )
+        if rejected:
+            numbers = Room.objects.filter(pk__in=rejected).values_list(
+                "number", flat=True
+            )
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Sin cambiar (transición no permitida): {', '.join(numbers)}"
+                )
+            )
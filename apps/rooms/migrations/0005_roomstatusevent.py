@@ -0,0 +1,103 @@
+# Generated by Django 6.0 on 2026-10-19 00:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def record_current_status(apps, schema_editor):
+    # The history of the existing rooms starts with their current values
+    Room = apps.get_model("rooms", "Room")
+    RoomStatusEvent = apps.get_model("rooms", "RoomStatusEvent")
+    now = django.utils.timezone.now()
+    RoomStatusEvent.objects.bulk_create(
+        [
+            RoomStatusEvent(room_id=pk, field=field, to_value=value, changed_at=now)
+            for pk, status, occupancy in Room.objects.values_list(
+                "pk", "status", "occupancy"
+            )
+            for field, value in (("status", status), ("occupancy", occupancy))
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0009_employee_search_document"),
+        ("rooms", "0004_alter_cleaningtask_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomStatusEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("status", "Cleaning status"),
+                            ("occupancy", "Occupancy status"),
+                        ],
+                        max_length=20,
+                        verbose_name="Field",
+                    ),
+                ),
+                (
+                    "from_value",
+                    models.CharField(blank=True, max_length=20, verbose_name="From"),
+                ),
+                ("to_value", models.CharField(max_length=20, verbose_name="To")),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Changed at"
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="room_status_events",
+                        to="employees.employee",
+                        verbose_name="Employee",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_events",
+                        to="rooms.room",
+                        verbose_name="Room",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Room status event",
+                "verbose_name_plural": "Room status events",
+                "ordering": ["changed_at", "pk"],
+                "indexes": [
+                    models.Index(
+                        fields=["changed_at"], name="rooms_rooms_changed_1fb748_idx"
+                    ),
+                    models.Index(
+                        fields=["room", "changed_at"],
+                        name="rooms_rooms_room_id_24467c_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(record_current_status, migrations.RunPython.noop),
+    ]
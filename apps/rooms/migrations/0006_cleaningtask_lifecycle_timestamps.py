@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-19 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def clear_open_completions(apps, schema_editor):
+    # completed_at was auto_now: on tasks not done it is just the last edit
+    CleaningTask = apps.get_model("rooms", "CleaningTask")
+    CleaningTask.objects.exclude(status__in=["completed", "verified"]).update(
+        completed_at=None
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0009_employee_search_document"),
+        ("rooms", "0005_roomstatusevent"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cleaningtask",
+            name="started_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Started at"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cleaningtask",
+            name="completed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Completed at"
+            ),
+        ),
+        migrations.RunPython(clear_open_completions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="cleaningtask",
+            index=models.Index(
+                fields=["assigned_to", "status", "completed_at"],
+                name="rooms_clean_assigne_5d94cf_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cleaningtask",
+            index=models.Index(
+                fields=["status", "completed_at"], name="rooms_clean_status_e5ea33_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 01:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0009_employee_search_document"),
+        ("rooms", "0006_cleaningtask_lifecycle_timestamps"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cleaningtask",
+            index=models.Index(
+                fields=["assigned_to", "updated_at"],
+                name="rooms_clean_assigne_f02f0c_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="maintenancetask",
+            index=models.Index(
+                fields=["assigned_to", "updated_at"],
+                name="rooms_maint_assigne_19fde9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                fields=["updated_at"], name="rooms_room_updated_092a4f_idx"
+            ),
+        ),
+    ]
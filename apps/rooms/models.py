@@ -8,6 +8,7 @@ from django.db.models import F, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.mixins import TrackedFieldsMixin
 from apps.employees.models import Employee
 
 
@@ -366,10 +367,10 @@ class Reservation(models.Model):
         self.actual_check_in = timezone.now()
         self.checked_in_by = employee
 
-        # Update room status
-        self.room.status = Room.StatusChoices.OCCUPIED
-        self.room.occupancy = Room.OccupancyChoices.OCCUPIED
-        self.room.save()
+        # Update room occupancy; its cleaning status does not change
+        from apps.rooms import states
+
+        states.change(self.room, employee, occupancy=Room.OccupancyChoices.OCCUPIED)
 
         self.save()
 
@@ -383,9 +384,14 @@ class Reservation(models.Model):
         self.checked_out_by = employee
 
         # Update room status
-        self.room.status = Room.StatusChoices.DIRTY
-        self.room.occupancy = Room.OccupancyChoices.VACANT
-        self.room.save()
+        from apps.rooms import states
+
+        states.change(
+            self.room,
+            employee,
+            status=Room.StatusChoices.DIRTY,
+            occupancy=Room.OccupancyChoices.VACANT,
+        )
 
         # Create cleaning task automatically
         from apps.rooms.models import CleaningTask
@@ -394,7 +400,7 @@ class Reservation(models.Model):
             room=self.room,
             cleaning_type=CleaningTask.TypeChoices.CHECKOUT,
             priority=1,
-            notes=__("Cleaning after checkout -Reservation %(number)s")
+            notes=_("Cleaning after checkout -Reservation %(number)s")
             % {"number": self.reservation_number},
         )
         self.save()
@@ -409,8 +415,9 @@ class Reservation(models.Model):
 
         # Release the room
         if self.room.occupancy == Room.OccupancyChoices.RESERVED:
-            self.room.occupancy = Room.OccupancyChoices.VACANT
-            self.room.save()
+            from apps.rooms import states
+
+            states.change(self.room, occupancy=Room.OccupancyChoices.VACANT)
 
         self.save()
 
@@ -431,7 +438,7 @@ class Reservation(models.Model):
         return colors.get(self.status, "secondary")
 
 
-class Room(models.Model):
+class Room(TrackedFieldsMixin, models.Model):
     class StatusChoices(models.TextChoices):
         CLEAN = "clean", _("Clean")
         DIRTY = "dirty", _("Dirty")
@@ -468,10 +475,17 @@ class Room(models.Model):
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Last updated"), auto_now=True)
 
+    # Fields whose transitions are recorded in RoomStatusEvent
+    TRACKED_FIELDS = ("status", "occupancy")
+
+    # Employee behind the next save, recorded in its status events
+    status_changed_by = None
+
     class Meta:
         verbose_name = _("Room")
         verbose_name_plural = _("Rooms")
         ordering = ["floor", "number"]
+        indexes = [models.Index(fields=["updated_at"])]
 
     def __str__(self):
         return _("Room %(number)s - Floor %(floor)s") % {
@@ -514,7 +528,7 @@ class Room(models.Model):
         )
 
 
-class CleaningTask(models.Model):
+class CleaningTask(TrackedFieldsMixin, models.Model):
     """Cleaning tasks assigned to rooms"""
 
     class StatusChoices(models.TextChoices):
@@ -572,16 +586,69 @@ class CleaningTask(models.Model):
     )
     created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Last updated"), auto_now=True)
-    completed_at = models.DateTimeField(_("Completed at"), auto_now=True)
+    started_at = models.DateTimeField(_("Started at"), null=True, blank=True)
+    completed_at = models.DateTimeField(_("Completed at"), null=True, blank=True)
+
+    # Fields whose changes move the task in the housekeepers' routes
+    TRACKED_FIELDS = ("assigned_to_id", "status", "priority", "room_id")
+
+    # Statuses of the tasks already done, verified or not
+    DONE_STATUSES = (StatusChoices.COMPLETED, StatusChoices.VERIFIED)
 
     class Meta:
         verbose_name = _("Cleaning Task")
         verbose_name_plural = _("Cleaning Tasks")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["assigned_to", "status", "completed_at"]),
+            models.Index(fields=["status", "completed_at"]),
+            models.Index(fields=["assigned_to", "updated_at"]),
+        ]
 
     def __str__(self):
         return f"{self.room} - {self.get_status_display()}"
 
+    def save(self, *args, **kwargs):
+        stamped = self._stamp_transition()
+        update_fields = kwargs.get("update_fields")
+        if stamped and update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *stamped}
+        super().save(*args, **kwargs)
+
+    def clean_room(self):
+        """Marks the room clean after the task is completed"""
+        from apps.rooms import states
+
+        states.change(self.room, self.assigned_to, status=Room.StatusChoices.CLEAN)
+
+    def _stamp_transition(self):
+        """
+        Sets the lifecycle timestamps when the status changes: started_at
+        when work starts, completed_at when done, verified_at when
+        verified. Reopening a task clears the ones of the steps ahead.
+        Returns the names of the fields changed.
+        """
+        if not (self._state.adding or self.has_changed("status")):
+            return []
+        now = timezone.now()
+        status = self.status
+        values = {}
+        if status == self.StatusChoices.IN_PROGRESS and not self.started_at:
+            values["started_at"] = now
+        if status in self.DONE_STATUSES and not self.completed_at:
+            values["completed_at"] = now
+        if status == self.StatusChoices.VERIFIED and not self.verified_at:
+            values["verified_at"] = now
+        if status == self.StatusChoices.PENDING and self.started_at:
+            values["started_at"] = None
+        if status not in self.DONE_STATUSES and self.completed_at:
+            values["completed_at"] = None
+        if status != self.StatusChoices.VERIFIED and self.verified_at:
+            values["verified_at"] = None
+        for name, value in values.items():
+            setattr(self, name, value)
+        return list(values)
+
 
 class MaintenanceTask(models.Model):
     """Maintenance requests for rooms"""
@@ -647,6 +714,7 @@ class MaintenanceTask(models.Model):
         ordering = ["-created_at"]
         verbose_name = _("Maintenance Request")
         verbose_name_plural = _("Maintenance Requests")
+        indexes = [models.Index(fields=["assigned_to", "updated_at"])]
 
     def __str__(self):
         return f"{self.room} - {self.title} [{self.get_priority_display()}]"
@@ -660,3 +728,47 @@ class MaintenanceTask(models.Model):
             self.PriorityChoices.URGENT: "dark",
         }
         return colors.get(self.priority, "secondary")
+
+
+class RoomStatusEvent(models.Model):
+    """Append-only history of the status and occupancy changes of the rooms"""
+
+    class FieldChoices(models.TextChoices):
+        STATUS = "status", _("Cleaning status")
+        OCCUPANCY = "occupancy", _("Occupancy status")
+
+    room = models.ForeignKey(
+        Room,
+        on_delete=models.CASCADE,
+        related_name="status_events",
+        verbose_name=_("Room"),
+    )
+    field = models.CharField(_("Field"), max_length=20, choices=FieldChoices.choices)
+    from_value = models.CharField(_("From"), max_length=20, blank=True)
+    to_value = models.CharField(_("To"), max_length=20)
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="room_status_events",
+        verbose_name=_("Employee"),
+    )
+    changed_at = models.DateTimeField(_("Changed at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Room status event")
+        verbose_name_plural = _("Room status events")
+        ordering = ["changed_at", "pk"]
+        indexes = [
+            models.Index(fields=["changed_at"]),
+            models.Index(fields=["room", "changed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.room} - {self.field}: {self.from_value} -> {self.to_value}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Room status events are append-only")
+        super().save(*args, **kwargs)
@@ -0,0 +1,138 @@
+# apps/rooms/productivity.py
+"""
+Productivity of the cleaning staff, from the lifecycle timestamps of the
+cleaning tasks.
+
+Days are filtered as ranges of completed_at, never as completed_at__date,
+so the database can walk the (assigned_to, status, completed_at) and
+(status, completed_at) indexes instead of converting every row.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.employees.models import Employee
+
+from .models import CleaningTask
+
+MAX_DAYS = 366
+
+
+def day_range(start_date, end_date=None):
+    """Aware [start, end) datetimes covering the days, in the current timezone"""
+    end_date = end_date or start_date
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start_date, time.min), tz),
+        timezone.make_aware(
+            datetime.combine(end_date + timedelta(days=1), time.min), tz
+        ),
+    )
+
+
+def completed_between(start_date, end_date=None, queryset=None):
+    """Done tasks (completed or verified) completed on the days"""
+    start, end = day_range(start_date, end_date)
+    queryset = CleaningTask.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        status__in=CleaningTask.DONE_STATUSES,
+        completed_at__gte=start,
+        completed_at__lt=end,
+    )
+
+
+def completed_count(start_date=None, end_date=None, prefix=""):
+    """
+    Count of the done tasks completed on the days (ever without
+    start_date), to annotate related rows (e.g. prefix="cleaning_tasks__"
+    on employees)
+    """
+    lookups = {f"{prefix}status__in": CleaningTask.DONE_STATUSES}
+    if start_date:
+        start, end = day_range(start_date, end_date)
+        lookups[f"{prefix}completed_at__gte"] = start
+        lookups[f"{prefix}completed_at__lt"] = end
+    return Count(f"{prefix}pk", filter=Q(**lookups))
+
+
+def productivity(start_date, end_date, employees=None):
+    """
+    Daily productivity of each housekeeper in the date range, with one
+    grouped query. `employees` may be None (everyone with done tasks), an
+    Employee queryset or a list of ids.
+
+    Returns {employee id: [{"date", "tasks", "minutes"}, ...]} with one
+    entry per day, empty days included. minutes is the time between
+    started_at and completed_at, for the tasks that were started.
+    """
+    if end_date < start_date:
+        raise ValueError("end_date is before start_date")
+    if (end_date - start_date).days >= MAX_DAYS:
+        raise ValueError(f"At most {MAX_DAYS} days")
+
+    tasks = completed_between(start_date, end_date).filter(assigned_to__isnull=False)
+    if employees is not None:
+        if hasattr(employees, "values"):
+            employees = employees.values("pk")
+        tasks = tasks.filter(assigned_to__in=employees)
+
+    worked = ExpressionWrapper(
+        F("completed_at") - F("started_at"), output_field=DurationField()
+    )
+    rows = (
+        tasks.annotate(day=TruncDate("completed_at"))
+        .values("assigned_to_id", "day")
+        .annotate(
+            tasks=Count("pk"),
+            worked=Sum(worked, filter=Q(started_at__isnull=False)),
+        )
+        .order_by()
+    )
+
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    series = {}
+    for row in rows:
+        series.setdefault(
+            row["assigned_to_id"],
+            {day: {"date": day, "tasks": 0, "minutes": 0} for day in days},
+        )[row["day"]].update(
+            tasks=row["tasks"],
+            minutes=round((row["worked"] or timedelta()).total_seconds() / 60),
+        )
+    return {pk: list(by_day.values()) for pk, by_day in sorted(series.items())}
+
+
+def productivity_payload(start_date, end_date, employees=None):
+    """productivity() as JSON-ready data, with the names of the housekeepers"""
+    series = productivity(start_date, end_date, employees)
+    names = {
+        employee.pk: employee.get_full_name()
+        for employee in Employee.objects.filter(pk__in=series).select_related("user")
+    }
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "employees": [
+            {
+                "id": pk,
+                "name": names.get(pk, ""),
+                "tasks": sum(day["tasks"] for day in days),
+                "minutes": sum(day["minutes"] for day in days),
+                "days": [
+                    {
+                        "date": day["date"].isoformat(),
+                        "tasks": day["tasks"],
+                        "minutes": day["minutes"],
+                    }
+                    for day in days
+                ],
+            }
+            for pk, days in series.items()
+        ],
+    }
@@ -0,0 +1,97 @@
+# apps/rooms/routes.py
+"""
+Cleaning route of each housekeeper: the order in which to do their open
+tasks (pending or in progress).
+
+Tasks are grouped by priority band, and within a band walked floor by
+floor going up. Each floor is walked in the opposite direction of the one
+below (odd floors by ascending room number, even floors descending), so
+the end of a floor sits over the start of the next one. The direction
+only depends on the floor number, which makes every task's position key
+fixed, so a route is sorted once when it is built.
+
+Routes are cached per housekeeper and built with one query on a miss.
+Adding, completing or reassigning a task drops the routes involved once
+the transaction commits instead of patching them, so concurrent workers
+never overwrite each other and rolled back changes never show up.
+"""
+
+import re
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import CleaningTask
+
+CACHE_PREFIX = "rooms:route:"
+CACHE_TIMEOUT = 60 * 60 * 12
+
+# Priority 1 (high) to 5 (low), grouped in bands that are done in order
+PRIORITY_BANDS = ((1, 1), (2, 3), (4, 5))
+
+OPEN_STATUSES = (
+    CleaningTask.StatusChoices.PENDING,
+    CleaningTask.StatusChoices.IN_PROGRESS,
+)
+
+_DIGITS = re.compile(r"\d+")
+
+
+def priority_band(priority):
+    for band, (low, high) in enumerate(PRIORITY_BANDS):
+        if low <= priority <= high:
+            return band
+    return len(PRIORITY_BANDS)
+
+
+def room_position(number):
+    """Position of a room along its corridor, from its number (101, 12B...)"""
+    digits = _DIGITS.findall(number)
+    return int(digits[-1]) if digits else 0
+
+
+def route_key(priority, floor, number):
+    position = room_position(number)
+    if floor % 2 == 0:
+        position = -position
+    return (priority_band(priority), floor, position, number)
+
+
+def _cache_key(employee_id):
+    return f"{CACHE_PREFIX}{employee_id}"
+
+
+def _load(employee_id):
+    rows = CleaningTask.objects.filter(
+        assigned_to_id=employee_id, status__in=OPEN_STATUSES
+    ).values_list("pk", "priority", "room__floor", "room__number")
+    route = sorted(
+        (route_key(priority, floor, number), pk) for pk, priority, floor, number in rows
+    )
+    cache.set(_cache_key(employee_id), route, CACHE_TIMEOUT)
+    return route
+
+
+def route_for(employee_id):
+    """Task ids of a housekeeper's open tasks, in route order"""
+    route = cache.get(_cache_key(employee_id))
+    if route is None:
+        route = _load(employee_id)
+    return [pk for _, pk in route]
+
+
+def order_tasks(tasks, employee_id):
+    """Sorts loaded tasks of a housekeeper by their route"""
+    position = {pk: index for index, pk in enumerate(route_for(employee_id))}
+    return sorted(tasks, key=lambda task: position.get(task.pk, len(position)))
+
+
+def invalidate(*employee_ids):
+    cache.delete_many([_cache_key(pk) for pk in employee_ids if pk])
+
+
+def changed(*employee_ids):
+    """Drops the routes of the employees once the current transaction commits"""
+    employee_ids = {pk for pk in employee_ids if pk}
+    if employee_ids:
+        transaction.on_commit(lambda: invalidate(*employee_ids))
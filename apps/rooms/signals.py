@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core import images
+
+from . import routes, status_events
+from .models import CleaningTask, MaintenanceTask, Room
+
+images.track(CleaningTask, "photos")
+images.track(MaintenanceTask, "photos")
+
+
+@receiver(post_save, sender=CleaningTask)
+def update_cleaning_routes(sender, instance, created, **kwargs):
+    # Drop the cached routes of the previous and the current assignee
+    if created or any(instance.has_changed(name) for name in instance.TRACKED_FIELDS):
+        previous = None if created else instance.loaded_value("assigned_to_id")
+        routes.changed(previous, instance.assigned_to_id)
+    instance.remember_tracked()
+
+
+@receiver(post_delete, sender=CleaningTask)
+def remove_from_cleaning_route(sender, instance, **kwargs):
+    routes.changed(instance.assigned_to_id)
+
+
+@receiver(post_save, sender=Room)
+def record_room_status(sender, instance, created, **kwargs):
+    status_events.record(instance, created)
+
+
+@receiver(post_save, sender=Room)
+def invalidate_room_routes(sender, instance, created, **kwargs):
+    # A renumbered room moves in the routes of whoever has to clean it
+    if not created:
+        routes.changed(
+            *instance.cleaning_tasks.filter(
+                status__in=routes.OPEN_STATUSES, assigned_to__isnull=False
+            ).values_list("assigned_to_id", flat=True)
+        )
@@ -0,0 +1,153 @@
+# apps/rooms/states.py
+"""
+State machine of the rooms: the cleaning status and occupancy a room can
+move to from each value.
+
+Every change of a room's state goes through change() (one room) or
+change_many() (e.g. "floor 3 inspected"). They validate the transitions,
+write only the state columns (plus last_cleaned / last_inspected when a
+room becomes clean or inspected) and record one RoomStatusEvent per
+changed field; status_events then sends room_state_changed for each one
+once the transaction commits, for caches and live boards.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import status_events
+from .models import Room, RoomStatusEvent
+
+Status = Room.StatusChoices
+Occupancy = Room.OccupancyChoices
+
+TRANSITIONS = {
+    "status": {
+        Status.DIRTY: {Status.CLEAN, Status.MAINTENANCE, Status.OUT_OF_ORDER},
+        Status.CLEAN: {
+            Status.DIRTY,
+            Status.INSPECTED,
+            Status.MAINTENANCE,
+            Status.OUT_OF_ORDER,
+        },
+        Status.INSPECTED: {
+            Status.DIRTY,
+            Status.CLEAN,
+            Status.MAINTENANCE,
+            Status.OUT_OF_ORDER,
+        },
+        Status.MAINTENANCE: {
+            Status.DIRTY,
+            Status.CLEAN,
+            Status.INSPECTED,
+            Status.OUT_OF_ORDER,
+        },
+        Status.OUT_OF_ORDER: {Status.DIRTY, Status.MAINTENANCE},
+    },
+    "occupancy": {
+        Occupancy.VACANT: {Occupancy.RESERVED, Occupancy.OCCUPIED},
+        Occupancy.RESERVED: {Occupancy.VACANT, Occupancy.OCCUPIED},
+        Occupancy.OCCUPIED: {Occupancy.VACANT},
+    },
+}
+
+# Columns stamped when a room enters a status
+STAMPS = {Status.CLEAN: "last_cleaned", Status.INSPECTED: "last_inspected"}
+
+BATCH_SIZE = 500
+
+
+class InvalidTransition(ValidationError):
+    """A room cannot move from its current state to the requested one"""
+
+
+def can_change(field, current, value):
+    return current == value or value in TRANSITIONS[field].get(current, ())
+
+
+def check(room, **values):
+    """Raises InvalidTransition unless the room can take the values"""
+    for field, value in values.items():
+        if field not in TRANSITIONS:
+            raise ValueError(f"Not a room state: {field}")
+        current = getattr(room, field)
+        if not can_change(field, current, value):
+            raise InvalidTransition(
+                f"Room {room.number} cannot go from {current} to {value}",
+                code="invalid_transition",
+            )
+
+
+def _stamps(values, now):
+    stamp = STAMPS.get(values.get("status"))
+    return {stamp: now} if stamp else {}
+
+
+def change(room, employee=None, **values):
+    """
+    Moves a saved room to the given status and/or occupancy, writing only
+    those columns. Returns the names of the fields that changed.
+    """
+    check(room, **values)
+    changed = {
+        field: value for field, value in values.items() if getattr(room, field) != value
+    }
+    if not changed:
+        return []
+    changed.update(_stamps(changed, timezone.now()))
+    for field, value in changed.items():
+        setattr(room, field, value)
+    room.status_changed_by = employee
+    # post_save records the events (see signals.py)
+    room.save(update_fields=[*changed, "updated_at"])
+    return [field for field in changed if field in TRANSITIONS]
+
+
+@transaction.atomic
+def change_many(rooms, employee=None, **values):
+    """
+    Moves every room of the queryset that can take the values, with one
+    UPDATE (two when only some of them enter a stamped status) and one bulk
+    INSERT of events. Rooms already there are left alone. Returns (events
+    written, ids of the rooms that cannot move).
+    """
+    for field in values:
+        if field not in TRANSITIONS:
+            raise ValueError(f"Not a room state: {field}")
+    if not values:
+        return [], []
+
+    now = timezone.now()
+    events = []
+    rejected = []
+    for pk, *current in rooms.select_for_update().values_list("pk", *TRANSITIONS):
+        current = dict(zip(TRANSITIONS, current))
+        if not all(can_change(f, current[f], value) for f, value in values.items()):
+            rejected.append(pk)
+            continue
+        events.extend(
+            RoomStatusEvent(
+                room_id=pk,
+                field=field,
+                from_value=current[field],
+                to_value=value,
+                employee=employee,
+                changed_at=now,
+            )
+            for field, value in values.items()
+            if current[field] != value
+        )
+    if events:
+        moved = {event.room_id for event in events}
+        stamps = _stamps(values, now)
+        # As in change(), only the rooms whose status moves get the stamp
+        entered = {
+            event.room_id for event in events if stamps and event.field == "status"
+        }
+        for pks, stamped in ((entered, stamps), (moved - entered, {})):
+            if pks:
+                Room.objects.filter(pk__in=pks).update(
+                    updated_at=now, **values, **stamped
+                )
+        status_events.write(events, batch_size=BATCH_SIZE)
+    return events, rejected
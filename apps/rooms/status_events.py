@@ -0,0 +1,61 @@
+# apps/rooms/status_events.py
+"""
+Append-only history of the status and occupancy of the rooms.
+
+Every Room.save() that creates a room or changes one of its tracked
+fields writes the transitions with a single INSERT (see signals.py); set
+room.status_changed_by before saving to record who caused them. Changes
+should go through the state machine (states.py), which validates them
+and moves many rooms at once with one UPDATE and one bulk INSERT.
+
+Once the transaction commits, room_state_changed is sent for every event
+written (sender Room, event=RoomStatusEvent), for caches and live boards.
+Events are never updated, so the history can be replayed to compute
+turnaround times (turnaround.py).
+"""
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Room, RoomStatusEvent
+
+room_state_changed = Signal()
+
+
+def events_for(room, created=False, at=None):
+    """Unsaved events of the tracked fields a save of the room changes"""
+    at = at or timezone.now()
+    return [
+        RoomStatusEvent(
+            room_id=room.pk,
+            field=name,
+            from_value="" if created else room.loaded_value(name) or "",
+            to_value=getattr(room, name),
+            employee=room.status_changed_by,
+            changed_at=at,
+        )
+        for name in Room.TRACKED_FIELDS
+        if created or room.has_changed(name)
+    ]
+
+
+def write(events, batch_size=None):
+    """Inserts the events and announces them once the transaction commits"""
+    RoomStatusEvent.objects.bulk_create(events, batch_size=batch_size)
+
+    def announce():
+        for event in events:
+            room_state_changed.send(sender=Room, event=event)
+
+    transaction.on_commit(announce)
+
+
+def record(room, created=False):
+    """Writes the events of a saved room and starts tracking from its new values"""
+    events = events_for(room, created)
+    if events:
+        write(events)
+    room.status_changed_by = None
+    room.remember_tracked()
+    return events
@@ -0,0 +1,284 @@
+# apps/rooms/sync.py
+"""
+Delta sync of the tasks of the floor staff (housekeepers, maintenance),
+for clients that work offline and sync when they get a connection.
+
+Every sync returns a signed token with the time it was taken. The next
+sync sends it back and only gets what changed after that time: the
+employee's cleaning and maintenance tasks (open or closed since) and the
+rooms they are in, found through the updated_at indexes, plus the ids of
+the tasks still open so the client can drop the ones closed or
+reassigned elsewhere. The token time is set a few seconds back, so rows
+saved by transactions still running when it was taken come again in the
+next sync; the client applies changes by id, so repeats are harmless.
+
+The client queues status changes while offline and uploads them in one
+batch, applied in one transaction. Each change carries the updated_at of
+the task as the client last saw it: a task changed on the server since
+then is a conflict, left untouched and returned as it is now.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import states
+from .models import CleaningTask, MaintenanceTask, Room
+
+TOKEN_SALT = "rooms.sync"
+
+# Overlap between syncs, for transactions that commit late
+OVERLAP = timedelta(seconds=5)
+
+MAX_CHANGES = 200
+
+OPEN_CLEANING = (
+    CleaningTask.StatusChoices.PENDING,
+    CleaningTask.StatusChoices.IN_PROGRESS,
+)
+OPEN_MAINTENANCE = (
+    MaintenanceTask.StatusChoices.PENDING,
+    MaintenanceTask.StatusChoices.ASSIGNED,
+    MaintenanceTask.StatusChoices.IN_PROGRESS,
+)
+
+# Statuses the floor staff may set from the client
+ALLOWED_STATUSES = {
+    "cleaning": (
+        CleaningTask.StatusChoices.IN_PROGRESS,
+        CleaningTask.StatusChoices.COMPLETED,
+    ),
+    "maintenance": (
+        MaintenanceTask.StatusChoices.IN_PROGRESS,
+        MaintenanceTask.StatusChoices.COMPLETED,
+    ),
+}
+MODELS = {"cleaning": CleaningTask, "maintenance": MaintenanceTask}
+
+
+class SyncError(ValueError):
+    """The upload cannot be read as a batch of changes"""
+
+
+@dataclass
+class Change:
+    kind: str
+    pk: int
+    status: str
+    seen_at: datetime
+    notes: str = None
+
+
+def make_token(employee, now=None):
+    now = now or timezone.now()
+    return signing.dumps(
+        [employee.pk, (now - OVERLAP).isoformat()], salt=TOKEN_SALT, compress=True
+    )
+
+
+def read_token(token, employee):
+    """Time of the sync the token was issued at, or None for a full sync"""
+    if not token:
+        return None
+    try:
+        pk, since = signing.loads(token, salt=TOKEN_SALT)
+        since = datetime.fromisoformat(since)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    # A token of another employee is no use: start again
+    return since if pk == employee.pk else None
+
+
+def serialize_cleaning(task):
+    return {
+        "id": task.pk,
+        "room": task.room_id,
+        "status": task.status,
+        "type": task.cleaning_type,
+        "priority": task.priority,
+        "notes": task.notes,
+        "updated_at": task.updated_at.isoformat(),
+    }
+
+
+def serialize_maintenance(task):
+    return {
+        "id": task.pk,
+        "room": task.room_id,
+        "status": task.status,
+        "priority": task.priority,
+        "title": task.title,
+        "description": task.description,
+        "updated_at": task.updated_at.isoformat(),
+    }
+
+
+def serialize_room(room):
+    return {
+        "id": room.pk,
+        "number": room.number,
+        "floor": room.floor,
+        "status": room.status,
+        "occupancy": room.occupancy,
+        "updated_at": room.updated_at.isoformat(),
+    }
+
+
+SERIALIZERS = {"cleaning": serialize_cleaning, "maintenance": serialize_maintenance}
+
+
+def changes_since(employee, since=None):
+    """
+    Tasks and rooms of the employee changed after `since` (everything
+    open when None), with at most five queries.
+    """
+    cleaning = CleaningTask.objects.filter(assigned_to=employee)
+    maintenance = MaintenanceTask.objects.filter(assigned_to=employee)
+
+    open_cleaning = list(
+        cleaning.filter(status__in=OPEN_CLEANING).values_list("pk", "room_id")
+    )
+    open_maintenance = list(
+        maintenance.filter(status__in=OPEN_MAINTENANCE).values_list("pk", "room_id")
+    )
+    if since is None:
+        cleaning = cleaning.filter(status__in=OPEN_CLEANING)
+        maintenance = maintenance.filter(status__in=OPEN_MAINTENANCE)
+    else:
+        cleaning = cleaning.filter(updated_at__gt=since)
+        maintenance = maintenance.filter(updated_at__gt=since)
+    cleaning = list(cleaning.select_related("room"))
+    maintenance = list(maintenance.select_related("room"))
+
+    # Rooms of the changed tasks, and the ones of open tasks changed since
+    rooms = {task.room_id: task.room for task in cleaning + maintenance}
+    if since is not None:
+        room_ids = {room_id for _, room_id in open_cleaning + open_maintenance}
+        rooms.update(
+            (room.pk, room)
+            for room in Room.objects.filter(
+                pk__in=room_ids - set(rooms), updated_at__gt=since
+            )
+        )
+
+    return {
+        "cleaning": [serialize_cleaning(task) for task in cleaning],
+        "maintenance": [serialize_maintenance(task) for task in maintenance],
+        "rooms": [serialize_room(room) for room in rooms.values()],
+        "open": {
+            "cleaning": [pk for pk, _ in open_cleaning],
+            "maintenance": [pk for pk, _ in open_maintenance],
+        },
+    }
+
+
+def read_changes(data):
+    """Parses the uploaded changes: [{type, id, status, updated_at, notes?}]"""
+    if not isinstance(data, list):
+        raise SyncError("changes debe ser una lista")
+    if len(data) > MAX_CHANGES:
+        raise SyncError(f"Máximo {MAX_CHANGES} cambios por sincronización")
+
+    changes = []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise SyncError(f"Cambio {index}: formato no válido")
+        kind = item.get("type")
+        if kind not in MODELS:
+            raise SyncError(f"Cambio {index}: tipo desconocido")
+        seen_at = parse_datetime(str(item.get("updated_at", "")))
+        if seen_at is None:
+            raise SyncError(f"Cambio {index}: falta updated_at")
+        if timezone.is_naive(seen_at):
+            seen_at = timezone.make_aware(seen_at)
+        try:
+            pk = int(item.get("id"))
+        except (TypeError, ValueError):
+            raise SyncError(f"Cambio {index}: id no válido") from None
+        notes = item.get("notes")
+        changes.append(
+            Change(
+                kind=kind,
+                pk=pk,
+                status=str(item.get("status", "")),
+                seen_at=seen_at,
+                notes=str(notes) if notes is not None else None,
+            )
+        )
+    return changes
+
+
+@transaction.atomic
+def apply_changes(employee, changes):
+    """
+    Applies the changes of the employee's own tasks. The tasks are locked
+    with one query per type. Returns one result per change:
+    {"type", "id", "result": applied | conflict | rejected, "task"?, "error"?}
+    """
+    tasks = {}
+    for kind, model in MODELS.items():
+        pks = [change.pk for change in changes if change.kind == kind]
+        if pks:
+            tasks[kind] = model.objects.select_for_update().in_bulk(pks)
+    # Queued changes of one task were all seen at the same server version
+    versions = {
+        (kind, pk): task.updated_at
+        for kind, by_pk in tasks.items()
+        for pk, task in by_pk.items()
+    }
+
+    results = []
+    for change in changes:
+        result = {"type": change.kind, "id": change.pk}
+        task = tasks.get(change.kind, {}).get(change.pk)
+        if task is None or task.assigned_to_id != employee.pk:
+            result.update(result="rejected", error="Tarea no encontrada")
+        elif change.status not in ALLOWED_STATUSES[change.kind]:
+            result.update(result="rejected", error="Estado no permitido")
+        elif versions[change.kind, change.pk] > change.seen_at:
+            result.update(result="conflict", task=SERIALIZERS[change.kind](task))
+        elif not _room_allows(change, task):
+            result.update(
+                result="rejected",
+                error="La habitación no se puede marcar como limpia",
+                task=SERIALIZERS[change.kind](task),
+            )
+        else:
+            _apply(change, task, employee)
+            result.update(result="applied", task=SERIALIZERS[change.kind](task))
+        results.append(result)
+    return results
+
+
+def _room_allows(change, task):
+    # Same check as the update form: completing a cleaning makes the room clean
+    if (
+        change.kind != "cleaning"
+        or change.status != task.StatusChoices.COMPLETED
+        or change.status == task.status
+    ):
+        return True
+    return states.can_change("status", task.room.status, Room.StatusChoices.CLEAN)
+
+
+def _apply(change, task, employee):
+    # Same effects as the update forms of the web app
+    completed = (
+        change.status != task.status and change.status == task.StatusChoices.COMPLETED
+    )
+    task.status = change.status
+    if change.notes is not None and change.kind == "cleaning":
+        task.notes = change.notes
+
+    if change.kind == "cleaning":
+        if completed:
+            task.clean_room()
+    elif completed:
+        task.resolved_at = timezone.now()
+        if task.room.status == Room.StatusChoices.MAINTENANCE:
+            states.change(task.room, employee, status=Room.StatusChoices.INSPECTED)
+    task.save()
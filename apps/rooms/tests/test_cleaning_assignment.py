@@ -0,0 +1,135 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.attendance.models import Attendance
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.leave.models import Leave
+from apps.rooms.assignment import TaskLoad, auto_assign, plan, staff_on_duty
+from apps.rooms.models import CleaningTask, Room, RoomType
+
+
+def loads(floors, minutes=30):
+    return [
+        TaskLoad(pk=pk, floor=floor, priority=1, room_number=str(pk), minutes=minutes)
+        for pk, floor in enumerate(floors, start=1)
+    ]
+
+
+class CleaningPlanTest(TestCase):
+    """Tests del reparto de tareas de limpieza (cálculo en memoria)"""
+
+    def test_balanced_and_contiguous(self):
+        """Cada persona recibe un tramo de plantas seguido y una carga similar"""
+        tasks = loads([floor for floor in range(1, 6) for _ in range(12)])
+        assignments = plan(tasks, [10, 20, 30])
+
+        self.assertEqual(len(assignments), 60)
+        per_person = {}
+        for task in tasks:
+            per_person.setdefault(assignments[task.pk], []).append(task.floor)
+        self.assertEqual(sorted(len(f) for f in per_person.values()), [20, 20, 20])
+        # Como mucho dos cambios de planta por persona con 5 plantas y 3 personas
+        for floors in per_person.values():
+            self.assertEqual(floors, sorted(floors))
+            self.assertLessEqual(len(set(floors)), 3)
+
+    def test_existing_assignments_count_as_load(self):
+        """Quien ya tiene tareas asignadas recibe menos nuevas"""
+        tasks = loads([1] * 4 + [2] * 8)
+        for task in tasks[:4]:
+            task.assigned_to_id = 10
+        assignments = plan(tasks, [10, 20])
+
+        self.assertEqual(list(assignments.values()).count(10), 2)
+        self.assertEqual(list(assignments.values()).count(20), 6)
+
+    def test_no_staff(self):
+        self.assertEqual(plan(loads([1, 2]), []), {})
+
+    def test_large_hotel_under_a_second(self):
+        """500 habitaciones y 40 personas se reparten en menos de un segundo"""
+        tasks = loads([pk % 10 for pk in range(500)], minutes=15)
+        start = time.perf_counter()
+        assignments = plan(tasks, range(40))
+
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(len(assignments), 500)
+        counts = [list(assignments.values()).count(pk) for pk in range(40)]
+        self.assertLessEqual(max(counts) - min(counts), 1)
+
+
+class AutoAssignTest(TestCase):
+    """Tests de la asignación automática contra la base de datos"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        cache.clear()
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.rooms = [
+            Room.objects.create(number=f"{floor}0{n}", floor=floor, room_type=room_type)
+            for floor in (1, 2)
+            for n in range(1, 4)
+        ]
+        self.staff = []
+        for username in ("ana", "luis", "eva"):
+            self.staff.append(
+                Employee.objects.create(
+                    user=User.objects.create_user(username=username),
+                    department=department,
+                    role=Employee.RoleChoices.HOUSEKEEPER,
+                )
+            )
+        self.ana, self.luis, self.eva = self.staff
+        self.tasks = [CleaningTask.objects.create(room=room) for room in self.rooms]
+
+    def test_only_staff_on_duty(self):
+        """Solo quien ha fichado y no está de permiso recibe tareas"""
+        today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            for employee in (self.ana, self.luis):
+                Attendance.objects.create(
+                    employee=employee, check_in=timezone.now() - timedelta(hours=1)
+                )
+        Leave.objects.create(
+            employee=self.luis,
+            leave_type="vacation",
+            start_date=today,
+            end_date=today,
+            reason="Vacaciones",
+            status=Leave.StatusChoices.APPROVED,
+        )
+        cache.clear()
+        self.assertEqual(staff_on_duty(), [self.ana.pk])
+
+        # Tareas, personal (fichajes ya en caché) y un único UPDATE, más el
+        # SAVEPOINT y su RELEASE de la transacción
+        with self.assertNumQueries(5):
+            assignments = auto_assign()
+
+        self.assertEqual(set(assignments.values()), {self.ana.pk})
+        self.assertEqual(
+            CleaningTask.objects.filter(assigned_to=self.ana).count(), len(self.tasks)
+        )
+
+    def test_nobody_on_duty(self):
+        self.assertEqual(auto_assign(), {})
+        self.assertFalse(CleaningTask.objects.filter(assigned_to__isnull=False))
@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms.models import CleaningTask, Room, RoomType
+from apps.rooms.productivity import completed_between, day_range, productivity
+
+
+class CleaningProductivityTest(TestCase):
+    """Tests de las marcas de tiempo de las tareas y la productividad"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        self.ana, self.luis, self.jefa = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=username, password="x"),
+                department=department,
+                role=role,
+            )
+            for username, role in (
+                ("ana", Employee.RoleChoices.HOUSEKEEPER),
+                ("luis", Employee.RoleChoices.HOUSEKEEPER),
+                ("jefa", Employee.RoleChoices.HOUSEKEEPING_MANAGER),
+            )
+        ]
+        room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.room = Room.objects.create(number="101", floor=1, room_type=room_type)
+        self.today = timezone.localdate()
+
+    def _done(self, employee, day, minutes, started=True):
+        """Tarea terminada el día indicado, a mediodía, tras `minutes` minutos"""
+        completed_at = day_range(day)[0] + timedelta(hours=12)
+        task = CleaningTask.objects.create(room=self.room, assigned_to=employee)
+        CleaningTask.objects.filter(pk=task.pk).update(
+            status=CleaningTask.StatusChoices.COMPLETED,
+            started_at=completed_at - timedelta(minutes=minutes) if started else None,
+            completed_at=completed_at,
+        )
+        return task
+
+    def test_transitions_set_timestamps(self):
+        """Cada cambio de estado registra su hora y editar no la mueve"""
+        task = CleaningTask.objects.create(room=self.room, assigned_to=self.ana)
+        self.assertIsNone(task.started_at)
+        self.assertIsNone(task.completed_at)
+
+        task.status = CleaningTask.StatusChoices.IN_PROGRESS
+        task.save()
+        started_at = task.started_at
+        self.assertIsNotNone(started_at)
+
+        task.status = CleaningTask.StatusChoices.COMPLETED
+        task.save(update_fields=["status"])
+        task.refresh_from_db()
+        completed_at = task.completed_at
+        self.assertIsNotNone(completed_at)
+
+        task.notes = "Toallas repuestas"
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(task.completed_at, completed_at)
+        self.assertEqual(task.started_at, started_at)
+
+        task.status = CleaningTask.StatusChoices.VERIFIED
+        task.save()
+        self.assertIsNotNone(task.verified_at)
+        self.assertEqual(task.completed_at, completed_at)
+
+    def test_reopening_clears_later_timestamps(self):
+        """Reabrir una tarea borra las horas de los pasos siguientes"""
+        task = CleaningTask.objects.create(
+            room=self.room, status=CleaningTask.StatusChoices.VERIFIED
+        )
+        self.assertIsNotNone(task.completed_at)
+        self.assertIsNotNone(task.verified_at)
+        self.assertIsNone(task.started_at)
+
+        task.status = CleaningTask.StatusChoices.IN_PROGRESS
+        task.save()
+        task.refresh_from_db()
+        self.assertIsNotNone(task.started_at)
+        self.assertIsNone(task.completed_at)
+        self.assertIsNone(task.verified_at)
+
+    def test_completed_between(self):
+        """Solo las tareas terminadas en el rango de días"""
+        self._done(self.ana, self.today, 20)
+        self._done(self.ana, self.today - timedelta(days=1), 20)
+        CleaningTask.objects.create(room=self.room, assigned_to=self.ana)
+
+        self.assertEqual(completed_between(self.today).count(), 1)
+        self.assertEqual(
+            completed_between(self.today - timedelta(days=1), self.today).count(), 2
+        )
+
+    def test_productivity_series(self):
+        """Tareas y minutos por camarera y día, días vacíos incluidos"""
+        yesterday = self.today - timedelta(days=1)
+        self._done(self.ana, yesterday, 30)
+        self._done(self.ana, yesterday, 15)
+        self._done(self.ana, self.today, 20, started=False)
+        self._done(self.luis, self.today, 40)
+
+        with self.assertNumQueries(1):
+            series = productivity(yesterday, self.today)
+
+        self.assertEqual(
+            series[self.ana.pk],
+            [
+                {"date": yesterday, "tasks": 2, "minutes": 45},
+                {"date": self.today, "tasks": 1, "minutes": 0},
+            ],
+        )
+        self.assertEqual(series[self.luis.pk][0]["tasks"], 0)
+        self.assertEqual(
+            list(productivity(yesterday, self.today, [self.luis.pk])), [self.luis.pk]
+        )
+        with self.assertRaises(ValueError):
+            productivity(self.today, yesterday)
+
+    def test_productivity_api(self):
+        """Los responsables ven a todo el equipo; cada camarera, lo suyo"""
+        self._done(self.ana, self.today, 30)
+        self._done(self.luis, self.today, 10)
+        url = reverse("cleaning:productivity")
+
+        self.client.force_login(self.jefa.user)
+        data = self.client.get(url).json()
+        self.assertEqual(len(data["employees"]), 2)
+        self.assertEqual(len(data["employees"][0]["days"]), 7)
+        self.assertEqual(data["employees"][0]["minutes"], 30)
+
+        self.client.force_login(self.luis.user)
+        data = self.client.get(url, {"employee": self.ana.pk}).json()
+        self.assertEqual([row["id"] for row in data["employees"]], [self.luis.pk])
+
+        response = self.client.get(url, {"start_date": "2030-01-01"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"end_date": "2026-02-30"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,114 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms import routes
+from apps.rooms.models import CleaningTask, Room, RoomType
+
+
+class CleaningRouteTest(TestCase):
+    """Tests de la ruta de limpieza de cada camarera"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        cache.clear()
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        self.ana, self.luis = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=username, password="x"),
+                department=department,
+                role=Employee.RoleChoices.HOUSEKEEPER,
+            )
+            for username in ("ana", "luis")
+        ]
+        room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.rooms = {
+            number: Room.objects.create(
+                number=number, floor=int(number[0]), room_type=room_type
+            )
+            for number in ("101", "103", "202", "204", "301")
+        }
+
+    def _task(self, number, priority=3, employee=None):
+        return CleaningTask.objects.create(
+            room=self.rooms[number],
+            assigned_to=employee or self.ana,
+            priority=priority,
+        )
+
+    def _route(self, employee=None):
+        pks = routes.route_for((employee or self.ana).pk)
+        numbers = dict(CleaningTask.objects.values_list("pk", "room__number"))
+        return [numbers[pk] for pk in pks]
+
+    def test_route_order(self):
+        """Por bandas de prioridad, subiendo plantas y en zigzag por pasillo"""
+        for number in ("301", "101", "204", "103", "202"):
+            self._task(number)
+        self._task("204", priority=1)
+
+        self.assertEqual(self._route(), ["204", "101", "103", "204", "202", "301"])
+
+    def test_route_dropped_on_commit(self):
+        """Añadir, completar o reasignar renueva la ruta al confirmar"""
+        first = self._task("202")
+        self._route()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(routes.route_for(self.ana.pk)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._task("101")
+        self.assertEqual(self._route(), ["101", "202"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.status = CleaningTask.StatusChoices.COMPLETED
+            first.save()
+        self.assertEqual(self._route(), ["101"])
+
+        self._route(self.luis)
+        with self.captureOnCommitCallbacks(execute=True):
+            task = CleaningTask.objects.get(room__number="101")
+            task.assigned_to = self.luis
+            task.save()
+        self.assertEqual(self._route(), [])
+        self.assertEqual(self._route(self.luis), ["101"])
+
+    def test_route_kept_until_commit(self):
+        """Un cambio que no se confirma no toca la ruta cacheada"""
+        self._task("202")
+        self._route()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._task("101")
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._route(), ["202"])
+
+    def test_my_tasks_view(self):
+        """Mis tareas muestra las pendientes en el orden de la ruta"""
+        for number in ("301", "101", "202"):
+            self._task(number)
+        self.client.force_login(self.ana.user)
+
+        response = self.client.get(reverse("cleaning:tasks"))
+
+        self.assertEqual(
+            [task.room.number for task in response.context["pending_tasks"]],
+            ["101", "202", "301"],
+        )
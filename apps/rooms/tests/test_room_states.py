@@ -0,0 +1,194 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms import states
+from apps.rooms.forms import CleaningTaskUpdateForm, RoomForm
+from apps.rooms.models import CleaningTask, Reservation, Room, RoomType
+from apps.rooms.status_events import room_state_changed
+
+
+class RoomStateMachineTest(TestCase):
+    """Tests de la máquina de estados de las habitaciones"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        self.ana = Employee.objects.create(
+            user=User.objects.create_user(username="ana", password="x"),
+            department=department,
+            role=Employee.RoleChoices.HOUSEKEEPER,
+        )
+        self.room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.room = self._room("301", Room.StatusChoices.DIRTY)
+
+    def _room(self, number, status, floor=3):
+        room = Room.objects.create(
+            number=number, floor=floor, room_type=self.room_type, status=status
+        )
+        # Recargada, como en las vistas
+        return Room.objects.get(pk=room.pk)
+
+    def test_change_writes_only_state_columns(self):
+        """Un cambio escribe solo el estado, su marca de tiempo y updated_at"""
+        self.room.notes = "Sin guardar"
+        received = []
+
+        def receiver(sender, event, **kwargs):
+            received.append(event)
+
+        room_state_changed.connect(receiver)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                changed = states.change(
+                    self.room, self.ana, status=Room.StatusChoices.CLEAN
+                )
+        finally:
+            room_state_changed.disconnect(receiver)
+
+        self.assertEqual(changed, ["status"])
+        room = Room.objects.get(pk=self.room.pk)
+        self.assertEqual(room.status, Room.StatusChoices.CLEAN)
+        self.assertIsNotNone(room.last_cleaned)
+        self.assertEqual(room.notes, "")
+        self.assertEqual(
+            [(event.to_value, event.employee) for event in received],
+            [(Room.StatusChoices.CLEAN, self.ana)],
+        )
+
+    def test_invalid_transition(self):
+        """Una habitación sucia no puede pasar a revisada sin limpiarse"""
+        with self.assertRaises(states.InvalidTransition):
+            states.change(self.room, status=Room.StatusChoices.INSPECTED)
+        self.assertEqual(states.change(self.room, status=Room.StatusChoices.DIRTY), [])
+
+    def test_change_many_floor(self):
+        """Planta 3 revisada: una sola UPDATE, las que no pueden se devuelven"""
+        clean = [
+            self._room(number, Room.StatusChoices.CLEAN) for number in ("302", "303")
+        ]
+        self._room("201", Room.StatusChoices.CLEAN, floor=2)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            events, rejected = states.change_many(
+                Room.objects.filter(floor=3), status=Room.StatusChoices.INSPECTED
+            )
+
+        self.assertEqual(
+            {event.room_id for event in events}, {room.pk for room in clean}
+        )
+        self.assertEqual(rejected, [self.room.pk])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            set(
+                Room.objects.filter(status=Room.StatusChoices.INSPECTED).values_list(
+                    "number", flat=True
+                )
+            ),
+            {"302", "303"},
+        )
+        self.assertFalse(
+            Room.objects.filter(
+                status=Room.StatusChoices.INSPECTED, last_inspected__isnull=True
+            ).exists()
+        )
+
+    def test_change_many_stamps_only_status_changes(self):
+        """Cambiar solo la ocupación no vuelve a marcar la limpieza"""
+        cleaned = self._room("302", Room.StatusChoices.CLEAN)
+        last_cleaned = timezone.now() - timedelta(days=1)
+        Room.objects.filter(pk=cleaned.pk).update(last_cleaned=last_cleaned)
+
+        states.change_many(
+            Room.objects.filter(floor=3),
+            status=Room.StatusChoices.CLEAN,
+            occupancy=Room.OccupancyChoices.RESERVED,
+        )
+
+        cleaned.refresh_from_db()
+        self.assertEqual(cleaned.occupancy, Room.OccupancyChoices.RESERVED)
+        self.assertEqual(cleaned.last_cleaned, last_cleaned)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, Room.StatusChoices.CLEAN)
+        self.assertGreater(self.room.last_cleaned, last_cleaned)
+
+    def test_reservation_stay(self):
+        """La entrada ocupa la habitación; la salida la deja libre y sucia"""
+        Room.objects.filter(pk=self.room.pk).update(status=Room.StatusChoices.INSPECTED)
+        reservation = Reservation.objects.create(
+            room=Room.objects.get(pk=self.room.pk),
+            check_in_date=date.today(),
+            check_out_date=date.today() + timedelta(days=2),
+            guest_first_name="Manuel",
+            guest_last_name="Muñoz",
+            guest_email="manuelm@mail.com",
+            guest_phone="3456345",
+            room_rate=Decimal("50.00"),
+            status=Reservation.StatusChoices.CONFIRMED,
+        )
+
+        reservation.check_in(self.ana)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.occupancy, Room.OccupancyChoices.OCCUPIED)
+        self.assertEqual(self.room.status, Room.StatusChoices.INSPECTED)
+
+        reservation.check_out(self.ana)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.occupancy, Room.OccupancyChoices.VACANT)
+        self.assertEqual(self.room.status, Room.StatusChoices.DIRTY)
+        self.assertTrue(self.room.cleaning_tasks.exists())
+
+    def test_forms_validate_transitions(self):
+        """Los formularios rechazan cambios de estado no permitidos"""
+        form = RoomForm(
+            instance=self.room,
+            data={
+                "number": "301",
+                "floor": 3,
+                "room_type": self.room_type.pk,
+                "status": Room.StatusChoices.INSPECTED,
+                "occupancy": Room.OccupancyChoices.VACANT,
+                "is_active": True,
+            },
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("status", form.errors)
+
+        Room.objects.filter(pk=self.room.pk).update(
+            status=Room.StatusChoices.OUT_OF_ORDER
+        )
+        task = CleaningTask.objects.create(room=self.room, assigned_to=self.ana)
+        form = CleaningTaskUpdateForm(
+            instance=CleaningTask.objects.get(pk=task.pk),
+            data={"status": CleaningTask.StatusChoices.COMPLETED, "notes": ""},
+        )
+        self.assertFalse(form.is_valid())
+
+    def test_change_room_status_command(self):
+        """El comando cambia una planta entera y avisa de las que no puede"""
+        self._room("302", Room.StatusChoices.CLEAN)
+        out = StringIO()
+
+        call_command("change_room_status", floor=3, status="inspected", stdout=out)
+
+        self.assertIn("1 habitaciones cambiadas", out.getvalue())
+        self.assertIn("301", out.getvalue())
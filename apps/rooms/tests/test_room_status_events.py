@@ -0,0 +1,182 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms import states
+from apps.rooms.models import Room, RoomStatusEvent, RoomType
+from apps.rooms.turnaround import percentile, turnaround_percentiles, turnarounds
+
+
+class RoomStatusEventTest(TestCase):
+    """Tests del historial de estados de las habitaciones y sus tiempos"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        self.ana, self.luis = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=username, password="x"),
+                department=department,
+                role=Employee.RoleChoices.HOUSEKEEPER,
+            )
+            for username in ("ana", "luis")
+        ]
+        self.double = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.suite = RoomType.objects.create(name="Suite", code="STE", capacity=2)
+        self.room = Room.objects.create(
+            number="101",
+            floor=1,
+            room_type=self.double,
+            status=Room.StatusChoices.CLEAN,
+        )
+        self.start = timezone.now() - timedelta(days=1)
+
+    def _event(self, room, field, to_value, minutes, from_value="", employee=None):
+        return RoomStatusEvent.objects.create(
+            room=room,
+            field=field,
+            from_value=from_value,
+            to_value=to_value,
+            employee=employee,
+            changed_at=self.start + timedelta(minutes=minutes),
+        )
+
+    def _cleaning(self, room, dirty_at, clean_at, employee=None):
+        self._event(room, "status", Room.StatusChoices.DIRTY, dirty_at)
+        self._event(room, "status", Room.StatusChoices.CLEAN, clean_at, "", employee)
+
+    def test_save_records_transitions(self):
+        """Crear y cambiar una habitación registra solo lo que cambia"""
+        self.assertEqual(
+            list(
+                self.room.status_events.values_list("field", "from_value", "to_value")
+            ),
+            [("status", "", "clean"), ("occupancy", "", "vacant")],
+        )
+
+        room = Room.objects.get(pk=self.room.pk)
+        room.notes = "Vista al mar"
+        room.save()
+        room.status = Room.StatusChoices.DIRTY
+        room.status_changed_by = self.ana
+        room.save()
+        room.status = Room.StatusChoices.CLEAN
+        room.save()
+
+        events = list(room.status_events.order_by("pk"))[2:]
+        self.assertEqual(
+            [(event.from_value, event.to_value) for event in events],
+            [("clean", "dirty"), ("dirty", "clean")],
+        )
+        self.assertEqual(events[0].employee, self.ana)
+        self.assertIsNone(events[1].employee)
+
+    def test_events_are_append_only(self):
+        """Los eventos no se pueden modificar"""
+        event = self.room.status_events.first()
+        event.to_value = Room.StatusChoices.DIRTY
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_bulk_change(self):
+        """Cambiar muchas habitaciones son tres consultas, sin importar cuántas"""
+        for number in ("102", "103", "104"):
+            Room.objects.create(
+                number=number, floor=1, room_type=self.double, status="clean"
+            )
+        Room.objects.filter(number="104").update(status=Room.StatusChoices.DIRTY)
+
+        # SELECT ... FOR UPDATE, UPDATE, INSERT (+ savepoint)
+        with self.assertNumQueries(5):
+            events, rejected = states.change_many(
+                Room.objects.all(),
+                employee=self.luis,
+                status=Room.StatusChoices.DIRTY,
+            )
+
+        self.assertEqual((len(events), rejected), (3, []))
+        self.assertFalse(Room.objects.exclude(status="dirty").exists())
+        self.assertEqual(
+            RoomStatusEvent.objects.filter(
+                employee=self.luis, from_value="clean", to_value="dirty"
+            ).count(),
+            3,
+        )
+
+    def test_turnarounds_pair_start_and_next_end(self):
+        """Cada limpieza va de la última vez que se ensucia a que se limpia"""
+        self._event(self.room, "status", "dirty", 0)
+        self._event(self.room, "status", "maintenance", 10)
+        self._event(self.room, "status", "dirty", 20)
+        self._event(self.room, "status", "clean", 50, employee=self.ana)
+        self._event(self.room, "status", "clean", 60)
+        self._event(self.room, "status", "dirty", 70)
+
+        spans = list(
+            turnarounds("cleaning", self.start, self.start + timedelta(hours=2))
+        )
+
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0].duration, timedelta(minutes=30))
+        self.assertEqual(spans[0].ended_by, self.ana.pk)
+
+    def test_checkout_turnaround(self):
+        """Desde la salida del cliente hasta que la habitación está lista"""
+        self._event(self.room, "occupancy", "vacant", 0, from_value="occupied")
+        self._event(self.room, "status", "dirty", 0, from_value="clean")
+        self._event(self.room, "status", "inspected", 45)
+
+        spans = list(
+            turnarounds("checkout", self.start, self.start + timedelta(hours=2))
+        )
+
+        self.assertEqual([span.duration for span in spans], [timedelta(minutes=45)])
+
+    def test_percentiles_by_group(self):
+        """Percentiles por planta, tipo de habitación y camarera"""
+        suite = Room.objects.create(number="201", floor=2, room_type=self.suite)
+        for index, minutes in enumerate((10, 20, 30, 40)):
+            self._cleaning(self.room, index * 100, index * 100 + minutes, self.ana)
+        self._cleaning(suite, 0, 60, self.luis)
+        until = self.start + timedelta(days=1)
+
+        by_floor = turnaround_percentiles("cleaning", self.start, until)
+        self.assertEqual([row["group"] for row in by_floor], [1, 2])
+        self.assertEqual(by_floor[0]["count"], 4)
+        self.assertEqual(by_floor[0]["p50"], timedelta(minutes=20))
+        self.assertEqual(by_floor[0]["p90"], timedelta(minutes=40))
+
+        by_type = turnaround_percentiles("cleaning", self.start, until, by="room_type")
+        self.assertEqual([row["group"] for row in by_type], ["Double", "Suite"])
+
+        by_housekeeper = turnaround_percentiles(
+            "cleaning", self.start, until, by="housekeeper"
+        )
+        self.assertEqual(
+            {row["group"]: row["p50"] for row in by_housekeeper},
+            {self.ana: timedelta(minutes=20), self.luis: timedelta(minutes=60)},
+        )
+
+    def test_percentile(self):
+        """Percentil por rango más cercano"""
+        values = [timedelta(minutes=minutes) for minutes in range(1, 11)]
+        self.assertEqual(percentile(values, 50), timedelta(minutes=5))
+        self.assertEqual(percentile(values, 90), timedelta(minutes=9))
+        self.assertEqual(percentile(values, 100), timedelta(minutes=10))
+        self.assertIsNone(percentile([], 50))
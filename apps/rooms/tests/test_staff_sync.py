@@ -0,0 +1,216 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.employees.models import Department, Employee
+from apps.employees.signals import create_employee_profile
+from apps.rooms import sync
+from apps.rooms.models import CleaningTask, MaintenanceTask, Room, RoomType
+
+
+class StaffSyncTest(TestCase):
+    """Tests de la sincronización incremental del personal de planta"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Desconectar la señal para TODOS los tests de esta clase"""
+        super().setUpClass()
+        post_save.disconnect(create_employee_profile, sender=User)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Reconectar la señal después de todos los tests"""
+        super().tearDownClass()
+        post_save.connect(create_employee_profile, sender=User)
+
+    def setUp(self):
+        department = Department.objects.create(name="Limpieza", code="LIM")
+        self.ana, self.luis = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=username, password="x"),
+                department=department,
+                role=Employee.RoleChoices.HOUSEKEEPER,
+            )
+            for username in ("ana", "luis")
+        ]
+        room_type = RoomType.objects.create(name="Double", code="DBL", capacity=2)
+        self.room, self.other_room = [
+            Room.objects.create(number=number, floor=1, room_type=room_type)
+            for number in ("101", "102")
+        ]
+        self.task = CleaningTask.objects.create(room=self.room, assigned_to=self.ana)
+        self.other_task = CleaningTask.objects.create(
+            room=self.other_room, assigned_to=self.ana
+        )
+        self.repair = MaintenanceTask.objects.create(
+            room=self.other_room,
+            assigned_to=self.ana,
+            title="Grifo",
+            description="Gotea",
+            status=MaintenanceTask.StatusChoices.ASSIGNED,
+        )
+
+    def _since_now(self):
+        # Token de una sincronización hecha ahora mismo, sin solape
+        return timezone.now() + sync.OVERLAP
+
+    def _change(self, task, status, kind="cleaning", **extra):
+        return {
+            "type": kind,
+            "id": task.pk,
+            "status": status,
+            "updated_at": task.updated_at.isoformat(),
+            **extra,
+        }
+
+    def test_full_sync(self):
+        """Sin token se recibe todo lo abierto y sus habitaciones"""
+        data = sync.changes_since(self.ana)
+
+        self.assertEqual(
+            {task["id"] for task in data["cleaning"]},
+            {self.task.pk, self.other_task.pk},
+        )
+        self.assertEqual([task["id"] for task in data["maintenance"]], [self.repair.pk])
+        self.assertEqual(len(data["rooms"]), 2)
+
+    def test_delta_sync(self):
+        """Con token solo llega lo cambiado, en pocas consultas"""
+        since = self._since_now()
+        CleaningTask.objects.filter(pk=self.task.pk).update(
+            notes="Cambiar sábanas", updated_at=since + timedelta(seconds=1)
+        )
+        Room.objects.filter(pk=self.other_room.pk).update(
+            status=Room.StatusChoices.MAINTENANCE,
+            updated_at=since + timedelta(seconds=1),
+        )
+        CleaningTask.objects.filter(pk=self.other_task.pk).update(assigned_to=self.luis)
+
+        with self.assertNumQueries(5):
+            data = sync.changes_since(self.ana, since)
+
+        self.assertEqual([task["id"] for task in data["cleaning"]], [self.task.pk])
+        self.assertEqual(data["maintenance"], [])
+        self.assertEqual(
+            {room["id"]: room["status"] for room in data["rooms"]},
+            {self.room.pk: "dirty", self.other_room.pk: "maintenance"},
+        )
+        # La tarea reasignada desaparece de las abiertas
+        self.assertEqual(data["open"]["cleaning"], [self.task.pk])
+
+    def test_token(self):
+        """El token solo vale para su empleado"""
+        token = sync.make_token(self.ana)
+        self.assertIsNotNone(sync.read_token(token, self.ana))
+        self.assertIsNone(sync.read_token(token, self.luis))
+        self.assertIsNone(sync.read_token("basura", self.ana))
+
+    def test_apply_changes(self):
+        """Los cambios encolados se aplican en orden, con sus efectos"""
+        changes = sync.read_changes(
+            [
+                self._change(self.task, "in_progress"),
+                self._change(self.task, "completed", notes="Hecho"),
+                self._change(self.repair, "completed", kind="maintenance"),
+            ]
+        )
+
+        results = sync.apply_changes(self.ana, changes)
+
+        self.assertEqual([result["result"] for result in results], ["applied"] * 3)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, CleaningTask.StatusChoices.COMPLETED)
+        self.assertEqual(self.task.notes, "Hecho")
+        self.assertIsNotNone(self.task.started_at)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, Room.StatusChoices.CLEAN)
+        self.assertEqual(self.room.status_events.last().employee, self.ana)
+        self.repair.refresh_from_db()
+        self.assertIsNotNone(self.repair.resolved_at)
+
+    def test_conflicts_and_rejections(self):
+        """Lo cambiado en el servidor o ajeno no se toca"""
+        stale = self._change(self.task, "completed")
+        self.task.priority = 2
+        self.task.save()
+        luis_task = CleaningTask.objects.create(room=self.room, assigned_to=self.luis)
+
+        results = sync.apply_changes(
+            self.ana,
+            sync.read_changes(
+                [
+                    stale,
+                    self._change(luis_task, "completed"),
+                    self._change(self.other_task, "verified"),
+                ]
+            ),
+        )
+
+        self.assertEqual(
+            [result["result"] for result in results],
+            ["conflict", "rejected", "rejected"],
+        )
+        self.assertEqual(results[0]["task"]["priority"], 2)
+        self.assertFalse(
+            CleaningTask.objects.filter(
+                status=CleaningTask.StatusChoices.COMPLETED
+            ).exists()
+        )
+        with self.assertRaises(sync.SyncError):
+            sync.read_changes([{"type": "cleaning", "id": "x"}])
+
+    def test_room_that_cannot_be_cleaned(self):
+        """Una limpieza no se completa en una habitación fuera de servicio"""
+        Room.objects.filter(pk=self.room.pk).update(
+            status=Room.StatusChoices.OUT_OF_ORDER
+        )
+
+        results = sync.apply_changes(
+            self.ana,
+            sync.read_changes(
+                [
+                    self._change(self.task, "completed"),
+                    self._change(self.other_task, "in_progress"),
+                ]
+            ),
+        )
+
+        self.assertEqual(
+            [result["result"] for result in results], ["rejected", "applied"]
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, CleaningTask.StatusChoices.PENDING)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, Room.StatusChoices.OUT_OF_ORDER)
+
+    def test_sync_view(self):
+        """Un POST aplica los cambios y devuelve el delta con el nuevo token"""
+        self.client.force_login(self.ana.user)
+        url = reverse("rooms:sync")
+
+        first = self.client.get(url).json()
+        self.assertTrue(first["full"])
+
+        response = self.client.post(
+            url,
+            json.dumps(
+                {
+                    "token": first["token"],
+                    "changes": [self._change(self.task, "in_progress")],
+                }
+            ),
+            content_type="application/json",
+        )
+        data = response.json()
+        self.assertFalse(data["full"])
+        self.assertEqual(data["results"][0]["result"], "applied")
+        statuses = {task["id"]: task["status"] for task in data["cleaning"]}
+        self.assertEqual(statuses[self.task.pk], "in_progress")
+
+        response = self.client.post(url, "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
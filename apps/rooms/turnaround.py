@@ -0,0 +1,142 @@
+# apps/rooms/turnaround.py
+"""
+Turnaround times of the rooms, from their status history.
+
+A turnaround goes from a start event of a room (it turns dirty, or a
+guest checks out) to the next end event of the same room (it is clean or
+ready again). The database pairs them: the start and end events of the
+period are walked per room in time order with LEAD, and only the starts
+followed directly by an end come back, already with their duration, the
+end time and who did the end transition. A start followed by another
+start is superseded by it, so each turnaround is timed from its last
+start.
+
+Percentiles are then picked from the durations of each group by nearest
+rank: the percentile aggregates are not portable across the supported
+databases, and a period has at most a few thousand turnarounds.
+"""
+
+import math
+from collections import defaultdict
+
+from django.db.models import (
+    Case,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Q,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import Lead
+
+from apps.employees.models import Employee
+
+from .models import Room, RoomStatusEvent
+
+STATUS = RoomStatusEvent.FieldChoices.STATUS
+OCCUPANCY = RoomStatusEvent.FieldChoices.OCCUPANCY
+
+# (start events, end events) of every metric
+METRICS = {
+    "cleaning": (
+        Q(field=STATUS, to_value=Room.StatusChoices.DIRTY),
+        Q(field=STATUS, to_value=Room.StatusChoices.CLEAN),
+    ),
+    "checkout": (
+        Q(
+            field=OCCUPANCY,
+            from_value=Room.OccupancyChoices.OCCUPIED,
+            to_value=Room.OccupancyChoices.VACANT,
+        ),
+        Q(
+            field=STATUS,
+            to_value__in=[Room.StatusChoices.CLEAN, Room.StatusChoices.INSPECTED],
+        ),
+    ),
+}
+
+GROUPS = {
+    "floor": "room__floor",
+    "room_type": "room__room_type__name",
+    # Whoever did the end transition (e.g. the housekeeper who cleaned)
+    "housekeeper": "ended_by",
+}
+
+PERCENTILES = (50, 90)
+
+
+def turnarounds(metric, since, until, rooms=None):
+    """
+    Queryset of the start events of the turnarounds that started and
+    ended in [since, until), annotated with duration, ended_at and
+    ended_by (employee id).
+    """
+    start, end = METRICS[metric]
+    events = RoomStatusEvent.objects.filter(
+        start | end, changed_at__gte=since, changed_at__lt=until
+    )
+    if rooms is not None:
+        events = events.filter(room__in=rooms)
+
+    # 0 for a start event, 1 for an end: a turnaround is a step of +1
+    kind = Case(When(end, then=Value(1)), default=Value(0), output_field=IntegerField())
+    per_room = {
+        "partition_by": [F("room_id")],
+        "order_by": [F("changed_at").asc(), F("pk").asc()],
+    }
+    return (
+        events.annotate(
+            step=ExpressionWrapper(
+                Window(Lead(kind), **per_room) - kind, output_field=IntegerField()
+            ),
+            ended_at=Window(Lead("changed_at"), **per_room),
+            ended_by=Window(Lead("employee_id"), **per_room),
+        )
+        .filter(step=1)
+        .annotate(
+            duration=ExpressionWrapper(
+                F("ended_at") - F("changed_at"), output_field=DurationField()
+            )
+        )
+        .order_by()
+    )
+
+
+def percentile(durations, rank):
+    """Nearest-rank percentile of sorted durations"""
+    if not durations:
+        return None
+    return durations[max(math.ceil(rank / 100 * len(durations)), 1) - 1]
+
+
+def turnaround_percentiles(metric, since, until, by="floor", percentiles=PERCENTILES):
+    """
+    [{"group", "count", "p50", "p90", ...}] of the turnarounds of the
+    period grouped by floor, room type name or housekeeper (an Employee,
+    or None when the end transition has no employee), sorted by group.
+    """
+    durations = defaultdict(list)
+    for group, duration in turnarounds(metric, since, until).values_list(
+        GROUPS[by], "duration"
+    ):
+        durations[group].append(duration)
+
+    if by == "housekeeper":
+        employees = Employee.objects.select_related("user").in_bulk(
+            [pk for pk in durations if pk]
+        )
+        groups = {pk: employees.get(pk) for pk in durations}
+    else:
+        groups = {key: key for key in durations}
+
+    results = []
+    for key in sorted(durations, key=lambda key: (key is None, key)):
+        values = sorted(durations[key])
+        row = {"group": groups[key], "count": len(values)}
+        for rank in percentiles:
+            row[f"p{rank}"] = percentile(values, rank)
+        results.append(row)
+    return results
@@ -5,7 +5,9 @@ from apps.rooms.views.rooms_cleaning_views import (
     CleaningTaskCreateView, 
     CleaningTaskUpdateView,
     CleaningTaskDeleteView,
-    MyCleaningTasksView
+    MyCleaningTasksView,
+    CleaningAutoAssignView,
+    CleaningProductivityView,
 )
 
 app_name = "cleaning"
@@ -15,6 +17,8 @@ urlpatterns = [
     path('list/', CleaningTaskListView.as_view(), name="list"),
     path('create/', CleaningTaskCreateView.as_view(), name="create"),
     path('mycleaningtasks/',MyCleaningTasksView.as_view(), name="tasks"),
+    path('auto-assign/', CleaningAutoAssignView.as_view(), name="auto-assign"),
+    path('productivity/', CleaningProductivityView.as_view(), name="productivity"),
     path('update/<pk>/', CleaningTaskUpdateView.as_view(), name="update"),
     path('delete/<pk>/', CleaningTaskDeleteView.as_view(), name="delete"),
     path('<pk>/', CleaningTaskDetailView.as_view(), name="detail"),
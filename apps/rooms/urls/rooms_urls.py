@@ -12,6 +12,7 @@ from apps.rooms.views.rooms_views import (
     RoomUpdateView,
     RoomDeleteView
 )
+from apps.rooms.views.rooms_sync_views import StaffSyncView
 
 app_name = "rooms"
 
@@ -22,6 +23,7 @@ urlpatterns = [
     path('typecreate/', RoomTypeCreateView.as_view(), name="typecreate"),
     path('list/', RoomListView.as_view(), name="list"),
     path('create/', RoomCreateView.as_view(), name="create"),
+    path('sync/', StaffSyncView.as_view(), name="sync"),
     path('type/<pk>/', RoomTypeDetailView.as_view(), name="typedetail"),
     path('typeupdate/<pk>/', RoomTypeUpdateView.as_view(), name="typeupdate"),
     path('typedelete/<pk>/', RoomTypeDeleteView.as_view(), name="typedelete"),
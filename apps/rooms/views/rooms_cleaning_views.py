@@ -1,12 +1,21 @@
+from datetime import timedelta
+
+from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.shortcuts import redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Count
+from django.http import JsonResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 
+from apps.rooms import routes, states
+from apps.rooms.assignment import auto_assign
 from apps.rooms.models import CleaningTask, Room
+from apps.rooms.productivity import completed_between, productivity_payload
 from apps.rooms.forms import (
     CleaningTaskForm, CleaningTaskUpdateForm
 )
@@ -68,8 +77,7 @@ class CleaningTaskCreateView(LoginRequiredMixin, CreateView):
         # Actualizar el estado de la habitación
         room = form.instance.room
         if room.status == Room.StatusChoices.CLEAN:
-            room.status = Room.StatusChoices.DIRTY
-            room.save()
+            states.change(room, self.request.employee, status=Room.StatusChoices.DIRTY)
         
         messages.success(self.request, f'Tarea de limpieza para habitación {form.instance.room.number} creada.')
         return super().form_valid(form)
@@ -109,21 +117,108 @@ class CleaningTaskDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+class CleaningAutoAssignView(LoginRequiredMixin, View):
+    """Reparte las tareas pendientes entre el personal de limpieza de turno"""
+
+    ASSIGNER_ROLES = ('director', 'housekeeping_manager')
+
+    def post(self, request):
+        employee = getattr(request, 'employee', None)
+        if employee is None or employee.role not in self.ASSIGNER_ROLES:
+            messages.error(request, 'No tienes permiso para asignar tareas.')
+            return redirect('cleaning:list')
+
+        assignments = auto_assign(reassign=request.POST.get('reassign') == '1')
+        if assignments:
+            messages.success(
+                request,
+                f'{len(assignments)} tareas asignadas entre '
+                f'{len(set(assignments.values()))} personas.',
+            )
+        else:
+            messages.warning(
+                request, 'No hay tareas pendientes o personal de limpieza fichado.'
+            )
+        return redirect('cleaning:list')
+
+
+class CleaningProductivityView(LoginRequiredMixin, View):
+    """Serie diaria de tareas y minutos por camarera, en JSON"""
+
+    MANAGER_ROLES = ('director', 'housekeeping_manager')
+    DEFAULT_DAYS = 7
+
+    def get(self, request):
+        employee = getattr(request, 'employee', None)
+        if employee is None:
+            return JsonResponse({'error': 'No tienes perfil de empleado'}, status=403)
+
+        today = timezone.localdate()
+        try:
+            end_date = parse_date(request.GET.get('end_date', '')) or today
+            start_date = parse_date(request.GET.get('start_date', '')) or (
+                end_date - timedelta(days=self.DEFAULT_DAYS - 1)
+            )
+        except ValueError:
+            # Fechas con formato correcto pero imposibles, como el 30 de febrero
+            return JsonResponse({'error': 'Fecha no válida'}, status=400)
+
+        # Los responsables ven a todo el personal (o a quien pidan); el resto, lo suyo
+        if employee.role in self.MANAGER_ROLES:
+            ids = request.GET.getlist('employee')
+            if not all(pk.isdigit() for pk in ids):
+                return JsonResponse({'error': 'Empleado no válido'}, status=400)
+            employees = [int(pk) for pk in ids] or None
+        else:
+            employees = [employee.pk]
+
+        try:
+            payload = productivity_payload(start_date, end_date, employees)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(payload)
+
+
 class MyCleaningTasksView(LoginRequiredMixin, ListView):
     """Vista para que el personal de limpieza vea sus tareas asignadas"""
     model = CleaningTask
     template_name = 'rooms/cleaning/MyCleaningTasks.html'
     context_object_name = 'tasks'
-    
+
     def get_queryset(self):
         user = self.request.user
 
         if not hasattr(user, 'employee'):
             return CleaningTask.objects.none()
 
-        return CleaningTask.objects.filter(
+        # Tareas abiertas en el orden de la ruta (cacheada por empleado)
+        tasks = CleaningTask.objects.filter(
             assigned_to=self.request.user.employee,
-            status__in=[CleaningTask.StatusChoices.PENDING, CleaningTask.StatusChoices.IN_PROGRESS]
-        ).select_related('room', 'room__room_type').order_by('priority')
-
+            status__in=routes.OPEN_STATUSES
+        ).select_related('room', 'room__room_type')
+        return routes.order_tasks(tasks, self.request.user.employee.pk)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tasks = context['tasks']
+        today = timezone.localdate()
+
+        completed_tasks = []
+        if hasattr(self.request.user, 'employee'):
+            completed_tasks = completed_between(
+                today,
+                queryset=CleaningTask.objects.filter(assigned_to=self.request.user.employee),
+            ).select_related('room', 'room__room_type')
+
+        context['pending_tasks'] = [task for task in tasks if task.status == CleaningTask.StatusChoices.PENDING]
+        context['inprogress_tasks'] = [task for task in tasks if task.status == CleaningTask.StatusChoices.IN_PROGRESS]
+        context['completed_tasks'] = completed_tasks
+        done = len(completed_tasks)
+        context['stats'] = {
+            'pending': len(context['pending_tasks']),
+            'in_progress': len(context['inprogress_tasks']),
+            'completed_today': done,
+            'progress_percentage': done * 100 / (done + len(tasks)) if done + len(tasks) else 0,
+        }
+        context['today'] = today
+        return context
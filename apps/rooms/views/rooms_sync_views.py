@@ -0,0 +1,63 @@
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+
+from apps.rooms.sync import (
+    SyncError,
+    apply_changes,
+    changes_since,
+    make_token,
+    read_changes,
+    read_token,
+)
+
+# Sin espacios: la respuesta viaja por la wifi de las plantas
+COMPACT = {"separators": (",", ":")}
+
+
+class StaffSyncView(LoginRequiredMixin, View):
+    """
+    Sincronización incremental para la app del personal de planta.
+
+    GET ?token=... devuelve lo cambiado desde el token; POST con
+    {"token", "changes": [...]} aplica primero los cambios encolados sin
+    conexión y devuelve también lo cambiado. Cada respuesta trae el token
+    para la siguiente sincronización.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and request.employee is None:
+            return JsonResponse({"error": "No tienes perfil de empleado"}, status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request):
+        return self.respond(request.GET.get("token"))
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            if not isinstance(data, dict):
+                raise SyncError("Se esperaba un objeto JSON")
+            changes = read_changes(data.get("changes", []))
+        except (ValueError, SyncError) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        results = apply_changes(request.employee, changes)
+        return self.respond(data.get("token"), results=results)
+
+    def respond(self, token, **extra):
+        employee = self.request.employee
+        since = read_token(token, employee)
+        # El token se toma antes de leer, para no perder cambios intermedios
+        next_token = make_token(employee)
+        return JsonResponse(
+            {
+                "token": next_token,
+                "full": since is None,
+                **extra,
+                **changes_since(employee, since),
+            },
+            json_dumps_params=COMPACT,
+        )
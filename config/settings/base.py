@@ -32,6 +32,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.employees.middleware.EmployeeMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -57,6 +58,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Permissions resolved once per user and group and kept in the shared cache
+AUTHENTICATION_BACKENDS = ["apps.employees.backends.CachedPermissionBackend"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -84,9 +88,25 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Presence and other shared caches. Local memory is per process, so point
+# this at a shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+# when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
 LOGIN_REDIRECT_URL = "dashboard:home"
 LOGOUT_REDIRECT_URL = "auth:login"
 LOGIN_URL = "auth:login"
 
 SECRET_KEY = config("SECRET_KEY")
+
+# Shared token clock-in kiosks send as "Authorization: Bearer <token>".
+# Leave it empty to disable the kiosk endpoint.
+KIOSK_API_TOKEN = config("KIOSK_API_TOKEN", default="")
 ALLOWED_HOSTS = config("ALLOWED_HOSTS", default="").split(",")